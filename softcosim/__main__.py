@@ -1,23 +1,50 @@
-import typer
+import functools
 import os
-import asyncio
 from pathlib import Path
-from rich.console import Console
-from .engine import CompanySim
 
+import typer
+
+# heavy modules (the engine, aiohttp, numpy, rich) are imported by the
+# commands that need them, so --help and argument errors stay fast
 app = typer.Typer(add_completion=False)
-console = Console()
+
+@functools.cache
+def _console():
+    from rich.console import Console
+
+    return Console()
 
 def abort(msg: str, code: int = 1):
     print(f"Error: {msg}")
     raise typer.Exit(code)
 
-@app.command()
+def ensure_api_key():
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        _console().print("OpenRouter API key: ", end="")
+        api_key = input()
+
+    if not api_key.strip():
+        abort("API key cannot be empty.")
+    os.environ["OPENROUTER_API_KEY"] = api_key
+
+@app.callback(invoke_without_command=True)
 def run(
-    prompt: str = typer.Option(None, "--prompt", "-p", help="Project prompt for the team"),
+    ctx: typer.Context,
+    prompt: str = typer.Option(
+        None,
+        "--prompt",
+        "-p",
+        help="Project prompt for the team",
+    ),
     days: int = typer.Option(None, "--days", "-d", help="Number of days to simulate"),
     budget: float = typer.Option(None, "--budget", "-b", help="LLM budget in USD"),
-    folder: Path = typer.Option(..., "--folder", "-f", help="The root folder for the simulation output."),
+    folder: Path = typer.Option(
+        None,
+        "--folder",
+        "-f",
+        help="The root folder for the simulation output.",
+    ),
     start_hour: int = typer.Option(
         None,
         "--start-hour",
@@ -31,12 +58,129 @@ def run(
     speed: float = typer.Option(
         None,
         "--speed",
-        help="Seconds per simulated hour",
+        help="Seconds per simulated hour (0 runs on a virtual clock)",
+    ),
+    headless: bool = typer.Option(
+        False,
+        "--headless",
+        help="Run as fast as possible on a virtual clock without live output",
+    ),
+    concurrent: bool = typer.Option(
+        False,
+        "--concurrent",
+        help="Overlap actions of different agents instead of running them one by one",
+    ),
+    max_connections: int = typer.Option(
+        10,
+        "--max-connections",
+        help="Size of the keep-alive HTTP connection pool for LLM calls",
+    ),
+    cache_dir: Path = typer.Option(
+        None,
+        "--cache-dir",
+        help="Reuse LLM replies stored in this folder across runs",
+    ),
+    cache_max_mb: float = typer.Option(
+        50.0,
+        "--cache-max-mb",
+        help="Evict least recently used cache entries beyond this size",
+    ),
+    cache_ttl: float = typer.Option(
+        168.0,
+        "--cache-ttl",
+        help="Hours before a cached reply expires",
+    ),
+    seed: int = typer.Option(
+        None,
+        "--seed",
+        help="Seed for gossip and morale randomness",
+    ),
+    record: Path = typer.Option(
+        None,
+        "--record",
+        help="Append every LLM call to this transcript file",
+    ),
+    replay: Path = typer.Option(
+        None,
+        "--replay",
+        help="Serve LLM replies from a recorded transcript instead of the network",
+    ),
+    replay_latency: bool = typer.Option(
+        False,
+        "--replay-latency",
+        help="Sleep for the recorded latency of each replayed reply",
+    ),
+    queue: str = typer.Option(
+        "heap",
+        "--queue",
+        help="Event queue backend: heap, or calendar for very large event counts",
+    ),
+    sandbox_pool: int = typer.Option(
+        0,
+        "--sandbox-pool",
+        help="Keep this many warm QA containers running instead of one per QA run",
+    ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Stream LLM replies and cut one off once it would exceed the budget",
+    ),
+    prices: Path = typer.Option(
+        None,
+        "--prices",
+        help="Per-model token prices (JSON or TOML) used to estimate call costs",
+    ),
+    llm_concurrency: int = typer.Option(
+        4,
+        "--llm-concurrency",
+        help="Maximum in-flight LLM requests per model",
+    ),
+    llm_tpm: int = typer.Option(
+        None,
+        "--llm-tpm",
+        help="Tokens-per-minute limit per model",
+    ),
+    gossip_batch: int = typer.Option(
+        8,
+        "--gossip-batch",
+        help="Gossip lines fetched per LLM call (1 asks for each line separately)",
+    ),
+    team: Path = typer.Option(
+        None,
+        "--team",
+        help="Team file (TOML or YAML) listing the studio's agents",
+    ),
+    dashboard: bool = typer.Option(
+        False,
+        "--dashboard",
+        help="Show a live dashboard instead of one console line per event",
+    ),
+    checkpoint_every: float = typer.Option(
+        None,
+        "--checkpoint-every",
+        help="Checkpoint every N simulated hours and on Ctrl-C (0: only on Ctrl-C)",
+    ),
+    metrics: bool = typer.Option(
+        False,
+        "--metrics",
+        help="Write latency histograms and counters to metrics.prom and metrics.json",
     ),
 ):
     """Kicks off a new software studio simulation."""
+    if ctx.invoked_subcommand is not None:
+        return
+    import asyncio
 
-    console.print(":wave: Welcome to SoftCoSim!")
+    from .cache import ResponseCache
+    from .engine import CompanySim
+    from .pricing import PriceTable
+    from .team import load_team
+    from .transcript import Recorder, Replayer
+
+    if folder is None:
+        raise typer.BadParameter("Missing option.", param_hint="'--folder' / '-f'")
+
+    _console().print(":wave: Welcome to SoftCoSim!")
     if not prompt:
         prompt = typer.prompt("Project description")
     if days is None:
@@ -47,6 +191,8 @@ def run(
         start_hour = typer.prompt("Start hour", type=int)
     if end_hour is None:
         end_hour = typer.prompt("End hour", type=int)
+    if headless:
+        speed = 0.0
     if speed is None:
         speed = typer.prompt("Seconds per simulated hour", type=float)
 
@@ -58,18 +204,44 @@ def run(
     except Exception as e:
         abort(f"Could not create folder '{folder}': {e}")
 
-    # 2. API-key retrieval
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    if not api_key:
-        console.print("OpenRouter API key: ", end="")
-        api_key = input()
-
-    if not api_key.strip():
-        abort("API key cannot be empty.")
-    os.environ["OPENROUTER_API_KEY"] = api_key
+    # 2. API-key retrieval (not needed when replaying a transcript)
+    if replay is None:
+        ensure_api_key()
 
     # 3. Kick off simulation
-    console.print(":rocket: Launching simulation…")
+    cache = None
+    if cache_dir is not None:
+        cache = ResponseCache(
+            cache_dir,
+            max_bytes=int(cache_max_mb * 1024 * 1024),
+            ttl=cache_ttl * 3600,
+        )
+
+    replayer = None
+    if replay is not None:
+        try:
+            replayer = Replayer(replay, latency=replay_latency)
+        except (OSError, ValueError) as e:
+            abort(f"Could not load transcript '{replay}': {e}")
+
+    members = None
+    if team is not None:
+        try:
+            members = load_team(team)
+        except (OSError, ValueError) as e:
+            abort(f"Could not load team '{team}': {e}")
+
+    price_table = None
+    if prices is not None:
+        try:
+            price_table = PriceTable.load(prices)
+        except (OSError, ValueError) as e:
+            abort(f"Could not load prices '{prices}': {e}")
+
+    if queue not in ("heap", "calendar"):
+        abort(f"Unknown event queue '{queue}' (use heap or calendar).")
+
+    _console().print(":rocket: Launching simulation…")
     sim = CompanySim(
         prompt,
         days,
@@ -78,9 +250,369 @@ def run(
         end_hour=end_hour,
         seconds_per_hour=speed,
         budget=budget,
+        concurrent=concurrent,
+        http_limit=max_connections,
+        cache=cache,
+        seed=seed,
+        recorder=Recorder(record) if record is not None else None,
+        replay=replayer,
+        queue=queue,
+        sandbox_pool=sandbox_pool,
+        stream=stream,
+        prices=price_table,
+        llm_concurrency=llm_concurrency,
+        llm_tpm=llm_tpm,
+        gossip_batch=gossip_batch,
+        team=members,
+        dashboard=dashboard,
+        checkpoint_every=checkpoint_every,
+        metrics=metrics,
     )
     asyncio.run(sim.start())
-    console.print(":white_check_mark: Done.")
+    if not sim.interrupted:
+        _console().print(":white_check_mark: Done.")
+
+@app.command()
+def resume(
+    folder: Path = typer.Argument(..., help="Run folder containing checkpoint.json"),
+    speed: float = typer.Option(
+        None,
+        "--speed",
+        help="Seconds per simulated hour (default: as before)",
+    ),
+    dashboard: bool = typer.Option(
+        False,
+        "--dashboard",
+        help="Show a live dashboard instead of one console line per event",
+    ),
+):
+    """Continues an interrupted simulation from its last checkpoint."""
+    import asyncio
+
+    from .engine import CompanySim
+
+    overrides = {"dashboard": dashboard}
+    if speed is not None:
+        overrides["seconds_per_hour"] = speed
+    try:
+        sim = CompanySim.resume(folder.resolve(), **overrides)
+    except (OSError, ValueError, KeyError) as e:
+        abort(f"Could not load checkpoint from '{folder}': {e}")
+    # a replayed run never reaches the API
+    if sim.replay is None and os.getenv("SOFTCOSIM_FAKE_LLM") != "1":
+        ensure_api_key()
+    _console().print(f":rocket: Resuming at sim hour {sim._resume['now']:.2f}…")
+    asyncio.run(sim.start())
+    if not sim.interrupted:
+        _console().print(":white_check_mark: Done.")
+
+@app.command()
+def sweep(
+    spec: Path = typer.Argument(..., help="Sweep spec (JSON or TOML)"),
+    root: Path = typer.Option(
+        ...,
+        "--root",
+        "-r",
+        help="Folder that receives one subfolder per run.",
+    ),
+    workers: int = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        help="Parallel runs (default: one per CPU core)",
+    ),
+    budget: float = typer.Option(
+        None,
+        "--budget",
+        "-b",
+        help="Total LLM budget in USD shared by all runs",
+    ),
+):
+    """Runs many simulations in parallel and aggregates their results."""
+    from .sweep import Sweep, expand, load_spec
+
+    try:
+        data = load_spec(spec)
+        configs = expand(data)
+    except (OSError, ValueError) as e:
+        abort(f"Invalid sweep spec '{spec}': {e}")
+    if budget is None:
+        budget = data.get("budget")
+
+    if root.exists():
+        abort(f"Output folder '{root}' already exists.")
+    root.mkdir(parents=True)
+    if os.getenv("SOFTCOSIM_FAKE_LLM") != "1":
+        ensure_api_key()
+
+    _console().print(f":rocket: Sweeping {len(configs)} runs…")
+    results = Sweep(configs, root.resolve(), workers=workers, budget=budget).run()
+    failed = sum(1 for r in results if r["status"] != "ok")
+    _console().print(
+        f":white_check_mark: {len(results) - failed} runs ok, {failed} not ok. "
+        f"Results in {root / 'results.csv'}"
+    )
+
+@app.command()
+def bench(
+    out: Path = typer.Option(
+        Path("bench.json"),
+        "--out",
+        "-o",
+        help="Where to write the JSON results",
+    ),
+    sizes: str = typer.Option(
+        "1000,10000,100000,1000000",
+        "--sizes",
+        help="Comma-separated event counts for the dispatch and queue cases",
+    ),
+    io_ops: int = typer.Option(
+        10_000,
+        "--io-ops",
+        help="Operations for the log and fs.write cases",
+    ),
+    days: int = typer.Option(
+        5,
+        "--days",
+        help="Simulated days for the end-to-end case",
+    ),
+    latency: float = typer.Option(
+        0.001,
+        "--latency",
+        help="Injected fake LLM latency in seconds",
+    ),
+    http_requests: int = typer.Option(
+        2_000,
+        "--http-requests",
+        help="Requests sent to the local stub server in the http case",
+    ),
+    baseline: Path = typer.Option(
+        None,
+        "--baseline",
+        help="Earlier results to compare against",
+    ),
+    threshold: float = typer.Option(
+        0.1,
+        "--threshold",
+        help="Allowed throughput drop before failing (0.1 = 10%)",
+    ),
+    no_alloc: bool = typer.Option(
+        False,
+        "--no-alloc",
+        help="Skip the tracemalloc pass",
+    ),
+):
+    """Benchmarks event dispatch, logging, file writes and full runs."""
+    from . import bench as bench_mod
+
+    try:
+        counts = [int(x) for x in sizes.split(",") if x.strip()]
+    except ValueError:
+        abort(f"Invalid --sizes '{sizes}'")
+    cases = bench_mod.suite(counts, io_ops=io_ops, e2e_days=days, e2e_latency=latency,
+                            http_requests=http_requests)
+    results = bench_mod.run_suite(
+        cases,
+        trace_alloc=not no_alloc,
+        progress=lambda name: _console().print(f"Running {name}…"),
+    )
+    for name, r in results["results"].items():
+        alloc = r.get("peak_alloc_bytes")
+        alloc_txt = f", peak alloc {alloc / 1024:,.0f} KiB" if alloc is not None else ""
+        _console().print(f"{name:>16}: {r['ops_per_sec']:>14,.0f} ops/s "
+                         f"in {r['seconds']:.3f}s{alloc_txt}")
+    bench_mod.save(results, out)
+    _console().print(f"Results written to {out}")
+
+    if baseline is not None:
+        regressions = bench_mod.compare(results, bench_mod.load(baseline), threshold)
+        for line in regressions:
+            _console().print(f"[red]Regression[/red] {line}")
+        if regressions:
+            raise typer.Exit(1)
+        _console().print(f"No regressions beyond {threshold:.0%} against {baseline}")
+
+@app.command()
+def stub(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: int = typer.Option(8765, "--port", help="Port to listen on"),
+    latency: str = typer.Option(
+        "0",
+        "--latency",
+        help="Time to first token: S, uniform:A,B, exp:MEAN or lognormal:MEDIAN,SIGMA",
+    ),
+    tokens_per_sec: float = typer.Option(
+        0.0,
+        "--tokens-per-sec",
+        help="Token rate of replies (0: instant)",
+    ),
+    completion_tokens: int = typer.Option(
+        64,
+        "--completion-tokens",
+        help="Tokens per reply",
+    ),
+    chunk_tokens: int = typer.Option(
+        1,
+        "--chunk-tokens",
+        help="Tokens per streamed delta",
+    ),
+    fragment: int = typer.Option(
+        0,
+        "--fragment",
+        help="Split streamed events into writes of at most this many bytes",
+    ),
+    error_rate: float = typer.Option(
+        0.0,
+        "--error-rate",
+        help="Share of requests answered with HTTP 500",
+    ),
+    throttle_rate: float = typer.Option(
+        0.0,
+        "--throttle-rate",
+        help="Share of requests answered with HTTP 429",
+    ),
+    retry_after: float = typer.Option(
+        1.0,
+        "--retry-after",
+        help="Retry-After seconds sent with a 429",
+    ),
+    max_concurrent: int = typer.Option(
+        0,
+        "--max-concurrent",
+        help="Answer 429 beyond this many open requests (0: no cap)",
+    ),
+    seed: int = typer.Option(
+        None,
+        "--seed",
+        help="Seed for latencies, replies and injected failures",
+    ),
+):
+    """Serves an OpenRouter-compatible stand-in API for load tests."""
+    from .stubserver import PATHS, StubLLM, serve
+
+    try:
+        server = StubLLM(latency, tokens_per_sec, completion_tokens, chunk_tokens,
+                         fragment, error_rate, throttle_rate, retry_after,
+                         max_concurrent, seed=seed)
+    except ValueError as e:
+        abort(str(e))
+    _console().print(f"Stub LLM listening; point runs at it with:\n"
+                  f"  export SOFTCOSIM_API_URL=http://{host}:{port}{PATHS[0]}")
+    serve(server, host, port)
+
+@app.command()
+def montecarlo(
+    runs: int = typer.Option(
+        10_000,
+        "--runs",
+        "-n",
+        help="Independent studios simulated side by side",
+    ),
+    days: int = typer.Option(10, "--days", "-d", help="Simulated days per run"),
+    start_hour: int = typer.Option(
+        9,
+        "--start-hour",
+        help="Hour the workday starts (0-23)",
+    ),
+    end_hour: int = typer.Option(17, "--end-hour", help="Hour the workday ends (1-24)"),
+    seed: int = typer.Option(None, "--seed", help="Seed for the gossip draws"),
+    fatigue_rate: float = typer.Option(
+        None,
+        "--fatigue-rate",
+        help="Fatigue gained per simulated hour (default: the engine's)",
+    ),
+    decay_min: float = typer.Option(
+        None,
+        "--decay-min",
+        help="Least morale lost per gossip line (default: the engine's)",
+    ),
+    decay_max: float = typer.Option(
+        None,
+        "--decay-max",
+        help="Most morale lost per gossip line (default: the engine's)",
+    ),
+    out: Path = typer.Option(
+        Path("montecarlo.csv"),
+        "--out",
+        "-o",
+        help="Where to write the percentile curves",
+    ),
+):
+    """Runs the studio dynamics many times without LLM calls."""
+    from .montecarlo import PERCENTILES, MonteCarlo
+    from .team import FATIGUE_RATE, MORALE_DECAY
+
+    if end_hour <= start_hour:
+        abort("--end-hour must be after --start-hour")
+    # the engine's own constants, so the two cannot drift apart
+    fatigue_rate = FATIGUE_RATE if fatigue_rate is None else fatigue_rate
+    decay_min = MORALE_DECAY[0] if decay_min is None else decay_min
+    decay_max = MORALE_DECAY[1] if decay_max is None else decay_max
+    mc = MonteCarlo(runs, days, start_hour, end_hour, seed=seed,
+                    fatigue_rate=fatigue_rate,
+                    morale_decay=(decay_min, decay_max)).run()
+    mc.write_csv(out)
+    last = mc.rows()[-1]
+    _console().print(
+        f"{runs * days:,} studio-days in {mc.wall_time:.2f}s "
+        f"({mc.studio_days_per_sec:,.0f}/s)"
+    )
+    for metric in ("morale", "fatigue"):
+        values = " ".join(f"p{p}={last[f'{metric}_p{p}']:.1f}" for p in PERCENTILES)
+        _console().print(f"Final {metric}: {values}")
+    _console().print(f"Percentile curves written to {out}")
+
+@app.command()
+def query(
+    folder: Path = typer.Argument(..., help="Run folder containing events.jsonl"),
+    since: float = typer.Option(None, "--from", help="First sim hour to include"),
+    until: float = typer.Option(None, "--to", help="Last sim hour to include"),
+    kinds: list[str] = typer.Option(
+        None,
+        "--kind",
+        "-k",
+        help="Only events of this kind (repeatable)",
+    ),
+    agent: str = typer.Option(
+        None,
+        "--agent",
+        "-a",
+        help="Only events logged by this agent",
+    ),
+    fmt: str = typer.Option(
+        "lines",
+        "--format",
+        help="lines, jsonl, timeline or gossip",
+    ),
+):
+    """Filters a run's event log by sim time, kind and agent."""
+    import json
+
+    from .eventlog import (
+        FIELDS,
+        EventReader,
+        console_line,
+        render_gossip,
+        render_timeline,
+    )
+
+    if fmt not in ("lines", "jsonl", "timeline", "gossip"):
+        abort(f"Unknown format '{fmt}' (use lines, jsonl, timeline or gossip).")
+    path = folder / "events.jsonl"
+    if not path.exists():
+        abort(f"No event log in '{folder}'.")
+    with EventReader(path) as reader:
+        records = reader.query(since, until, kinds=kinds or None, agent=agent)
+        if fmt == "timeline":
+            print(render_timeline(records), end="")
+        elif fmt == "gossip":
+            print(render_gossip(records), end="")
+        else:
+            for r in records:
+                if fmt == "jsonl":
+                    print(json.dumps(r, ensure_ascii=False))
+                else:
+                    print(console_line(*(r[f] for f in FIELDS if f != "agent")))
 
 if __name__ == "__main__":
     app()
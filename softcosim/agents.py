@@ -1,47 +1,205 @@
 from __future__ import annotations
-import random
+
+import asyncio
+import json
+import time
+from collections import deque
 from typing import TYPE_CHECKING
-from .fs import write
+
+from .eventqueue import BACKGROUND, CRITICAL, NORMAL
+from .fs import open_file, write
 from .llm import chat
+from .pricing import prompt_tokens
 
 if TYPE_CHECKING:
     from .engine import CompanySim
 
 class Agent:
-    model = "mistralai/devstral-small"
+    __slots__ = ("sim", "name", "idx", "model", "_gossip")
+    DEFAULT_MODEL = "mistralai/devstral-small"
+    role = "agent"
 
-    def __init__(self, sim: "CompanySim", name: str):
+    def __init__(self, sim: "CompanySim", name: str, idx: int = 0,
+                 model: str | None = None):
         self.sim = sim
         self.name = name
+        self.idx = idx  # row in sim.state
+        self.model = model or self.DEFAULT_MODEL
+        self._gossip: deque[str] = deque()
+
+    @property
+    def morale(self) -> float:
+        return float(self.sim.state.morale[self.idx])
+
+    @property
+    def fatigue(self) -> float:
+        return float(self.sim.state.fatigue[self.idx])
+
+    @property
+    def cost(self) -> float:
+        return float(self.sim.state.cost[self.idx])
 
     async def act(self):
         ...
 
-    async def ask_llm(self, system_prompt: str, user_prompt: str) -> str:
+    async def ask_llm(self, system_prompt: str, user_prompt: str, *,
+                      priority: int = NORMAL) -> str:
         msg = [{"role": "system", "content": system_prompt},
                {"role": "user", "content": user_prompt}]
-        reply, price, latency = await chat(self.model, msg)
-        self.sim.add_cost(price)
-        self.sim.log(f"{self.name} LLM call ${price:.4f} ({latency:.2f}s)", kind="INFO")
+        cache = self.sim.cache
+        if cache is not None:
+            hit = cache.get(self.model, msg)
+            if hit is not None:
+                reply, saved = hit
+                self.sim.log(f"{self.name} LLM cache hit (saved ${saved:.4f})",
+                             kind="INFO", agent=self.name)
+                if self.sim.metrics is not None:
+                    self.sim.metrics.inc("llm_cache_hits_total", model=self.model)
+                return reply
+        model, estimate = await self.sim.admit(self, self.model, msg)
+        stream = None
+        try:
+            if self.sim.replay is not None:
+                reply, price, latency = await self.sim.replay.chat(model, msg)
+            else:
+                def over_budget(tokens) -> bool:
+                    nonlocal stream
+                    stream = tokens
+                    return self.sim.cost + tokens.cost > self.sim.budget
+
+                tokens = prompt_tokens(msg) + self.sim.completions.expect(model)
+                self.sim.llm_calls[self.name] = (model, time.perf_counter())
+                try:
+                    reply, price, latency = await self.sim.limiter.run(
+                        model,
+                        lambda: chat(
+                            model, msg, stream=self.sim.stream, pool=self.sim.http,
+                            on_token=over_budget, prices=self.sim.prices,
+                        ),
+                        priority=priority, tokens=tokens,
+                    )
+                finally:
+                    self.sim.llm_calls.pop(self.name, None)
+                if self.sim.recorder is not None:
+                    self.sim.recorder.record(model, msg, reply, price, latency,
+                                             ttft=stream.ttft if stream else None)
+        except BaseException:
+            self.sim.settle(self, model, estimate)
+            raise
+        if stream is not None and stream.aborted:
+            self.sim.log(
+                f"{self.name} LLM stream aborted after {stream.tokens} tokens "
+                f"(~${price:.4f}, over budget)", kind="INFO", agent=self.name)
+        self.sim.settle(self, model, estimate, reply, price)
+        metrics = self.sim.metrics
+        if metrics is not None:
+            metrics.inc("llm_requests_total", model=model)
+            metrics.inc("llm_cost_usd_total", price, model=model)
+            metrics.observe("llm_latency_seconds", latency, model=model)
+            if stream is not None and stream.ttft is not None:
+                metrics.observe("llm_ttft_seconds", stream.ttft, model=model)
+        spent = self.cost
+        if stream is not None:
+            self.sim.log(
+                f"{self.name} LLM call {model} ${price:.4f} ({latency:.2f}s, "
+                f"first token {stream.ttft or 0:.2f}s, "
+                f"{stream.tokens_per_sec:.0f} tok/s; {self.name} total ${spent:.4f})",
+                kind="INFO", agent=self.name)
+        else:
+            self.sim.log(
+                f"{self.name} LLM call {model} ${price:.4f} ({latency:.2f}s; "
+                f"{self.name} total ${spent:.4f})", kind="INFO", agent=self.name)
+        if stream is not None and stream.aborted:
+            return reply
+        if cache is not None:
+            cache.put(model, msg, reply, price)
         return reply
 
+    def write_file(self, rel_path: str, text: str):
+        """Writes a file in the run folder, timing it when metrics are on."""
+        if self.sim.metrics is None:
+            write(self.sim.root, rel_path, text, mode="w")
+            return
+        with self.sim.metrics.timer("fs_write_seconds"):
+            write(self.sim.root, rel_path, text, mode="w")
+
     async def gossip(self):
-        prompt = "Write a single, snarky sentence of office gossip."
-        line = await self.ask_llm("You are a disgruntled office worker.", prompt)
-        self.sim.log(f"{self.name} whispers: '{line}'", kind="GOSSIP")
-        self.sim.morale = max(0, self.sim.morale - random.uniform(*self.sim.MORALE_DECAY))
+        line = await self._next_gossip_line()
+        if line is None:
+            return
+        self.sim.log(f"{self.name} whispers: '{line}'", kind="GOSSIP", agent=self.name)
+        self.sim.state.cheer(-self.sim.rng.uniform(*self.sim.MORALE_DECAY))
         self.sim._append_gossip(self.name, line)
 
+    async def _next_gossip_line(self) -> str | None:
+        """
+        Pops a line from this agent's gossip buffer.  Lines are fetched
+        sim.gossip_batch at a time; once the buffer runs low a refill is
+        queued as a background event at the current hour, so its LLM call is
+        logged and paid for there and most gossip events need no request.
+        """
+        if not self._gossip:
+            await self.refill_gossip()
+        if not self._gossip:
+            return None  # the refill was refused
+        line = self._gossip.popleft()
+        batch = self.sim.gossip_batch
+        # only on crossing the mark, so one refill is queued per batch
+        if batch > 1 and len(self._gossip) == batch // 4:
+            self.sim.schedule(0, self.refill_gossip, f"{self.name} refills gossip",
+                              priority=BACKGROUND, tag="gossip")
+        return line
+
+    async def refill_gossip(self):
+        k = self.sim.gossip_batch
+        system = "You are a disgruntled office worker."
+        if k <= 1:
+            reply = await self.ask_llm(
+                system, "Write a single, snarky sentence of office gossip.",
+                priority=BACKGROUND)
+            self._gossip.append(reply)
+            return
+        prompt = (f"Write {k} different single, snarky sentences of office gossip. "
+                  "Reply with a JSON list of strings only.")
+        reply = await self.ask_llm(system, prompt, priority=BACKGROUND)
+        self._gossip.extend(parse_lines(reply)[:k])
+
 class Manager(Agent):
-    model = "google/gemini-2.5-flash"
+    __slots__ = ()
+    DEFAULT_MODEL = "google/gemini-2.5-flash"
+    role = "manager"
+
     async def act(self):
-        self.sim.log(f"{self.name}: Planning project")
+        self.sim.log(f"{self.name}: Planning project", agent=self.name)
         prompt = f"Create a 3-ticket project plan for: {self.sim.prompt}"
-        plan = await self.ask_llm("You are a project manager.", prompt)
-        self.sim.log(f"Project plan:\n{plan}")
+        plan = await self.ask_llm("You are a project manager.", prompt,
+                                  priority=CRITICAL)
+        self.sim.log(f"Project plan:\n{plan}", agent=self.name)
         # schedule developer work at +0.1 h to show causal chain
-        self.sim.schedule(0.1, self.sim.agents["dev"].work, desc="Dev writes hello")
-        self.sim.schedule(0.2, self.sim.agents["qa"].run_tests, desc="QA run")
+        for dev in self.sim.members("developer"):
+            self.sim.schedule(0.1, dev.work, desc=f"{dev.name} writes hello",
+                              priority=CRITICAL)
+        # the first QA engineer checks everything; the checker is incremental
+        qa = self.sim.members("qa")
+        if qa:
+            self.sim.schedule(0.2, qa[0].run_tests, desc="QA run", tag="qa")
+
+def parse_lines(text: str) -> list[str]:
+    """Reads a JSON list of strings; falls back to one line per text line."""
+    body = text.strip()
+    if body.startswith("```"):
+        # drop the fence and its language tag
+        body = body.partition("\n")[2].rsplit("```", 1)[0]
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = None
+    if isinstance(data, list):
+        lines = [str(x).strip() for x in data]
+    else:
+        lines = [line.strip().lstrip("-*0123456789.) ").strip()
+                 for line in body.splitlines()]
+    return [line for line in lines if line] or [text.strip()]
 
 def extract_code_block(text: str) -> str:
     """Extracts the first Python code block from a Markdown string."""
@@ -52,24 +210,65 @@ def extract_code_block(text: str) -> str:
     return text
 
 class Developer(Agent):
+    __slots__ = ()
+    role = "developer"
+
     async def work(self):
-        self.sim.log(f"{self.name}: Writing hello.py")
+        # the first developer owns hello.py; in larger teams each writes its own
+        lead = self.sim.members("developer")[0] is self
+        filename = "hello.py" if lead else f"hello_{self.idx}.py"
+        self.sim.log(f"{self.name}: Writing {filename}", agent=self.name)
         prompt = f"Write a python script that prints 'Hello, SoftCoSim!' for the project: {self.sim.prompt}. Return ONLY the Python code, no markdown or commentary."
-        reply = await self.ask_llm("You are a software developer.", prompt)
+        reply = await self.ask_llm("You are a software developer.", prompt,
+                                   priority=CRITICAL)
         code = extract_code_block(reply)
         # The fs.write function handles path creation and ensures it's within the root
-        write(self.sim.root, "src/hello.py", code, mode="w")
+        self.write_file(f"src/{filename}", code)
 
 class QA(Agent):
+    __slots__ = ()
+    role = "qa"
+
     async def run_tests(self):
-        self.sim.log(f"{self.name}: Running tests in Docker")
-        from .docker_runner import run_pytest
-        from pathlib import Path
-        # We need to mount the whole project, not just the run folder
-        project_root = Path(__file__).resolve().parent.parent
-        result = run_pytest(str(project_root))
-        # summarise pass/fail
-        status = "PASS" if result.strip().endswith("PASS") else "FAIL"
-        self.sim.log(f"{self.name}: Syntax check {status}")
-        # write full log
-        write(self.sim.root, "qa/test_log.txt", result, mode="w")
+        self.sim.log(f"{self.name}: Running tests in Docker", agent=self.name)
+        from .checker import parse_report
+        from .docker_runner import SKIPPED, run_pytest
+        job = None
+        t0 = time.perf_counter()
+        # stream the sandbox output into the log as it arrives
+        with open_file(self.sim.root, "qa/test_log.txt", mode="w") as log:
+            def on_output(text: str):
+                log.write(text)
+                log.flush()
+            try:
+                if self.sim.sandbox is not None:
+                    result, job = await self.sim.sandbox.run(on_output=on_output)
+                else:
+                    result = await run_pytest(str(self.sim.root), on_output=on_output)
+            except asyncio.CancelledError:
+                self.sim.log(f"{self.name}: Sandbox cancelled", agent=self.name)
+                raise
+        if self.sim.metrics is not None:
+            self.sim.metrics.observe("sandbox_seconds", time.perf_counter() - t0)
+        # summarise the checker's per-file report
+        report = parse_report(result)
+        if report is None:
+            # without Docker nothing is checked; the run still counts as passing
+            status = "PASS" if result == SKIPPED else "FAIL"
+            detail = " (docker skipped)" if result == SKIPPED else ""
+        else:
+            status = report["status"]
+            detail = f" ({report['checked']} checked, {report['unchanged']} unchanged)"
+            self.write_file("qa/report.json", json.dumps(report, indent=2))
+            for f in report["files"]:
+                if f["status"] != "PASS":
+                    self.sim.log(f"{self.name}: {f['path']}: {f['error']}",
+                                 agent=self.name)
+        self.sim.qa_status = status
+        if job is not None:
+            where = ", one-off container" if job.get("fallback") else ""
+            detail += (f" (waited {job['queue_wait']:.2f}s, "
+                       f"exec {job['exec_time']:.2f}s{where})")
+        self.sim.log(f"{self.name}: Syntax check {status}{detail}", agent=self.name)
+
+ROLE_CLASSES = {"manager": Manager, "developer": Developer, "qa": QA}
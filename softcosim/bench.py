@@ -0,0 +1,272 @@
+"""
+Engine benchmark suite.
+
+Cases:
+
+* ``dispatch-N`` – schedule N no-op events and drain them through
+  ``CompanySim._run_loop`` on the virtual clock.
+* ``queue-<backend>-N`` – raw push/pop of N events through each event
+  queue backend.
+* ``hold-<backend>-N`` – N events pending within one work day, then drained
+  while every tenth pop pushes a near-future event, as the simulation does.
+* ``log`` – ``CompanySim.log`` throughput, including the final sink flush.
+* ``fs_write`` – ``fs.write`` appends.
+* ``e2e`` – full simulation with the fake LLM and injected per-call latency.
+* ``http`` – ``llm.chat`` requests, half of them streamed, over pooled
+  connections to the local stub server.
+
+Each case is timed on its own and, unless disabled, run a second time under
+tracemalloc to record its own peak allocations.  (The process's peak RSS is
+not reported: it only ever grows, so it would repeat the largest case's
+figure for every later one.)  Results are JSON so two runs (e.g.
+two commits) can be compared with a regression threshold.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+@contextmanager
+def _environ(**values):
+    """Sets (or with None, unsets) environment variables for a block."""
+    old = {k: os.environ.get(k) for k in values}
+
+    def apply(items):
+        for k, v in items.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+    apply(values)
+    try:
+        yield
+    finally:
+        apply(old)
+
+
+def _sim(root: Path, **kwargs):
+    from .engine import CompanySim
+
+    return CompanySim("Benchmark", 1, root, seconds_per_hour=0, **kwargs)
+
+
+def case_dispatch(n: int):
+    def run(root: Path) -> int:
+        sim = _sim(root)
+        sim.total_hours = float(n)
+
+        def noop():
+            pass
+
+        for i in range(n):
+            # interleave times so the heap actually has to order them
+            sim.schedule((i * 7919) % n, noop)
+        asyncio.run(sim._run_loop())
+        return n
+    return run
+
+
+def case_queue(backend: str, n: int):
+    def run(root: Path) -> int:
+        from .eventqueue import Event, make_queue
+
+        q = make_queue(backend)
+        step = n / 10
+        for i in range(n):
+            q.push(Event((i * 7919) % n / step, None))
+        while q.pop() is not None:
+            pass
+        return n
+    return run
+
+
+def case_hold(backend: str, n: int):
+    def run(root: Path) -> int:
+        import random
+
+        from .eventqueue import Event, make_queue
+
+        rng = random.Random(0)
+        q = make_queue(backend)
+        for _ in range(n):
+            q.push(Event(rng.uniform(0, 8), None))
+        ops, refill = n, n // 10
+        while (evt := q.pop()) is not None:
+            if refill and ops % 10 == 0:
+                q.push(Event(evt.t + rng.uniform(0, 0.05), None))
+                refill -= 1
+            ops += 1
+        return ops
+    return run
+
+
+def case_log(n: int):
+    def run(root: Path) -> int:
+        sim = _sim(root)
+        sim._prepare_fs()
+
+        async def main():
+            for i in range(n):
+                sim.log(f"benchmark line {i}", kind="INFO")
+            await sim.sink.close()
+        asyncio.run(main())
+        return n
+    return run
+
+
+def case_fs_write(n: int):
+    def run(root: Path) -> int:
+        from .fs import write
+
+        for i in range(n):
+            write(root, "bench/out.txt", f"line {i}\n")
+        return n
+    return run
+
+
+def case_e2e(days: int, latency: float):
+    def run(root: Path) -> int:
+        with _environ(SOFTCOSIM_FAKE_LLM="1", SOFTCOSIM_FAKE_LLM_LATENCY=str(latency)):
+            from .engine import CompanySim
+
+            sim = CompanySim("Benchmark", days, root, seconds_per_hour=0,
+                             concurrent=True, seed=0)
+            sim.console.quiet = True
+            asyncio.run(sim.start())
+        return sim.dispatched
+    return run
+
+
+def case_http(n: int, concurrency: int = 64):
+    def run(root: Path) -> int:
+        from aiohttp.test_utils import TestServer
+
+        from . import llm
+        from .stubserver import StubLLM
+
+        async def main():
+            stub = StubLLM(completion_tokens=16, seed=0)
+            async with TestServer(stub.app()) as server:
+                pool = llm.SessionPool(limit=concurrency)
+                url = str(server.make_url("/api/v1/chat/completions"))
+                old, llm.API_URL = llm.API_URL, url
+
+                async def worker(k: int):
+                    for i in range(k, n, concurrency):
+                        msg = [{"role": "user", "content": f"ping {i}"}]
+                        await llm.chat("stub", msg, stream=i % 2 == 1, pool=pool)
+                try:
+                    await asyncio.gather(*(worker(k) for k in range(concurrency)))
+                finally:
+                    llm.API_URL = old
+                    await pool.close()
+
+        with _environ(SOFTCOSIM_FAKE_LLM=None, OPENROUTER_API_KEY="bench"):
+            asyncio.run(main())
+        return n
+    return run
+
+
+def measure(fn, trace_alloc: bool = True) -> dict:
+    """Times fn(root) in a fresh temp folder; fn returns the number of ops."""
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        ops = fn(Path(tmp))
+        seconds = time.perf_counter() - t0
+    result = {
+        "ops": ops,
+        "seconds": round(seconds, 6),
+        "ops_per_sec": round(ops / seconds, 1) if seconds else None,
+    }
+    if trace_alloc:
+        with tempfile.TemporaryDirectory() as tmp:
+            tracemalloc.start()
+            try:
+                fn(Path(tmp))
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        result["peak_alloc_bytes"] = peak
+    return result
+
+
+def suite(
+    sizes=DEFAULT_SIZES,
+    io_ops: int = 10_000,
+    e2e_days: int = 5,
+    e2e_latency: float = 0.001,
+    http_requests: int = 2_000,
+) -> dict:
+    cases = {f"dispatch-{n}": case_dispatch(n) for n in sizes}
+    from .eventqueue import BACKENDS
+
+    for backend in BACKENDS:
+        for n in sizes:
+            cases[f"queue-{backend}-{n}"] = case_queue(backend, n)
+            cases[f"hold-{backend}-{n}"] = case_hold(backend, n)
+    cases["log"] = case_log(io_ops)
+    cases["fs_write"] = case_fs_write(io_ops)
+    cases["e2e"] = case_e2e(e2e_days, e2e_latency)
+    cases["http"] = case_http(http_requests)
+    return cases
+
+
+def run_suite(cases: dict, trace_alloc: bool = True, progress=None) -> dict:
+    results = {}
+    for name, fn in cases.items():
+        if progress is not None:
+            progress(name)
+        results[name] = measure(fn, trace_alloc=trace_alloc)
+    return {"meta": _meta(), "results": results}
+
+
+def _meta() -> dict:
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        meta["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return meta
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.1) -> list[str]:
+    """Lists cases whose throughput dropped by more than threshold."""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        cur = current.get("results", {}).get(name)
+        if not cur or not base.get("ops_per_sec") or not cur.get("ops_per_sec"):
+            continue
+        change = cur["ops_per_sec"] / base["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append(
+                f"{name}: {base['ops_per_sec']:,.0f} -> "
+                f"{cur['ops_per_sec']:,.0f} ops/s ({change:+.1%})"
+            )
+    return regressions
+
+
+def save(results: dict, path: Path):
+    Path(path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+def load(path: Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
@@ -0,0 +1,92 @@
+"""
+Persistent, content-addressed cache of LLM replies.
+
+Each entry is a small JSON file named after the SHA-256 of the model and the
+exact message list.  Entries expire after ``ttl`` seconds and the least
+recently used ones are evicted once the cache grows beyond ``max_bytes``.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def request_key(model: str, messages: list[dict]) -> str:
+    """Stable hash of a chat request."""
+    blob = json.dumps(
+        {"model": model, "messages": messages},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 50 * 1024 * 1024,
+        ttl: float | None = 7 * 24 * 3600,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.saved_usd = 0.0
+        # key -> size in bytes, least recently used first
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        entries = []
+        for p in self.root.glob("*.json"):
+            st = p.stat()
+            entries.append((st.st_mtime, p.stem, st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._size += size
+
+    def get(self, model: str, messages: list[dict]) -> tuple[str, float] | None:
+        """Returns (reply, original_cost) or None on a miss."""
+        key = request_key(model, messages)
+        if key not in self._index:
+            self.misses += 1
+            return None
+        p = self.root / f"{key}.json"
+        try:
+            entry = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._drop(key)
+            self.misses += 1
+            return None
+        if self.ttl is not None and time.time() - entry["created"] > self.ttl:
+            self._drop(key)
+            self.misses += 1
+            return None
+        os.utime(p)  # keeps the LRU order across runs
+        self._index.move_to_end(key)
+        self.hits += 1
+        self.saved_usd += entry["cost"]
+        return entry["reply"], entry["cost"]
+
+    def put(self, model: str, messages: list[dict], reply: str, cost: float):
+        key = request_key(model, messages)
+        data = json.dumps(
+            {"model": model, "reply": reply, "cost": cost, "created": time.time()}
+        ).encode("utf-8")
+        p = self.root / f"{key}.json"
+        tmp = p.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+        self._size -= self._index.pop(key, 0)
+        self._index[key] = len(data)
+        self._size += len(data)
+        while self._size > self.max_bytes and len(self._index) > 1:
+            self._drop(next(iter(self._index)))
+
+    def _drop(self, key: str):
+        self._size -= self._index.pop(key, 0)
+        (self.root / f"{key}.json").unlink(missing_ok=True)
@@ -0,0 +1,181 @@
+"""
+Checkpoints of a running simulation.
+
+A checkpoint is a JSON file (``checkpoint.json`` in the run folder) holding
+the run's configuration, the clock, team state, spend, the random generator
+and the pending events.  Events are stored as references to the method that
+handles them (``["sim", "lunch_break"]`` or ``[agent_id, "work"]``) and, for
+recurring events, the name and position of their rule, so nothing is pickled.
+The sizes of the append-only output files are stored as well; on resume they
+are cut back to those sizes, so anything logged after the checkpoint is
+replayed rather than duplicated.  The response cache, recorded transcript and
+replayed transcript are stored by path and reopened on resume, so a run that
+never touched the API does not start paying for calls.  Files are replaced
+atomically.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from .cache import ResponseCache
+from .eventqueue import BACKENDS, Event
+from .pricing import CompletionStats
+from .transcript import Recorder, Replayer
+
+FILENAME = "checkpoint.json"
+VERSION = 1
+
+
+def _ref(sim, owners: dict, fn) -> list[str]:
+    owner = getattr(fn, "__self__", None)
+    if owner is sim:
+        return ["sim", fn.__name__]
+    if id(owner) in owners:
+        return [owners[id(owner)], fn.__name__]
+    raise ValueError(f"cannot checkpoint event handler {fn!r}")
+
+
+def _resolve(sim, ref: list[str]):
+    owner, name = ref
+    return getattr(sim if owner == "sim" else sim.agents[owner], name)
+
+
+def _sources(sim) -> dict:
+    """Where the run's LLM replies come from and go to."""
+    cache, recorder, replay = sim.cache, sim.recorder, sim.replay
+    return {
+        "cache": None if cache is None else {
+            "root": str(cache.root.resolve()), "max_bytes": cache.max_bytes,
+            "ttl": cache.ttl,
+        },
+        "recorder": None if recorder is None else {
+            "path": str(recorder.path.resolve()), "size": recorder.path.stat().st_size,
+        },
+        "replay": None if replay is None else {
+            "path": str(replay.path.resolve()), "latency": replay.latency,
+        },
+    }
+
+
+def open_sources(config: dict) -> dict:
+    """Reopens the cache and transcripts named in a saved config."""
+    config = dict(config)
+    cache = config.pop("cache", None)
+    if cache is not None:
+        config["cache"] = ResponseCache(Path(cache["root"]), cache["max_bytes"],
+                                        cache["ttl"])
+    recorder = config.pop("recorder", None)
+    if recorder is not None:
+        # calls recorded after the checkpoint are about to be made again
+        os.truncate(recorder["path"], recorder["size"])
+        config["recorder"] = Recorder(Path(recorder["path"]))
+    replay = config.pop("replay", None)
+    if replay is not None:
+        config["replay"] = Replayer(Path(replay["path"]), latency=replay["latency"])
+    return config
+
+
+def snapshot(sim) -> dict:
+    """Captures sim between two events; nothing may be in flight."""
+    owners = {id(agent): key for key, agent in sim.agents.items()}
+    events = []
+    for evt in sorted(sim.events):
+        entry = {"t": evt.t, "fn": _ref(sim, owners, evt.fn), "desc": evt.desc,
+                 "priority": evt.priority, "tag": evt.tag}
+        if evt.rule is not None:
+            entry["rule"], entry["n"] = evt.rule.name, evt.rule.n
+        events.append(entry)
+    version, internal, gauss = sim.rng.getstate()
+    return {
+        "version": VERSION,
+        "config": {
+            "prompt": sim.prompt,
+            "days": sim.days,
+            "start_hour": sim.start_hour,
+            "end_hour": sim.end_hour,
+            "seconds_per_hour": sim.seconds_per_hour,
+            "budget": sim.budget,
+            "concurrent": sim.concurrent,
+            "http_limit": sim.http.limit,
+            "queue": next(k for k, v in BACKENDS.items() if type(sim.events) is v),
+            "sandbox_pool": sim.sandbox_size,
+            "stream": sim.stream,
+            "llm_concurrency": sim.limiter.concurrency,
+            "llm_tpm": sim.limiter.tpm,
+            "gossip_batch": sim.gossip_batch,
+            "checkpoint_every": sim.checkpoint_every,
+            "metrics": sim.metrics is not None,
+            "seed": sim.seed,
+            **_sources(sim),
+        },
+        "team": [{"id": key, "role": a.role, "name": a.name, "model": a.model}
+                 for key, a in sim.agents.items()],
+        "prices": sim.prices.prices,
+        "now": sim.now,
+        "dispatched": sim.dispatched,
+        "halted": sim.halted,
+        "cost": sim.cost,
+        "qa_status": sim.qa_status,
+        "morale": sim.state.morale.tolist(),
+        "fatigue": sim.state.fatigue.tolist(),
+        "agent_cost": sim.state.cost.tolist(),
+        "spend_by_model": sim.spend_by_model,
+        "admission": sim.admission,
+        "completions": sim.completions.to_json(),
+        "rng": [version, list(internal), gauss],
+        "gossip": {key: list(a._gossip) for key, a in sim.agents.items() if a._gossip},
+        "files": {
+            p.name: p.stat().st_size
+            for p in (sim.timeline_path, sim.gossip_path, sim.event_log.path)
+        },
+        "event_index": sim.event_log.index.to_json(),
+        "replay": None if sim.replay is None else sim.replay.state(),
+        "events": events,
+    }
+
+
+def restore(sim, data: dict, rules: dict):
+    """Loads state and pending events into a freshly built sim."""
+    sim.now = data["now"]
+    sim.dispatched = data["dispatched"]
+    sim.cost = data["cost"]
+    sim.qa_status = data["qa_status"]
+    sim.state.morale[:] = data["morale"]
+    sim.state.fatigue[:] = data["fatigue"]
+    sim.state.cost[:] = data["agent_cost"]
+    sim.spend_by_model = dict(data["spend_by_model"])
+    sim.admission = dict(data["admission"])
+    sim.completions = CompletionStats.from_json(data["completions"])
+    version, internal, gauss = data["rng"]
+    sim.rng.setstate((version, tuple(internal), gauss))
+    if sim.replay is not None and data.get("replay"):
+        sim.replay.load_state(data["replay"])
+    for key, lines in data["gossip"].items():
+        sim.agents[key]._gossip.extend(lines)
+    # pushed in their original order so ties keep first-in first-out
+    for entry in data["events"]:
+        rule = None
+        if "rule" in entry:
+            rule = rules[entry["rule"]]
+            rule.n = entry["n"]
+        sim._push(Event(entry["t"], _resolve(sim, entry["fn"]), entry["desc"], rule,
+                        priority=entry["priority"], tag=entry["tag"]))
+    sim.halted = data["halted"]
+
+
+def save(path: Path, data: dict):
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load(path: Path) -> dict:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if data.get("version") != VERSION:
+        raise ValueError(f"unsupported checkpoint version {data.get('version')!r}")
+    return data
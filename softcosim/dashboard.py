@@ -0,0 +1,121 @@
+"""
+Live terminal dashboard for a running simulation.
+
+Log lines go into a fixed-size ring buffer instead of being printed, and a
+``rich.live.Live`` display redraws the clock, team gauges, the busiest
+agents, in-flight LLM calls and the latest events at a fixed frame rate from
+its own thread.  Rendering cost therefore depends on the frame rate, not on
+how many events the simulation produces.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+from rich.console import Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.progress_bar import ProgressBar
+from rich.table import Table
+from rich.text import Text
+
+
+class Dashboard:
+    def __init__(self, sim, rows: int = 12, agent_rows: int = 10, fps: float = 4.0):
+        self.sim = sim
+        self.events: deque[tuple[float, str, str]] = deque(maxlen=rows)
+        self.agent_rows = agent_rows
+        self.fps = fps
+        self.frames = 0
+        self._live: Live | None = None
+
+    def push(self, now: float, kind: str, msg: str):
+        """Records a log entry; formatting is left to the next frame."""
+        self.events.append((now, kind, msg))
+
+    def start(self):
+        self._live = Live(
+            get_renderable=self.render,
+            console=self.sim.console,
+            refresh_per_second=self.fps,
+            transient=False,
+        )
+        self._live.start()
+
+    def stop(self):
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+
+    def render(self) -> Group:
+        self.frames += 1
+        return Group(self._header(), self._gauges(), self._agents(),
+                     self._calls(), self._events())
+
+    def _header(self) -> Text:
+        sim = self.sim
+        day = int(sim.now // sim.hours_per_day) + 1 if sim.hours_per_day else 1
+        hour = sim.start_hour + sim.now % sim.hours_per_day if sim.hours_per_day else 0
+        clock = f"{int(hour):02d}:{int(hour % 1 * 60):02d}"
+        wall = time.perf_counter() - sim.start_real
+        status = " [HALTED]" if sim.halted else ""
+        return Text(
+            f"{sim.prompt} | Day {day}/{sim.days} {clock} "
+            f"(sim hour {sim.now:.2f}/{sim.total_hours}) | "
+            f"{sim.dispatched} events | {wall:.1f}s wall{status}",
+            style="bold",
+        )
+
+    def _gauges(self) -> Table:
+        sim = self.sim
+        grid = Table.grid(padding=(0, 1))
+        grid.add_column(width=8)
+        grid.add_column(width=40)
+        grid.add_column()
+        budget = sim.budget if sim.budget > 0 else 1.0
+        for label, value, total, text in (
+            ("Morale", sim.morale, 100.0, f"{sim.morale:.1f}"),
+            ("Fatigue", sim.fatigue, 100.0, f"{sim.fatigue:.1f}"),
+            ("Cost", min(sim.cost, budget), budget,
+             f"${sim.cost:.4f} / ${sim.budget:.2f}"),
+        ):
+            bar = ProgressBar(total=total, completed=value, width=40)
+            grid.add_row(label, bar, text)
+        return grid
+
+    def _agents(self) -> Table:
+        sim = self.sim
+        agents = list(sim.agents.values())
+        cost = sim.state.cost
+        # biggest spenders first; argpartition keeps this cheap for big teams
+        k = min(self.agent_rows, len(agents))
+        top = np.argpartition(-cost, k - 1)[:k] if k < len(agents) else np.arange(k)
+        top = top[np.argsort(-cost[top], kind="stable")]
+        busy = sim.llm_calls
+        table = Table(title=f"Agents ({len(agents)})", expand=True)
+        for col in ("Agent", "Role", "Model", "Morale", "Fatigue", "Spend", "LLM"):
+            table.add_column(col)
+        for i in top:
+            a = agents[i]
+            table.add_row(a.name, a.role, a.model, f"{sim.state.morale[i]:.1f}",
+                          f"{sim.state.fatigue[i]:.1f}", f"${cost[i]:.4f}",
+                          "…" if a.name in busy else "")
+        return table
+
+    def _calls(self) -> Panel:
+        now = time.perf_counter()
+        calls = list(self.sim.llm_calls.items())
+        lines = [f"{name}: {model} ({now - t0:.1f}s)"
+                 for name, (model, t0) in calls[:8]]
+        if len(calls) > 8:
+            lines.append(f"… and {len(calls) - 8} more")
+        return Panel("\n".join(lines) or "none",
+                     title=f"In-flight LLM calls ({len(calls)})")
+
+    def _events(self) -> Panel:
+        lines = []
+        for t, kind, msg in list(self.events):
+            first = msg.split("\n", 1)[0]
+            lines.append(f"[{t:0.2f}] {kind} | {first}")
+        return Panel(Text("\n".join(lines), overflow="ellipsis", no_wrap=True),
+                     title="Latest events")
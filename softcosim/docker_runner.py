@@ -1,49 +1,269 @@
+import asyncio
+import codecs
 import os
-import subprocess
-import tempfile
+import time
+import uuid
+from pathlib import Path
 
 DOCKER_IMAGE = "python:3.12-slim"
+DEFAULT_TIMEOUT = 300.0
+RESOURCE_LIMITS = ["--cpus=0.5", "--memory=512m"]
+SKIPPED = "PASS (docker skipped)"
+CHECKER = Path(__file__).resolve().parent / "checker.py"
+# the manifest lives in the run's qa/ folder so unchanged files are skipped
+# on every later QA run
+CHECK_COMMAND = ["python", "/opt/checker.py", "src", "--manifest", "qa/manifest.json"]
+# exit codes of `docker exec` itself failing rather than the job
+DOCKER_ERRORS = {125, 126, 127}
+SPAWN_RETRIES = 3
 
-def run_pytest(root: str) -> str:
+def _mounts(root: str) -> list[str]:
+    """The run's sources (read-only), its qa folder and the checker script."""
+    return [
+        "-v", f"{Path(root) / 'src'}:/work/src:ro",
+        "-v", f"{Path(root) / 'qa'}:/work/qa",
+        "-v", f"{CHECKER}:/opt/checker.py:ro",
+        "-w", "/work",
+    ]
+
+
+async def run_pytest(root: str, on_output=None,
+                     timeout: float = DEFAULT_TIMEOUT) -> str:
     """
-    Run a syntax check inside Docker and return the result.
+    Syntax-check the run folder's src/ inside Docker and return the output,
+    which ends with the checker's JSON report.
+    Output is passed to on_output(text) as it arrives.  The container is
+    killed when the timeout expires or the awaiting task is cancelled.
     """
+    emit = on_output or (lambda text: None)
     if os.getenv("SOFTCOSIM_NO_DOCKER") == "1":
-        return "PASS (docker skipped)"
-    # Create a temporary directory on the host that can be mounted as writable
-    with tempfile.TemporaryDirectory() as tmp:
-        # A single-line command using compileall is the most robust solution.
-        bash_command = (
-            "cp -a /mnt/. /tmp/work/ && "
-            "cd /tmp/work && "
-            "python softcosim/checker.py"
+        emit(SKIPPED)
+        return SKIPPED
+    name = f"softcosim-qa-{uuid.uuid4().hex[:12]}"
+    cmd = [
+        "docker",
+        "run",
+        "--rm",
+        "--name",
+        name,
+        *RESOURCE_LIMITS,
+        *_mounts(root),
+        DOCKER_IMAGE,
+        *CHECK_COMMAND,
+    ]
+    output, _ = await _stream(cmd, emit, timeout, kill=["docker", "kill", name])
+    return output
+
+
+async def _stream(cmd: list[str], emit, timeout: float, kill: list[str] | None = None):
+    """
+    Runs cmd, passing its merged stdout/stderr to emit as it arrives.
+    Returns (output, exit_code); exit_code is None after a timeout.  On timeout
+    or cancellation the process is killed, after running the kill command.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+    except FileNotFoundError:
+        msg = "Error: Docker command not found. Is Docker installed and in your PATH?"
+        emit(msg)
+        return msg, 127
+
+    chunks: list[str] = []
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    async def pump():
+        while True:
+            data = await proc.stdout.read(4096)
+            if not data:
+                break
+            text = decoder.decode(data)
+            if text:
+                chunks.append(text)
+                emit(text)
+        await proc.wait()
+
+    try:
+        await asyncio.wait_for(pump(), timeout)
+    except asyncio.TimeoutError:
+        await _kill(proc, kill)
+        msg = f"\nError: sandbox timed out after {timeout:g}s\n"
+        chunks.append(msg)
+        emit(msg)
+        return "".join(chunks), None
+    except asyncio.CancelledError:
+        await _kill(proc, kill)
+        raise
+    return "".join(chunks), proc.returncode
+
+
+async def _docker(*args: str) -> tuple[int, str]:
+    """Runs a short docker command and returns (exit_code, output)."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "docker", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
         )
-        cmd = [
-            "docker",
-            "run",
-            "--rm",
-            "--cpus=0.5",
-            "--memory=512m",
-            "-v",
-            f"{root}:/mnt:ro",
-            "-v",
-            f"{tmp}:/tmp/work",
-            "-w",
-            "/tmp/work",
-            DOCKER_IMAGE,
-            "bash",
-            "-c",
-            bash_command,
-        ]
-        
+    except FileNotFoundError:
+        return 127, "Docker command not found"
+    out, _ = await proc.communicate()
+    return proc.returncode, out.decode("utf-8", errors="replace").strip()
+
+
+async def _kill(proc: asyncio.subprocess.Process, kill: list[str] | None):
+    """Stops the container and the docker client process."""
+    if kill is not None:
         try:
-            completed = subprocess.run(
-                cmd,
-                shell=False,
-                capture_output=True,
-                text=True,
-                check=False,  # Don't raise exception on non-zero exit
+            killer = await asyncio.create_subprocess_exec(
+                *kill,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
             )
-            return completed.stdout + completed.stderr
+            await killer.wait()
         except FileNotFoundError:
-            return "Error: Docker command not found. Is Docker installed and in your PATH?"
+            pass
+    if proc.returncode is None:
+        proc.kill()
+        await proc.wait()
+
+
+class SandboxPool:
+    """
+    Warm pool of long-lived, resource-limited sandbox containers.
+
+    ``start()`` launches ``size`` idle containers with the run's sources
+    mounted read-only.  Each ``run()`` borrows one, clears its scratch space
+    and runs the checker through ``docker exec``.  Containers that time out,
+    get cancelled or fail at the docker level are removed and replaced; a
+    replacement that cannot be started after ``SPAWN_RETRIES`` attempts shrinks
+    the pool.  A job that finds no container within ``timeout`` seconds, or no
+    pool left, runs in a one-off container instead.  Every job records how long
+    it waited for a container and how long the exec took.  ``close()`` removes
+    all containers.
+    """
+
+    JOB = "rm -rf /tmp/* && exec " + " ".join(CHECK_COMMAND)
+
+    def __init__(self, root: str, size: int = 2, timeout: float = DEFAULT_TIMEOUT,
+                 retry_delay: float = 1.0):
+        self.root = root
+        self.size = size
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.jobs: list[dict] = []
+        self.recycled = 0
+        self.live = 0  # containers running or being replaced
+        self.lost = 0
+        self.errors: list[str] = []
+        self.skip = os.getenv("SOFTCOSIM_NO_DOCKER") == "1"
+        # None marks an empty pool and wakes every waiter
+        self._idle: asyncio.Queue[str | None] = asyncio.Queue()
+        self._containers: set[str] = set()
+        self._replacing: set[asyncio.Task] = set()
+
+    async def start(self):
+        if self.skip:
+            return
+        names = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+        self.live = len(names)
+        for name in names:
+            self._idle.put_nowait(name)
+
+    async def _spawn(self) -> str:
+        name = f"softcosim-sbx-{uuid.uuid4().hex[:12]}"
+        code, out = await _docker(
+            "run", "-d", "--rm", "--name", name, *RESOURCE_LIMITS,
+            *_mounts(self.root), DOCKER_IMAGE, "sleep", "infinity",
+        )
+        if code != 0:
+            raise RuntimeError(f"Could not start sandbox container: {out}")
+        self._containers.add(name)
+        return name
+
+    async def run(self, on_output=None) -> tuple[str, dict]:
+        """Runs one check job; returns (output, job metrics)."""
+        emit = on_output or (lambda text: None)
+        if self.skip:
+            emit(SKIPPED)
+            return SKIPPED, {"queue_wait": 0.0, "exec_time": 0.0}
+        t0 = time.perf_counter()
+        name = None
+        if self.live > 0:
+            try:
+                # a job holds a container for at most timeout, so waiting
+                # longer means the pool is stuck
+                name = await asyncio.wait_for(self._idle.get(), self.timeout)
+            except asyncio.TimeoutError:
+                pass
+            if name is None and self.live == 0:
+                self._idle.put_nowait(None)  # pass the news on to the next waiter
+        t1 = time.perf_counter()
+        if name is None:
+            output = await run_pytest(self.root, on_output=emit, timeout=self.timeout)
+            job = {"container": None, "fallback": True, "queue_wait": t1 - t0,
+                   "exec_time": time.perf_counter() - t1}
+            self.jobs.append(job)
+            return output, job
+        job = {"container": name, "queue_wait": t1 - t0}
+        healthy = False
+        try:
+            output, code = await _stream(
+                ["docker", "exec", name, "bash", "-c", self.JOB], emit, self.timeout
+            )
+            healthy = code is not None and code not in DOCKER_ERRORS
+            job["exit_code"] = code
+        finally:
+            job["exec_time"] = time.perf_counter() - t1
+            self.jobs.append(job)
+            if healthy:
+                self._idle.put_nowait(name)
+            else:
+                task = asyncio.create_task(self._replace(name))
+                self._replacing.add(task)
+                task.add_done_callback(self._replacing.discard)
+        return output, job
+
+    async def _replace(self, name: str):
+        self.recycled += 1
+        self._containers.discard(name)
+        await _docker("rm", "-f", name)
+        for attempt in range(SPAWN_RETRIES):
+            if attempt:
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+            try:
+                self._idle.put_nowait(await self._spawn())
+                return
+            except RuntimeError as e:
+                error = str(e)
+        self.lost += 1
+        self.live -= 1
+        self.errors.append(error)
+        if self.live == 0:
+            self._idle.put_nowait(None)
+
+    async def close(self):
+        if self._replacing:
+            await asyncio.gather(*self._replacing, return_exceptions=True)
+        names, self._containers = list(self._containers), set()
+        if names:
+            await _docker("rm", "-f", *names)
+
+    def summary(self) -> str:
+        if not self.jobs:
+            return "0 jobs"
+        n = len(self.jobs)
+        wait = sum(j["queue_wait"] for j in self.jobs) / n
+        run = sum(j["exec_time"] for j in self.jobs) / n
+        text = (
+            f"{n} jobs, avg queue wait {wait:.2f}s, avg exec {run:.2f}s, "
+            f"{self.recycled} containers recycled"
+        )
+        if self.lost:
+            fallback = sum(1 for j in self.jobs if j.get("fallback"))
+            text += (f", {self.lost} lost ({self.errors[-1]}), "
+                     f"{fallback} jobs in one-off containers")
+        return text
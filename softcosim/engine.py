@@ -1,18 +1,95 @@
 import asyncio
-import heapq
-import time
+import os
 import random
+import signal
+import time
 from pathlib import Path
-from rich.console import Console
-from .agents import Manager, Developer, QA
 
+import numpy as np
+
+from . import checkpoint
+from .agents import ROLE_CLASSES
+from .cache import ResponseCache
+from .eventlog import (
+    GOSSIP_HEADER,
+    TIMELINE_HEADER,
+    EventLog,
+    console_line,
+    gossip_row,
+    timeline_row,
+)
+from .eventqueue import (
+    BACKGROUND,
+    CRITICAL,
+    NORMAL,
+    Event,
+    EventQueue,
+    make_queue,
+)
+from .llm import SessionPool
+from .metrics import Metrics
+from .pricing import BudgetRefused, CompletionStats, PriceTable, prompt_tokens
+from .ratelimit import RequestScheduler
+from .sink import LogSink
+from .team import (
+    DEFAULT_TEAM,
+    FATIGUE_RATE,
+    GOSSIP_EVERY,
+    MORALE_DECAY,
+    OFFICE_EVENTS,
+    TeamState,
+    expand_team,
+)
+from .transcript import Recorder, Replayer, ReplayMiss
+
+
+class Rule:
+    """
+    A recurring event at start + n * period (absolute sim hours).
+    Only the next occurrence is kept on the heap; it is created when the
+    previous one fires.  target() returns the (fn, desc) of that occurrence.
+    """
+    __slots__ = ("start", "period", "target", "count", "until", "skip", "n",
+                 "priority", "tag", "name")
+    def __init__(self, start: float, period: float, target, *,
+                 count: int | None = None, until: float | None = None, skip=None,
+                 priority: int = NORMAL, tag: str | None = None,
+                 name: str | None = None):
+        self.start, self.period, self.target = start, period, target
+        self.count, self.until, self.skip = count, until, skip
+        self.priority, self.tag, self.name = priority, tag, name
+        self.n = 0
+
+    def next_time(self) -> float | None:
+        while self.count is None or self.n < self.count:
+            t = self.start + self.n * self.period
+            self.n += 1
+            if self.until is not None and t > self.until:
+                return None
+            if t < 0 or (self.skip is not None and self.skip(t)):
+                continue
+            return t
+        return None
+
+OFFICE = {event[0]: event for event in OFFICE_EVENTS}
+
+
+def gossip_rule(hours_per_day: float, total: float, target) -> Rule:
+    """Gossip every half hour of work time, except at the turn of a day."""
+    return Rule(GOSSIP_EVERY, GOSSIP_EVERY, target, until=total,
+                skip=lambda t: t % hours_per_day == 0,
+                priority=BACKGROUND, tag="gossip", name="gossip")
+
+
+def _spend(totals: dict[str, float], top: int = 10) -> str:
+    if not totals:
+        return "none"
+    ranked = sorted(totals.items(), key=lambda kv: (-kv[1], kv[0]))
+    text = ", ".join(f"{k} ${v:.4f}" for k, v in ranked[:top])
+    if len(ranked) > top:
+        text += f" and {len(ranked) - top} more"
+    return text
 
-class Event:
-    __slots__ = ("t", "fn", "desc")
-    def __init__(self, t: float, fn, desc: str = ""):
-        self.t, self.fn, self.desc = t, fn, desc
-    def __lt__(self, other):  # heapq uses this for ordering
-        return self.t < other.t
 
 class CompanySim:
     def __init__(
@@ -25,6 +102,23 @@ class CompanySim:
         end_hour: int = 17,
         seconds_per_hour: float = 1.0,
         budget: float = 0.5,
+        concurrent: bool = False,
+        http_limit: int = 10,
+        cache: ResponseCache | None = None,
+        seed: int | None = None,
+        recorder: Recorder | None = None,
+        replay: Replayer | None = None,
+        queue: str | EventQueue = "heap",
+        sandbox_pool: int = 0,
+        stream: bool = False,
+        prices: PriceTable | None = None,
+        llm_concurrency: int = 4,
+        llm_tpm: int | None = None,
+        gossip_batch: int = 8,
+        team: list[dict] | None = None,
+        dashboard: bool = False,
+        checkpoint_every: float | None = None,
+        metrics: bool = False,
     ):
         self.prompt = prompt
         self.days = days
@@ -34,131 +128,545 @@ class CompanySim:
         self.total_hours = self.hours_per_day * days
         self.root = root
         self.seconds_per_hour = seconds_per_hour
-        self.console = Console()
+        # virtual clock: no real-time pacing and no per-event console output
+        self.virtual = seconds_per_hour <= 0
+        self._console = None  # rich is imported once something is rendered
+        # counters and latency histograms; None keeps the hot paths free of them
+        self.metrics = Metrics() if metrics else None
+        # the dashboard replaces per-line console output
+        self.dashboard = None
+        if dashboard:
+            from .dashboard import Dashboard
+
+            self.dashboard = Dashboard(self)
+        live_lines = not (self.virtual or dashboard)
+        self.sink = LogSink(self.console if live_lines else None)
+        self.llm_calls: dict[str, tuple[str, float]] = {}  # agent -> (model, start)
+        self.dispatched = 0
+        self.wall_time = 0.0
         self.now = 0.0  # simulated hour float
-        self.events: list[Event] = []
+        self.events = make_queue(queue)
+        self.halted = False
         self.start_real = time.perf_counter()
         self.timeline_path = self.root / "timeline.md"
         self.gossip_path = self.root / "gossip.md"
-        self.morale = 75.0
-        self.fatigue = 0.0
-        self.FATIGUE_RATE = 5.0
-        self.MORALE_DECAY = (1.0, 3.0)
+        self.event_log: EventLog | None = None  # created by _prepare_fs
+        self.FATIGUE_RATE = FATIGUE_RATE
+        self.MORALE_DECAY = MORALE_DECAY
         self.cost = 0.0
         self.budget = budget
-        self.agents = {
-            "mgr": Manager(self, "Manager"),
-            "dev": Developer(self, "Dev-A"),
-            "qa": QA(self, "QA"),
-        }
+        self.qa_status: str | None = None
+        # pre-flight admission: estimated cost of calls in flight is reserved
+        self.prices = prices or PriceTable()
+        self.completions = CompletionStats()
+        self.reserved = 0.0
+        self._settled = asyncio.Event()
+        self.spend_by_model: dict[str, float] = {}
+        self.admission = {"downgraded": 0, "deferred": 0, "refused": 0}
+        self.http = SessionPool(limit=http_limit)
+        self.limiter = RequestScheduler(llm_concurrency, llm_tpm, seed=seed)
+        self.cache = cache
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.recorder = recorder
+        self.replay = replay
+        # stream LLM replies so a call can be cut off once it would bust the budget
+        self.stream = stream
+        # warm QA containers; created in start() once the event loop runs
+        self.sandbox_size = sandbox_pool
+        self.sandbox = None
+        # concurrent mode: coroutine events run as tasks, one at a time per agent
+        self.concurrent = concurrent
+        self._inflight: dict[asyncio.Task, Event] = {}
+        self._agent_locks: dict[object, asyncio.Lock] = {}
+        self._wakeup: asyncio.Event | None = None
+        # gossip lines fetched per LLM call; refills are queued as events
+        self.gossip_batch = gossip_batch
+        # agents hold only their index; per-agent numbers live in self.state
+        self.agents = {}
+        members = expand_team(team) if team is not None else DEFAULT_TEAM
+        for idx, spec in enumerate(members):
+            cls = ROLE_CLASSES[spec["role"]]
+            self.agents[spec["id"]] = cls(self, spec["name"], idx, spec.get("model"))
+        self.state = TeamState(len(self.agents))
+        self._roles: dict[str, list] = {}
+        for agent in self.agents.values():
+            self._roles.setdefault(agent.role, []).append(agent)
+        # checkpoints every N sim hours (0: only on Ctrl-C); None turns them off
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_path = self.root / checkpoint.FILENAME
+        self.checkpoints = 0
+        self.interrupted = False
+        self._next_checkpoint = checkpoint_every or 0.0
+        self._resume: dict | None = None
+
+    @property
+    def console(self):
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        return self._console
+
+    @console.setter
+    def console(self, value):
+        self._console = value
+
+    @property
+    def morale(self) -> float:
+        """Team average."""
+        return float(self.state.morale.mean())
+
+    @morale.setter
+    def morale(self, value: float):
+        self.state.morale.fill(value)
+
+    @property
+    def fatigue(self) -> float:
+        """Team average."""
+        return float(self.state.fatigue.mean())
+
+    @fatigue.setter
+    def fatigue(self, value: float):
+        self.state.fatigue.fill(value)
+
+    @property
+    def spend_by_agent(self) -> dict[str, float]:
+        names = [a.name for a in self.agents.values()]
+        cost = self.state.cost
+        return {names[i]: float(cost[i]) for i in np.flatnonzero(cost)}
+
+    def members(self, role: str) -> list:
+        return self._roles.get(role, [])
+
+    @classmethod
+    def resume(cls, root: Path, **overrides) -> "CompanySim":
+        """Rebuilds a run from root's checkpoint; start() continues it."""
+        data = checkpoint.load(Path(root) / checkpoint.FILENAME)
+        config = {**checkpoint.open_sources(data["config"]), **overrides}
+        sim = cls(config.pop("prompt"), config.pop("days"), Path(root),
+                  team=data["team"], prices=PriceTable(data["prices"]), **config)
+        sim._resume = data
+        return sim
+
+    def _trap_sigint(self):
+        """Checkpoints and stops on Ctrl-C; returns the previous handler."""
+        loop = asyncio.get_running_loop()
+
+        def on_sigint(signum, frame):
+            # flag at once: a virtual-clock loop may not yield for a while
+            self.interrupted = True
+            loop.call_soon_threadsafe(self.interrupt)
+
+        try:
+            return signal.signal(signal.SIGINT, on_sigint)
+        except ValueError:
+            return None  # only the main thread can handle signals
+
+    async def checkpoint(self):
+        """Writes a checkpoint; call between events with nothing in flight."""
+        await self.sink.flush()
+        checkpoint.save(self.checkpoint_path, checkpoint.snapshot(self))
+        self.checkpoints += 1
 
     async def start(self):
-        self._prepare_fs()
-        self._schedule_initial_events()
-        await self._run_loop()
+        previous_sigint = None
+        try:
+            if self._resume is None:
+                self._prepare_fs()
+                self._schedule_initial_events()
+            else:
+                self._restore()
+            # keep the real-time pacing of a resumed run where it left off
+            self.start_real = (time.perf_counter()
+                               - self.now * max(self.seconds_per_hour, 0))
+            if self.dashboard is not None:
+                self.dashboard.start()
+            if self.checkpoint_every is not None:
+                previous_sigint = self._trap_sigint()
+            if self.sandbox_size > 0:
+                from .docker_runner import SandboxPool
+
+                self.sandbox = SandboxPool(str(self.root), size=self.sandbox_size)
+                await self.sandbox.start()
+            await self._run_loop()
+        finally:
+            if previous_sigint is not None:
+                signal.signal(signal.SIGINT, previous_sigint)
+            if self.dashboard is not None:
+                self.dashboard.stop()
+            if self.sandbox is not None:
+                await self.sandbox.close()
+            await self.http.close()
+            await self.sink.close()
+            # None when setting up the run folder failed; keep that error
+            if self.event_log is not None:
+                self.event_log.write_index()
+            if self.recorder is not None:
+                self.recorder.close()
+        self.wall_time = time.perf_counter() - self.start_real
+        if self.metrics is not None:
+            self.metrics.export(self.root)
+        if self.interrupted:
+            self.console.print(
+                f"Interrupted at sim hour {self.now:.2f}. Continue from the "
+                f"last checkpoint with: softcosim resume {self.root}"
+            )
+            return
+        if self.virtual:
+            rate = self.dispatched / self.wall_time if self.wall_time else 0.0
+            self.console.print(
+                f"{self.dispatched} events in {self.wall_time:.3f}s wall time "
+                f"({rate:,.0f} events/s)"
+            )
         readme = self.root / "README.md"
         summary = (
             "# Simulation Summary\n\n"
             f"Prompt: {self.prompt}\n\n"
             f"Days: {self.days}\n\n"
-            f"Final cost: ${self.cost:.4f}\n"
+            f"Final cost: ${self.cost:.4f}\n\n"
+            f"HTTP requests: {self.http.requests} "
+            f"({self.http.reused} on reused connections, "
+            f"{self.http.created} new)\n"
+            f"\nSpend by agent: {_spend(self.spend_by_agent)}\n"
+            f"\nSpend by model: {_spend(self.spend_by_model)}\n"
+            f"\nLLM admission: {self.admission['downgraded']} downgraded, "
+            f"{self.admission['deferred']} deferred, "
+            f"{self.admission['refused']} refused\n"
+            f"\nLLM request queue: {self.limiter.summary()}\n"
         )
+        if self.cache is not None:
+            summary += (
+                f"\nLLM cache: {self.cache.hits} hits, {self.cache.misses} misses, "
+                f"${self.cache.saved_usd:.4f} saved\n"
+            )
+        if self.replay is not None:
+            summary += (
+                f"\nReplayed LLM calls: {self.replay.calls} "
+                f"({self.replay.misses} not in transcript)\n"
+            )
+        if self.sandbox is not None:
+            summary += f"\nQA sandbox pool: {self.sandbox.summary()}\n"
         readme.write_text(summary, encoding="utf-8")
 
+    def interrupt(self):
+        """Checkpoints and stops the run before the next event (SIGINT)."""
+        self.interrupted = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _restore(self):
+        data = self._resume
+        (self.root / "src").mkdir(exist_ok=True)
+        (self.root / "qa").mkdir(exist_ok=True)
+        # drop whatever was logged after the checkpoint; it is about to be replayed
+        for name, size in data["files"].items():
+            os.truncate(self.root / name, size)
+        self.event_log = EventLog(self.root / "events.jsonl", self.sink,
+                                  index=data["event_index"])
+        self._gossipers = list(self.agents.values())
+        checkpoint.restore(self, data, self._rules())
+        if self.checkpoint_every:
+            every = self.checkpoint_every
+            self._next_checkpoint = (self.now // every + 1) * every
+
     def _prepare_fs(self):
-        self.timeline_path.write_text(
-            "# Timeline\n\n| Sim Time | Kind | Message | Morale | Fatigue | Cost |\n|:---:|:---|:---|:---:|:---:|:---:|\n"
-        )
-        self.gossip_path.write_text(
-            "# Gossip Log\n\n| Sim Time | Speaker | Line |\n|:---:|:---|:---|\n"
-        )
+        # mounted into the QA sandbox, so they must exist before it starts
+        (self.root / "src").mkdir(exist_ok=True)
+        (self.root / "qa").mkdir(exist_ok=True)
+        self.timeline_path.write_text(TIMELINE_HEADER)
+        self.event_log = EventLog(self.root / "events.jsonl", self.sink)
+        self.gossip_path.write_text(GOSSIP_HEADER)
 
-    def log(self, msg, kind="INFO"):
-        line_console = (
-            f"[{self.now:0.2f}] {kind} | {msg} | "
-            f"Morale {self.morale:05.1f} | Fatigue {self.fatigue:05.1f} | Cost ${self.cost:.4f}"
-        )
-        line_file = (
-            f"| {self.now:0.2f} | {kind} | {msg} | "
-            f"{self.morale:0.1f} | {self.fatigue:0.1f} | {self.cost:.4f} |\n"
+    def log(self, msg, kind="INFO", agent=None):
+        morale, fatigue = self.morale, self.fatigue
+        self.sink.append(
+            self.timeline_path,
+            timeline_row(self.now, kind, msg, morale, fatigue, self.cost),
         )
-        self.console.print(line_console)
-        with self.timeline_path.open("a", encoding="utf-8") as f:
-            f.write(line_file)
+        if self.event_log is not None:
+            self.event_log.append(self.now, kind, agent, msg, morale, fatigue,
+                                  self.cost)
+        if self.dashboard is not None:
+            self.dashboard.push(self.now, kind, msg)
+        elif self.sink.console is not None:
+            self.sink.print(console_line(self.now, kind, msg, morale, fatigue,
+                                         self.cost))
 
     def add_cost(self, delta: float):
         self.cost += delta
         if self.cost > self.budget:
             self.log("Budget exceeded – halting simulation", kind="INFO")
-            self.events.clear()
+            self.halt()
+            self.sink.flush_soon()
+
+    async def admit(self, agent, model: str, messages: list[dict]) -> tuple[str, float]:
+        """
+        Predicts the cost of a call before it is sent and reserves it.
+        Returns (model, estimate).  A call that does not fit what is left of
+        the budget waits for in-flight calls to settle if that would make
+        room, else is downgraded to the priciest cheaper model that fits, else
+        refused with BudgetRefused.
+        """
+        prompt = prompt_tokens(messages)
+        completion = self.completions.expect(model)
+        estimate = self.prices.cost(model, prompt, completion)
+        chosen = model
+        deferred = False
+        while estimate > self.budget - self.cost - self.reserved:
+            left = self.budget - self.cost - self.reserved
+            if self.reserved > 0 and estimate <= self.budget - self.cost:
+                if not deferred:
+                    deferred = True
+                    self.admission["deferred"] += 1
+                    self.log(f"{agent.name} LLM call deferred "
+                             f"(needs ~${estimate:.4f}, ${left:.4f} unreserved)",
+                             agent=agent.name)
+                await self._settled.wait()
+                continue
+            for cheaper in self.prices.cheaper(model, prompt, completion):
+                cost = self.prices.cost(cheaper, prompt, completion)
+                if cost <= left:
+                    self.admission["downgraded"] += 1
+                    self.log(f"{agent.name} LLM call downgraded from {model} "
+                             f"to {cheaper} (~${cost:.4f}, ${left:.4f} left)",
+                             agent=agent.name)
+                    chosen, estimate = cheaper, cost
+                    break
+            else:
+                self.admission["refused"] += 1
+                raise BudgetRefused(
+                    f"{agent.name} LLM call refused: needs ~${estimate:.4f}, "
+                    f"${max(left, 0.0):.4f} left"
+                )
+        self.reserved += estimate
+        return chosen, estimate
+
+    def settle(self, agent, model: str, estimate: float,
+               reply: str | None = None, cost: float = 0.0):
+        """Releases a call's reservation and books what it really cost."""
+        self.reserved -= estimate
+        self._settled.set()
+        self._settled = asyncio.Event()
+        if reply is None:
+            return
+        self.completions.observe(model, reply)
+        self.state.cost[agent.idx] += cost
+        self.spend_by_model[model] = self.spend_by_model.get(model, 0.0) + cost
+        self.add_cost(cost)
+
+    def halt(self):
+        """
+        Cancels all pending work; only the deadline stays on the queue.
+        A running QA sandbox is cancelled too, which kills its container.
+        """
+        self.halted = True
+        for tag in self.events.tags():
+            if tag != "deadline":
+                self.events.cancel_tag(tag)
+        for task, evt in list(self._inflight.items()):
+            if evt.tag == "qa":
+                task.cancel()
 
     def _append_gossip(self, speaker: str, line: str):
-        with self.gossip_path.open("a", encoding="utf-8") as f:
-            f.write(f"| {self.now:0.2f} | {speaker} | {line} |\n")
+        self.sink.append(self.gossip_path, gossip_row(self.now, speaker, line))
+
+    def _office_event(self, key: str):
+        _, _, desc, morale, fatigue = OFFICE[key]
+        self.state.apply(morale, fatigue)
+        self.log(desc, kind="EVENT")
 
     def coffee_break(self):
-        self.morale = min(100.0, self.morale + 5)
-        self.fatigue = max(0.0, self.fatigue - 10)
-        self.log("Coffee break", kind="EVENT")
+        self._office_event("coffee")
 
     def lunch_break(self):
-        self.fatigue = max(0.0, self.fatigue - 20)
-        self.log("Lunch break", kind="EVENT")
+        self._office_event("lunch")
 
     def team_meeting(self):
-        self.morale = max(0.0, self.morale - 5)
-        self.log("Team meeting", kind="EVENT")
+        self._office_event("meeting")
+
+    def schedule(self, delay_hr: float, fn, desc="", *,
+                 priority: int = NORMAL, tag: str | None = "work") -> Event:
+        """Queues fn at now + delay_hr; the returned event can be cancelled."""
+        return self._push(Event(self.now + delay_hr, fn, desc,
+                                priority=priority, tag=tag))
 
-    def schedule(self, delay_hr: float, fn, desc=""):
-        heapq.heappush(self.events, Event(self.now + delay_hr, fn, desc))
+    def add_rule(self, rule: Rule):
+        """Starts a recurring event by queueing its first occurrence."""
+        t = rule.next_time()
+        if t is not None:
+            fn, desc = rule.target()
+            self._push(Event(t, fn, desc, rule, priority=rule.priority, tag=rule.tag))
+
+    def _push(self, evt: Event) -> Event:
+        if self.halted and evt.tag != "deadline":
+            evt.cancelled = True
+            return evt
+        self.events.push(evt)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return evt
 
     def _advance_time(self, delta_hr: float):
         if delta_hr > 0:
-            self.fatigue = min(100.0, self.fatigue + delta_hr * self.FATIGUE_RATE)
+            self.state.tire(delta_hr * self.FATIGUE_RATE)
 
     def _schedule_initial_events(self):
-        self.schedule(0, self.agents["mgr"].act, "Manager kickoff")
-
-        for day in range(self.days):
-            base = day * self.hours_per_day
-
-            # daily coffee break, lunch, and meeting
-            coffee = base + (10 - self.start_hour)
-            lunch = base + (12 - self.start_hour)
-            meeting = base + (15 - self.start_hour)
-            if 0 <= coffee <= self.total_hours:
-                self.schedule(coffee, self.coffee_break, "Coffee break")
-            if 0 <= lunch <= self.total_hours:
-                self.schedule(lunch, self.lunch_break, "Lunch break")
-            if 0 <= meeting <= self.total_hours:
-                self.schedule(meeting, self.team_meeting, "Team meeting")
-
-            # gossip every half hour of work time
-            t = base + 0.5
-            end = base + self.hours_per_day
-            while t < end:
-                agent = random.choice(list(self.agents.values()))
-                self.schedule(t, agent.gossip, f"{agent.name} gossips")
-                t += 0.5
-
-        self.schedule(self.total_hours, lambda: self.log("Deadline reached – stopping"))
+        self.schedule(0, self.members("manager")[0].act, "Manager kickoff",
+                      priority=CRITICAL)
+
+        self._gossipers = list(self.agents.values())
+        for rule in self._rules().values():
+            self.add_rule(rule)
+
+        self.schedule(self.total_hours, self.deadline, "Deadline", tag="deadline")
+
+    def _rules(self) -> dict[str, Rule]:
+        """The recurring events of a run, by name."""
+        # daily coffee break, lunch, and meeting
+        hpd, total = self.hours_per_day, self.total_hours
+        handlers = {"coffee": self.coffee_break, "lunch": self.lunch_break,
+                    "meeting": self.team_meeting}
+        rules = {}
+        for key, hour, desc, _, _ in OFFICE_EVENTS:
+            fn = handlers[key]
+            rules[key] = Rule(hour - self.start_hour, hpd,
+                              lambda fn=fn, desc=desc: (fn, desc),
+                              count=self.days, until=total, tag="office", name=key)
+        rules["gossip"] = gossip_rule(hpd, total, self._next_gossip)
+        return rules
+
+    def deadline(self):
+        self.log("Deadline reached – stopping")
+
+    def _next_gossip(self):
+        agent = self.rng.choice(self._gossipers)
+        return agent.gossip, f"{agent.name} gossips"
 
     async def _run_loop(self):
-        while self.events:
-            evt = heapq.heappop(self.events)
-            if evt.t > self.total_hours:
+        if self.concurrent:
+            self._wakeup = asyncio.Event()
+        while True:
+            # in-flight work must settle before the deadline fires or the run ends
+            evt = self.events.peek()
+            if self._inflight and (evt is None or evt.t >= self.total_hours):
+                await self._drain()
+                continue
+            if evt is None or evt.t > self.total_hours:
                 break
+            if self.interrupted or (
+                self.checkpoint_every and evt.t >= self._next_checkpoint
+            ):
+                # checkpoints are taken between events, with nothing in flight
+                if self._inflight:
+                    await self._drain()
+                    continue
+                try:
+                    await self.checkpoint()
+                except ValueError as e:  # an event that cannot be stored
+                    self.log(f"Checkpoint skipped: {e}")
+                if self.interrupted:
+                    break
+                if self.checkpoint_every:
+                    every = self.checkpoint_every
+                    self._next_checkpoint = (evt.t // every + 1) * every
+                continue
 
-            target_real = self.start_real + (evt.t * self.seconds_per_hour)
-            to_sleep = target_real - time.perf_counter()
+            if self.virtual or self.halted:
+                # jump straight to the next event once earlier work has settled
+                if self._inflight and evt.t > self.now:
+                    await self._drain()
+                    continue
+                to_sleep = 0.0
+            else:
+                target_real = self.start_real + (evt.t * self.seconds_per_hour)
+                to_sleep = target_real - time.perf_counter()
             if to_sleep > 0:
-                await asyncio.sleep(to_sleep)
+                if self.concurrent:
+                    # wake early if a running task schedules something sooner
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), to_sleep)
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(to_sleep)
+            if self.events.peek() is not evt:
+                continue
+            self.events.pop()
+            if evt.rule is not None:
+                self.add_rule(evt.rule)
 
             self._advance_time(evt.t - self.now)
-            self.now = evt.t
-            if asyncio.iscoroutinefunction(evt.fn):
-                await evt.fn()
+            self.now = max(self.now, evt.t)
+            self.dispatched += 1
+            t0 = time.perf_counter() if self.metrics is not None else 0.0
+            if self.concurrent:
+                task = self._dispatch(evt)
+                if task is not None and self.metrics is not None:
+                    task.add_done_callback(
+                        lambda _, evt=evt, t0=t0: self._measure(evt, t0))
+                    continue
+            elif asyncio.iscoroutinefunction(evt.fn):
+                await self._guarded(evt.fn())
             else:
                 res = evt.fn()
                 if asyncio.iscoroutine(res):
-                    await res
+                    await self._guarded(res)
+            if self.metrics is not None:
+                self._measure(evt, t0)
+
+    def _measure(self, evt: Event, t0: float):
+        """Records dispatch lag and handler time of an event started at t0."""
+        handler = getattr(evt.fn, "__name__", "event")
+        self.metrics.inc("events_total", handler=handler)
+        if not self.virtual:
+            target = self.start_real + evt.t * self.seconds_per_hour
+            self.metrics.observe("event_lag_seconds", max(0.0, t0 - target))
+        self.metrics.observe("handler_seconds", time.perf_counter() - t0,
+                             handler=handler)
+
+    def _dispatch(self, evt: Event) -> asyncio.Task | None:
+        """Runs plain callables inline and starts coroutines as tasks."""
+        res = evt.fn()
+        if not asyncio.iscoroutine(res):
+            return None
+        task = asyncio.create_task(self._serialized(evt.fn, res))
+        self._inflight[task] = evt
+        task.add_done_callback(lambda t: self._inflight.pop(t, None))
+        return task
+
+    async def _serialized(self, fn, coro):
+        """Awaits coro while holding the lock of the agent that owns fn."""
+        owner = getattr(fn, "__self__", None)
+        if owner is None or owner is self:
+            return await self._guarded(coro)
+        lock = self._agent_locks.setdefault(owner, asyncio.Lock())
+        async with lock:
+            return await self._guarded(coro)
+
+    async def _guarded(self, coro):
+        """
+        Awaits coro; a refused LLM call ends the action and the run, a call
+        missing from the replayed transcript only the action.
+        """
+        try:
+            return await coro
+        except ReplayMiss as e:
+            self.log(f"{e} – action skipped")
+        except BudgetRefused as e:
+            self.log(str(e))
+            if not self.halted:
+                self.log("Budget exhausted – halting simulation")
+                self.halt()
+                self.sink.flush_soon()
+
+    async def _drain(self):
+        """Waits for every in-flight task, re-raising the first failure."""
+        results = await asyncio.gather(*self._inflight, return_exceptions=True)
+        for res in results:
+            if isinstance(res, BaseException) and not isinstance(
+                res, asyncio.CancelledError
+            ):
+                raise res
@@ -0,0 +1,212 @@
+"""
+Structured, append-only event log of a simulation run.
+
+Every ``CompanySim.log`` call appends one JSON line to ``events.jsonl`` with
+fixed fields:
+
+    {"t": 1.5, "kind": "GOSSIP", "agent": "Dev-A", "msg": "...",
+     "morale": 73.2, "fatigue": 7.5, "cost": 0.0012}
+
+A sparse index is kept next to it in ``events.idx.json``: the byte offset at
+which each sim hour starts and, per kind, the hours in which that kind occurs.
+``EventReader`` maps the log into memory and uses the index to read only the
+hours a query can match.  The markdown timeline and gossip tables can be
+rendered from the log with ``render_timeline`` and ``render_gossip``.
+"""
+
+import json
+import mmap
+import os
+from pathlib import Path
+
+TIMELINE_HEADER = (
+    "# Timeline\n\n| Sim Time | Kind | Message | Morale | Fatigue | Cost |\n"
+    "|:---:|:---|:---|:---:|:---:|:---:|\n"
+)
+GOSSIP_HEADER = "# Gossip Log\n\n| Sim Time | Speaker | Line |\n|:---:|:---|:---|\n"
+FIELDS = ("t", "kind", "agent", "msg", "morale", "fatigue", "cost")
+
+
+def index_path(path: Path) -> Path:
+    return Path(path).with_suffix(".idx.json")
+
+
+def timeline_row(t, kind, msg, morale, fatigue, cost) -> str:
+    return (f"| {t:0.2f} | {kind} | {msg} | {morale:0.1f} | {fatigue:0.1f} "
+            f"| {cost:.4f} |\n")
+
+
+def console_line(t, kind, msg, morale, fatigue, cost) -> str:
+    return (f"[{t:0.2f}] {kind} | {msg} | "
+            f"Morale {morale:05.1f} | Fatigue {fatigue:05.1f} | Cost ${cost:.4f}")
+
+
+def gossip_row(t, speaker, line) -> str:
+    return f"| {t:0.2f} | {speaker} | {line} |\n"
+
+
+class _Index:
+    """hours[h] is the offset of the first record at or after sim hour h."""
+
+    def __init__(self):
+        self.size = 0
+        self.records = 0
+        self.hours: list[int] = []
+        self.kinds: dict[str, list[int]] = {}
+
+    def add(self, t: float, kind: str, length: int):
+        hour = int(t)
+        while len(self.hours) <= hour:
+            self.hours.append(self.size)
+        seen = self.kinds.setdefault(kind, [])
+        if not seen or seen[-1] != hour:
+            seen.append(hour)
+        self.size += length
+        self.records += 1
+
+    def span(self, hour: int) -> tuple[int, int]:
+        end = self.hours[hour + 1] if hour + 1 < len(self.hours) else self.size
+        return self.hours[hour], end
+
+    def to_json(self) -> dict:
+        return {"size": self.size, "records": self.records,
+                "hours": self.hours, "kinds": self.kinds}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "_Index":
+        index = cls()
+        index.size, index.records = data["size"], data["records"]
+        index.hours, index.kinds = data["hours"], data["kinds"]
+        return index
+
+
+class EventLog:
+    """Writes records through the run's LogSink and builds the index as it goes."""
+
+    def __init__(self, path: Path, sink, index: dict | None = None):
+        """Starts an empty log, or appends to one described by index."""
+        self.path = Path(path)
+        self.sink = sink
+        if index is None:
+            self.index = _Index()
+            self.path.write_bytes(b"")
+        else:
+            self.index = _Index.from_json(index)
+
+    def append(self, t: float, kind: str, agent: str | None, msg: str,
+               morale: float, fatigue: float, cost: float):
+        # sim time never goes backwards, so records are sorted by t
+        record = dict(zip(FIELDS, (t, kind, agent, msg, morale, fatigue, cost)))
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self.index.add(t, kind, len(line.encode("utf-8")))
+        self.sink.append(self.path, line)
+
+    def write_index(self):
+        """Call once the sink has flushed the log."""
+        target = index_path(self.path)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.index.to_json(), separators=(",", ":")),
+                       encoding="utf-8")
+        os.replace(tmp, target)
+
+
+class EventReader:
+    """Memory-mapped, index-assisted queries over an event log."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fh = self.path.open("rb")
+        size = os.fstat(self._fh.fileno()).st_size
+        self._mm = b""
+        if size:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = self._load_index(size)
+
+    def _load_index(self, size: int) -> _Index:
+        try:
+            data = json.loads(index_path(self.path).read_text(encoding="utf-8"))
+            if data["size"] == size:
+                return _Index.from_json(data)
+        except (OSError, ValueError, KeyError):
+            pass
+        # missing or stale (e.g. the run was killed): rebuild with one scan
+        index = _Index()
+        for start, end in self._lines(0, size):
+            try:
+                record = json.loads(self._mm[start:end])
+            except ValueError:
+                break  # a torn last line
+            index.add(record["t"], record["kind"], end + 1 - start)
+        return index
+
+    def _lines(self, start: int, end: int):
+        mm = self._mm
+        while start < end:
+            nl = mm.find(b"\n", start, end)
+            if nl < 0:
+                nl = end
+            yield start, nl
+            start = nl + 1
+
+    def __len__(self) -> int:
+        return self.index.records
+
+    def query(self, start: float | None = None, end: float | None = None,
+              kinds=None, agent: str | None = None):
+        """Yields records with start <= t <= end, of the given kinds and agent."""
+        index = self.index
+        if not index.hours:
+            return
+        first = max(0, int(start)) if start is not None else 0
+        last = len(index.hours) - 1
+        if end is not None:
+            last = min(last, int(end))
+        hours = set(range(first, last + 1))
+        if kinds:
+            hours &= {h for k in kinds for h in index.kinds.get(k, ())}
+        spans: list[list[int]] = []
+        for hour in sorted(hours):
+            lo, hi = index.span(hour)
+            if spans and spans[-1][1] == lo:
+                spans[-1][1] = hi
+            elif lo < hi:
+                spans.append([lo, hi])
+        kinds = set(kinds) if kinds else None
+        for lo, hi in spans:
+            for a, b in self._lines(lo, hi):
+                record = json.loads(self._mm[a:b])
+                if start is not None and record["t"] < start:
+                    continue
+                if end is not None and record["t"] > end:
+                    break
+                if kinds is not None and record["kind"] not in kinds:
+                    continue
+                if agent is not None and record["agent"] != agent:
+                    continue
+                yield record
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def render_timeline(records) -> str:
+    rows = [timeline_row(*(r[f] for f in FIELDS if f != "agent")) for r in records]
+    return TIMELINE_HEADER + "".join(rows)
+
+
+def render_gossip(records) -> str:
+    rows = []
+    for r in records:
+        if r["kind"] == "GOSSIP":
+            # logged as "<speaker> whispers: '<line>'"
+            line = r["msg"].partition(" whispers: ")[2][1:-1]
+            rows.append(gossip_row(r["t"], r["agent"], line))
+    return GOSSIP_HEADER + "".join(rows)
@@ -0,0 +1,264 @@
+"""
+Event queues for the simulation scheduler.
+
+Events are ordered by (time, priority, sequence number), so events at the same
+time come out by priority class and then first-in first-out.  Cancelling is
+O(1) tombstoning: ``cancel(evt)`` flags one event and ``cancel_tag(tag)`` bumps
+the tag's epoch, which invalidates every event pushed with the older epoch.
+Dead entries are skipped when they reach the front.
+
+Two interchangeable backends are provided:
+
+* ``HeapQueue`` – a binary heap (``heapq``).
+* ``CalendarQueue`` – a calendar queue: events are appended to time buckets
+  and a bucket is heapified only when the clock reaches it, so pushes into
+  the future are O(1) appends and pops work on one small heap.  The bucket
+  width follows the event density (about ``PER_BUCKET`` entries per bucket)
+  and is re-derived whenever the queue doubles in size.  In pure Python it is
+  roughly on par with the heap; the heap stays the default.
+"""
+
+import heapq
+import itertools
+import math
+
+CRITICAL = 0
+NORMAL = 1
+BACKGROUND = 2
+
+
+class Event:
+    __slots__ = ("t", "fn", "desc", "rule", "priority", "tag", "seq", "epoch",
+                 "cancelled", "queued")
+    def __init__(self, t: float, fn, desc: str = "", rule=None,
+                 priority: int = NORMAL, tag: str | None = None):
+        self.t, self.fn, self.desc, self.rule = t, fn, desc, rule
+        self.priority, self.tag = priority, tag
+        self.seq = self.epoch = 0
+        self.cancelled = self.queued = False
+    def __lt__(self, other):
+        return (self.t, self.priority, self.seq) < (
+            other.t, other.priority, other.seq
+        )
+
+
+class EventQueue:
+    """Shared bookkeeping for sequence numbers, liveness and cancellation."""
+
+    def __init__(self):
+        self._seq = itertools.count()
+        self._epochs: dict[str | None, int] = {}
+        self._tag_live: dict[str | None, int] = {}
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __bool__(self) -> bool:
+        return self._live > 0
+
+    def push(self, evt: Event) -> Event:
+        """Queues evt and returns it as the cancellation handle."""
+        evt.seq = next(self._seq)
+        evt.epoch = self._epochs.get(evt.tag, 0)
+        evt.queued = True
+        self._tag_live[evt.tag] = self._tag_live.get(evt.tag, 0) + 1
+        self._live += 1
+        self._insert((evt.t, evt.priority, evt.seq, evt))
+        return evt
+
+    def alive(self, evt: Event) -> bool:
+        return (evt.queued and not evt.cancelled
+                and evt.epoch == self._epochs.get(evt.tag, 0))
+
+    def cancel(self, evt: Event):
+        """Cancels evt; a no-op once it has been popped or cancelled."""
+        if self.alive(evt):
+            evt.cancelled = True
+            self._forget(evt)
+
+    def cancel_tag(self, tag: str | None):
+        """Cancels every queued event carrying tag."""
+        self._epochs[tag] = self._epochs.get(tag, 0) + 1
+        self._live -= self._tag_live.pop(tag, 0)
+
+    def tags(self) -> list[str | None]:
+        """Tags that still have live events."""
+        return [tag for tag, n in self._tag_live.items() if n]
+
+    def clear(self):
+        for tag in list(self._tag_live):
+            self.cancel_tag(tag)
+
+    def peek(self) -> Event | None:
+        epochs = self._epochs
+        while True:
+            item = self._first()
+            if item is None:
+                return None
+            evt = item[3]
+            if not evt.cancelled and evt.epoch == epochs.get(evt.tag, 0):
+                return evt
+            self._remove_first()
+
+    def pop(self) -> Event | None:
+        first, remove, epochs = self._first, self._remove_first, self._epochs
+        while True:
+            item = first()
+            if item is None:
+                return None
+            remove()
+            evt = item[3]
+            if not evt.cancelled and evt.epoch == epochs.get(evt.tag, 0):
+                evt.queued = False
+                self._forget(evt)
+                return evt
+
+    def __iter__(self):
+        """Live events in no particular order."""
+        return (item[3] for item in self._items() if self.alive(item[3]))
+
+    def _forget(self, evt: Event):
+        self._live -= 1
+        self._tag_live[evt.tag] -= 1
+
+    # backend hooks; items are (t, priority, seq, event) tuples
+    def _insert(self, item):
+        raise NotImplementedError
+
+    def _first(self):
+        raise NotImplementedError
+
+    def _remove_first(self):
+        raise NotImplementedError
+
+    def _items(self):
+        raise NotImplementedError
+
+
+class HeapQueue(EventQueue):
+    def __init__(self):
+        super().__init__()
+        self._heap: list[tuple] = []
+
+    def _insert(self, item):
+        heapq.heappush(self._heap, item)
+
+    def _first(self):
+        return self._heap[0] if self._heap else None
+
+    def _remove_first(self):
+        heapq.heappop(self._heap)
+
+    def _items(self):
+        return iter(self._heap)
+
+
+class CalendarQueue(EventQueue):
+    PER_BUCKET = 64  # target entries per bucket
+    SPLIT = 8  # a bucket this many times over target narrows the width
+    TRIM = 4096  # consumed entries are dropped from the active bucket in chunks
+
+    def __init__(self, width: float | None = None):
+        """A fixed width turns off resizing."""
+        super().__init__()
+        self.fixed = width is not None
+        self.width = width or 1.0
+        self._buckets: dict[int, list[tuple]] = {}
+        self._bucket_ids: list[int] = []  # heap of non-empty future buckets
+        self._cur: list[tuple] = []  # sorted entries of the active bucket
+        self._pos = 0
+        self._end = -math.inf  # end of the active bucket's time range
+        self._late: list[tuple] = []  # heap of entries pushed before _end
+        self._take_late = False
+        self._future = 0  # entries in future buckets
+        self._moved = 0  # entries bucketed since the last resize
+
+    def _insert(self, item):
+        t = item[0]
+        if t < self._end:
+            heapq.heappush(self._late, item)
+            return
+        b = int(t // self.width)
+        bucket = self._buckets.get(b)
+        if bucket is None:
+            self._buckets[b] = [item]
+            heapq.heappush(self._bucket_ids, b)
+        else:
+            bucket.append(item)
+        self._future += 1
+        self._moved += 1
+
+    def _first(self):
+        late = self._late
+        if self._pos < len(self._cur):
+            head = self._cur[self._pos]
+            self._take_late = bool(late) and late[0] < head
+            return late[0] if self._take_late else head
+        if late:
+            self._take_late = True
+            return late[0]
+        if not self._bucket_ids:
+            return None
+        bucket = self._buckets[self._bucket_ids[0]]
+        # re-bucketing is O(n), so at most once per n pushes
+        if (len(bucket) > self.SPLIT * self.PER_BUCKET and not self.fixed
+                and self._moved >= self._future):
+            self._resize(bucket)
+        b = heapq.heappop(self._bucket_ids)
+        self._cur = self._buckets.pop(b)
+        self._cur.sort()
+        self._pos = 0
+        self._future -= len(self._cur)
+        self._end = (b + 1) * self.width
+        self._take_late = False
+        return self._cur[0]
+
+    def _remove_first(self):
+        if self._take_late:
+            heapq.heappop(self._late)
+            return
+        self._pos += 1
+        if self._pos >= self.TRIM and 2 * self._pos >= len(self._cur):
+            del self._cur[:self._pos]
+            self._pos = 0
+
+    def _items(self):
+        yield from self._cur[self._pos:]
+        yield from self._late
+        for bucket in self._buckets.values():
+            yield from bucket
+
+    def _resize(self, head: list[tuple]):
+        """Narrows the width to the density of the crowded head bucket."""
+        lo, hi = min(head)[0], max(head)[0]
+        if hi <= lo:
+            return  # ties; a narrower width would not split them
+        self.width = width = self.width * self.PER_BUCKET / len(head)
+        items = [item for bucket in self._buckets.values() for item in bucket]
+        self._buckets = buckets = {}
+        for item in items:
+            b = int(item[0] // width)
+            bucket = buckets.get(b)
+            if bucket is None:
+                buckets[b] = [item]
+            else:
+                bucket.append(item)
+        self._bucket_ids = list(buckets)
+        heapq.heapify(self._bucket_ids)
+        self._moved = 0
+
+
+BACKENDS = {"heap": HeapQueue, "calendar": CalendarQueue}
+
+
+def make_queue(backend: "str | EventQueue" = "heap") -> EventQueue:
+    if isinstance(backend, EventQueue):
+        return backend
+    try:
+        return BACKENDS[backend]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown event queue backend {backend!r}; "
+            f"choose from {', '.join(BACKENDS)}"
+        ) from None
@@ -1,5 +1,6 @@
-from pathlib import Path
 from os import path as os_path
+from pathlib import Path
+
 
 def safe_path(root: Path, target: Path) -> Path:
     """
@@ -16,11 +17,17 @@ def safe_path(root: Path, target: Path) -> Path:
         raise ValueError(f"Path escape blocked: {p} is not within {root}")
     return p
 
-def write(root: Path, rel_path: str, text: str, mode: str = "a"):
+def open_file(root: Path, rel_path: str, mode: str = "a"):
     """
-    Safely writes text to a file within the root directory.
+    Safely opens a text file within the root directory, creating its folder.
     """
     p = safe_path(root, Path(rel_path))
     p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open(mode, encoding="utf-8") as f:
+    return p.open(mode, encoding="utf-8")
+
+def write(root: Path, rel_path: str, text: str, mode: str = "a"):
+    """
+    Safely writes text to a file within the root directory.
+    """
+    with open_file(root, rel_path, mode) as f:
         f.write(text)
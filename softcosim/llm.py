@@ -1,17 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import json
 import os
-import aiohttp
+import re
 import time
-import json
+from typing import TYPE_CHECKING
+
+from .pricing import PriceTable, prompt_tokens
+
+if TYPE_CHECKING:
+    # aiohttp is imported on the first real request; it is slow to import
+    import aiohttp
+
+# SOFTCOSIM_API_URL points the client elsewhere, e.g. at the local stub server
+API_URL = os.getenv("SOFTCOSIM_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+
+
+class LLMHTTPError(Exception):
+    """The API answered with an error status."""
+
+    def __init__(self, status: int, message: str = "",
+                 retry_after: float | None = None):
+        super().__init__(f"HTTP {status}: {message}".strip())
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retriable(self) -> bool:
+        return self.status == 429 or self.status >= 500
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Parses a Retry-After header (seconds or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
 
-API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
-async def chat(model: str, messages: list[dict], stream: bool = False) -> tuple[str, float, float]:
+class SessionPool:
+    """
+    Long-lived aiohttp session shared by every chat() call of a simulation.
+    The session is created lazily, keeps connections alive between calls and
+    counts how many requests went over a reused connection.
+    """
+
+    def __init__(
+        self,
+        limit: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_ttl: int = 300,
+    ):
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.requests = 0
+        self.reused = 0
+        self.created = 0
+        self._session: aiohttp.ClientSession | None = None
+
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            trace = aiohttp.TraceConfig()
+            trace.on_request_start.append(self._on_request)
+            trace.on_connection_reuseconn.append(self._on_reuse)
+            trace.on_connection_create_end.append(self._on_create)
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[trace]
+            )
+        return self._session
+
+    async def _on_request(self, session, ctx, params):
+        self.requests += 1
+
+    async def _on_reuse(self, session, ctx, params):
+        self.reused += 1
+
+    async def _on_create(self, session, ctx, params):
+        self.created += 1
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+class SSEDecoder:
+    """
+    Incremental server-sent events decoder.
+    Bytes are buffered across feed() calls and decoded only once an event is
+    complete, so events and multi-byte characters split between network
+    chunks survive.  Lines may end in CR, LF or CRLF, even with the CRLF split
+    between chunks.  Returns the data of every completed event.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._cr = False  # the last chunk ended in CR; a leading LF belongs to it
+
+    def feed(self, chunk: bytes) -> list[str]:
+        if not chunk:
+            return []
+        if self._cr and chunk.startswith(b"\n"):
+            chunk = chunk[1:]
+        self._cr = chunk.endswith(b"\r")
+        self._buf += chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        events = []
+        while True:
+            end = self._buf.find(b"\n\n")
+            if end < 0:
+                break
+            raw = bytes(self._buf[:end])
+            del self._buf[:end + 2]
+            data = self._parse(raw)
+            if data is not None:
+                events.append(data)
+        return events
+
+    def close(self) -> list[str]:
+        """Returns the last event if the stream ended without a blank line."""
+        raw, self._buf, self._cr = bytes(self._buf), bytearray(), False
+        data = self._parse(raw.strip(b"\n"))
+        return [] if data is None else [data]
+
+    @staticmethod
+    def _parse(raw: bytes) -> str | None:
+        lines = []
+        for line in raw.decode("utf-8", errors="replace").split("\n"):
+            field, _, value = line.partition(":")
+            if field == "data":
+                # the spec strips a single space after the colon
+                lines.append(value[1:] if value.startswith(" ") else value)
+        return "\n".join(lines) if lines else None
+
+
+class TokenStream:
+    """
+    Async iterator over the content deltas of one streamed reply.
+    Tracks time to first token, tokens per second and the cost so far; the
+    cost is estimated from the price table until the final usage chunk arrives.
+    """
+
+    def __init__(self, response, model: str, prompt_tokens: int, t0: float,
+                 prices: PriceTable | None = None):
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.prices = prices or PriceTable()
+        self.parts: list[str] = []
+        self.usage: dict = {}
+        self.ttft: float | None = None
+        self.aborted = False
+        self._response = response
+        self._decoder = SSEDecoder()
+        self._pending: list[str] = []
+        self._done = False
+        self._t0 = t0
+        self._last = t0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        while not self._pending:
+            if self._done:
+                raise StopAsyncIteration
+            chunk = await self._response.content.readany()
+            if chunk:
+                events = self._decoder.feed(chunk)
+            else:
+                events = self._decoder.close()
+                self._done = True
+            for data in events:
+                self._handle(data)
+        self._last = time.perf_counter()
+        if self.ttft is None:
+            self.ttft = self._last - self._t0
+        return self._pending.pop(0)
+
+    def _handle(self, data: str):
+        if data == "[DONE]":
+            self._done = True
+            return
+        try:
+            obj = json.loads(data)
+        except ValueError:
+            return
+        if obj.get("usage"):
+            self.usage = obj["usage"]
+        choices = obj.get("choices") or [{}]
+        delta = choices[0].get("delta", {}).get("content")
+        if delta:
+            self.parts.append(delta)
+            self._pending.append(delta)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def tokens(self) -> int:
+        # OpenRouter sends about one token per delta
+        return self.usage.get("completion_tokens", len(self.parts))
+
+    @property
+    def tokens_per_sec(self) -> float:
+        span = self._last - self._t0 - (self.ttft or 0.0)
+        return self.tokens / span if span > 0 else 0.0
+
+    @property
+    def cost(self) -> float:
+        if "cost" in self.usage:
+            return self.usage["cost"]
+        return self.prices.cost(self.model, self.prompt_tokens, self.tokens)
+
+
+async def chat(
+    model: str,
+    messages: list[dict],
+    stream: bool = False,
+    pool: SessionPool | None = None,
+    on_token=None,
+    prices: PriceTable | None = None,
+) -> tuple[str, float, float]:
     """
     Returns (response_text, usd_cost, latency_s)
-    If SOFTCOSIM_FAKE_LLM=1 → returns canned text, zero cost.
+    If SOFTCOSIM_FAKE_LLM=1 → returns canned text, zero cost, after
+    SOFTCOSIM_FAKE_LLM_LATENCY seconds (default 0); a request for a JSON list
+    of N lines gets N canned lines.
+    Pass a SessionPool to reuse its connections; otherwise a one-off session
+    is opened for this call.
+    With stream=True, on_token(token_stream) is called after every delta;
+    returning True aborts the stream and returns the partial reply with its
+    estimated cost from prices.
     """
     if os.getenv("SOFTCOSIM_FAKE_LLM") == "1":
-        return "FAKE-LLM-REPLY", 0.0, 0.0
+        delay = float(os.getenv("SOFTCOSIM_FAKE_LLM_LATENCY", "0"))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        prompt = messages[-1].get("content", "") if messages else ""
+        wanted = re.search(r"Write (\d+) ", prompt)
+        if wanted and "JSON list" in prompt:
+            return json.dumps(["FAKE-LLM-REPLY"] * int(wanted.group(1))), 0.0, delay
+        return "FAKE-LLM-REPLY", 0.0, delay
 
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
@@ -30,41 +276,38 @@ async def chat(model: str, messages: list[dict], stream: bool = False) -> tuple[
     }
 
     t0 = time.perf_counter()
+    if pool is not None:
+        return await _post(pool.session(), headers, body, t0, on_token, prices)
+    import aiohttp
+
     async with aiohttp.ClientSession() as s:
-        async with s.post(API_URL, headers=headers, json=body) as r:
-            if not stream:
-                data = await r.json()
-                usage = data.get("usage", {})
-                # OpenRouter cost is in credits, 1/1000 of a cent.
-                # We want USD.
-                cost = usage.get("cost", 0.0)
-                latency = time.perf_counter() - t0
-                return data["choices"][0]["message"]["content"], cost, latency
-            else:
-                reply = ""
-                cost = 0.0
-                async for chunk in r.content:
-                    if not chunk:
-                        continue
-                    for raw in chunk.decode("utf-8").splitlines():
-                        if not raw.startswith("data:"):
-                            continue
-                        payload = raw[len("data:"):].strip()
-                        if payload == "[DONE]":
-                            continue
-                        try:
-                            data = json.loads(payload)
-                        except Exception:
-                            continue
-                        delta = (
-                            data.get("choices", [{}])[0]
-                            .get("delta", {})
-                            .get("content")
-                        )
-                        if delta:
-                            reply += delta
-                        usage = data.get("usage")
-                        if usage:
-                            cost = usage.get("cost", cost)
-                latency = time.perf_counter() - t0
-                return reply, cost, latency
+        return await _post(s, headers, body, t0, on_token, prices)
+
+
+async def _post(
+    s: aiohttp.ClientSession, headers: dict, body: dict, t0: float, on_token,
+    prices: PriceTable | None,
+) -> tuple[str, float, float]:
+    async with s.post(API_URL, headers=headers, json=body) as r:
+        if r.status >= 400:
+            raise LLMHTTPError(
+                r.status, (await r.text())[:200],
+                _retry_after(r.headers.get("Retry-After")),
+            )
+        if not body["stream"]:
+            data = await r.json()
+            usage = data.get("usage", {})
+            # OpenRouter cost is in credits, 1/1000 of a cent.
+            # We want USD.
+            cost = usage.get("cost", 0.0)
+            latency = time.perf_counter() - t0
+            return data["choices"][0]["message"]["content"], cost, latency
+        tokens = TokenStream(r, body["model"], prompt_tokens(body["messages"]), t0,
+                             prices)
+        async for _ in tokens:
+            if on_token is not None and on_token(tokens):
+                # dropping the connection stops generation (and billing)
+                tokens.aborted = True
+                r.close()
+                break
+        return tokens.text, tokens.cost, time.perf_counter() - t0
@@ -0,0 +1,107 @@
+"""
+Token estimates and per-model prices for LLM cost admission.
+
+``count_tokens`` is a small regex tokenizer that approximates BPE token counts
+(one token per word or punctuation run, plus one per further eight characters
+of long words) without downloading a vocabulary.  ``PriceTable`` maps models
+to USD per million prompt and completion tokens; it can be loaded from a JSON
+or TOML file:
+
+    [models."google/gemini-2.5-flash"]
+    prompt = 0.30
+    completion = 2.50
+
+``CompletionStats`` remembers how long each model's replies have been so the
+completion side of a request can be predicted before it is sent.
+"""
+
+import json
+import re
+import tomllib
+from pathlib import Path
+
+# USD per million (prompt, completion) tokens
+DEFAULT_PRICES = {
+    "google/gemini-2.5-flash": (0.30, 2.50),
+    "mistralai/devstral-small": (0.07, 0.28),
+}
+# assumed for models missing from the table; deliberately pessimistic
+UNKNOWN_PRICE = (1.0, 4.0)
+# per-message overhead of the chat format
+MESSAGE_TOKENS = 4
+DEFAULT_COMPLETION_TOKENS = 400
+
+_TOKEN_RE = re.compile(r" ?\w+| ?[^\w\s]+|\s+")
+
+
+def count_tokens(text: str) -> int:
+    n = 0
+    for m in _TOKEN_RE.finditer(text):
+        n += 1 + (len(m.group()) - 1) // 8
+    return n
+
+
+def prompt_tokens(messages: list[dict]) -> int:
+    return sum(MESSAGE_TOKENS + count_tokens(m.get("content", "")) for m in messages)
+
+
+class BudgetRefused(Exception):
+    """An LLM request was refused because it would exceed the budget."""
+
+
+class PriceTable:
+    def __init__(self, prices: dict[str, tuple[float, float]] | None = None):
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+
+    @classmethod
+    def load(cls, path: Path) -> "PriceTable":
+        """Reads {"models": {name: {"prompt": x, "completion": y}}}."""
+        text = Path(path).read_text(encoding="utf-8")
+        data = tomllib.loads(text) if Path(path).suffix == ".toml" else json.loads(text)
+        try:
+            return cls({
+                model: (float(p["prompt"]), float(p["completion"]))
+                for model, p in data["models"].items()
+            })
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(
+                f"price file needs models.<name>.prompt/completion ({e})") from None
+
+    def cost(self, model: str, prompt: int, completion: int) -> float:
+        p_in, p_out = self.prices.get(model, UNKNOWN_PRICE)
+        return (prompt * p_in + completion * p_out) / 1_000_000
+
+    def cheaper(self, model: str, prompt: int, completion: int) -> list[str]:
+        """Known models cheaper than model for this request, priciest first."""
+        own = self.cost(model, prompt, completion)
+        found = [
+            (self.cost(m, prompt, completion), m)
+            for m in self.prices if m != model
+        ]
+        return [m for c, m in sorted(found, reverse=True) if c < own]
+
+
+class CompletionStats:
+    """Running mean of completion tokens per model."""
+
+    def __init__(self, default: int = DEFAULT_COMPLETION_TOKENS):
+        self.default = default
+        self._sum: dict[str, int] = {}
+        self._n: dict[str, int] = {}
+
+    def expect(self, model: str) -> int:
+        n = self._n.get(model)
+        return self._sum[model] // n if n else self.default
+
+    def observe(self, model: str, reply: str):
+        self._sum[model] = self._sum.get(model, 0) + count_tokens(reply)
+        self._n[model] = self._n.get(model, 0) + 1
+
+    def to_json(self) -> dict:
+        return {"default": self.default, "sum": self._sum, "n": self._n}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CompletionStats":
+        stats = cls(data["default"])
+        stats._sum, stats._n = dict(data["sum"]), dict(data["n"])
+        return stats
@@ -0,0 +1,182 @@
+"""
+Shared scheduler for outgoing LLM requests.
+
+Every model gets a lane with a concurrency limit and an optional
+tokens-per-minute budget (a token bucket holding one minute of tokens).
+Requests waiting for a lane are served by priority class and then first
+come, first served, so critical-path calls overtake background gossip.
+A 429 or 5xx reply is retried with exponential backoff and full jitter; a
+429 pauses the whole lane for its ``Retry-After`` time.  Queue depth, wait
+times, retries and throttles are kept per model.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import sys
+import time
+
+from .eventqueue import NORMAL
+from .llm import LLMHTTPError
+
+
+def _transient(e: Exception) -> bool:
+    """A timeout or dropped connection, worth retrying."""
+    # aiohttp is imported lazily; if it is not loaded, e cannot be one of its errors
+    aiohttp = sys.modules.get("aiohttp")
+    return isinstance(e, asyncio.TimeoutError) or (
+        aiohttp is not None and isinstance(e, aiohttp.ClientConnectionError)
+    )
+
+
+class _Lane:
+    def __init__(self, limit: int, tpm: int | None):
+        self.limit = limit
+        self.tpm = tpm
+        self.active = 0
+        self.waiters: list[tuple] = []  # heap of (priority, seq, future)
+        self.bucket = float(tpm or 0)
+        self.stamp = time.monotonic()
+        self.blocked_until = 0.0
+        self.requests = self.retries = self.throttled = 0
+        self.max_depth = 0
+        self.waits: list[float] = []
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for _, _, fut in self.waiters if not fut.done())
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        concurrency: int = 4,
+        tpm: int | None = None,
+        limits: dict[str, tuple[int, int | None]] | None = None,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        seed: int | None = None,
+    ):
+        self.concurrency = concurrency
+        self.tpm = tpm
+        self.limits = limits or {}  # model -> (concurrency, tpm)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = random.Random(seed)
+        self._lanes: dict[str, _Lane] = {}
+        self._seq = itertools.count()
+
+    def _lane(self, model: str) -> _Lane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            limit, tpm = self.limits.get(model, (self.concurrency, self.tpm))
+            lane = self._lanes[model] = _Lane(limit, tpm)
+        return lane
+
+    async def run(self, model: str, call, *, priority: int = NORMAL, tokens: int = 0):
+        """
+        Awaits call() once model's lane admits it, retrying rate-limited and
+        failed requests.  tokens is charged against the lane's TPM budget.
+        """
+        lane = self._lane(model)
+        attempt = 0
+        while True:
+            t0 = time.perf_counter()
+            await self._acquire(lane, priority)
+            try:
+                await self._pace(lane, tokens)
+                lane.waits.append(time.perf_counter() - t0)
+                lane.requests += 1
+                try:
+                    return await call()
+                except LLMHTTPError as e:
+                    if not e.retriable or attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt, e.retry_after)
+                    if e.status == 429:
+                        lane.throttled += 1
+                        lane.blocked_until = max(lane.blocked_until,
+                                                 time.monotonic() + delay)
+                except Exception as e:
+                    if not _transient(e) or attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt, None)
+            finally:
+                self._release(lane)
+            lane.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        if retry_after is not None:
+            # a little jitter so throttled callers do not retry in lockstep
+            return retry_after + self.rng.uniform(0, self.base_delay)
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def _acquire(self, lane: _Lane, priority: int):
+        if lane.active < lane.limit and not lane.depth:
+            lane.active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(lane.waiters, (priority, next(self._seq), fut))
+        lane.max_depth = max(lane.max_depth, lane.depth)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release(lane)  # the slot was handed over already
+            raise
+
+    def _release(self, lane: _Lane):
+        while lane.waiters:
+            _, _, fut = heapq.heappop(lane.waiters)
+            if not fut.done():
+                fut.set_result(None)  # hand the slot straight over
+                return
+        lane.active -= 1
+
+    async def _pace(self, lane: _Lane, tokens: int):
+        """Waits out a 429 pause and until the TPM bucket holds tokens."""
+        while True:
+            now = time.monotonic()
+            if now < lane.blocked_until:
+                await asyncio.sleep(lane.blocked_until - now)
+                continue
+            if not lane.tpm:
+                return
+            rate = lane.tpm / 60.0
+            lane.bucket = min(lane.tpm, lane.bucket + (now - lane.stamp) * rate)
+            lane.stamp = now
+            # a request bigger than the bucket goes once the bucket is full
+            need = min(tokens, lane.tpm)
+            if lane.bucket >= need:
+                lane.bucket -= tokens
+                return
+            await asyncio.sleep((need - lane.bucket) / rate)
+
+    def metrics(self) -> dict[str, dict]:
+        out = {}
+        for model, lane in self._lanes.items():
+            waits = lane.waits or [0.0]
+            out[model] = {
+                "requests": lane.requests,
+                "retries": lane.retries,
+                "throttled": lane.throttled,
+                "queue_depth": lane.depth,
+                "max_queue_depth": lane.max_depth,
+                "mean_wait": sum(waits) / len(waits),
+                "max_wait": max(waits),
+            }
+        return out
+
+    def summary(self) -> str:
+        parts = [
+            f"{model}: {m['requests']} requests, {m['retries']} retries "
+            f"({m['throttled']} rate-limited), max queue {m['max_queue_depth']}, "
+            f"wait avg {m['mean_wait']:.2f}s / max {m['max_wait']:.2f}s"
+            for model, m in sorted(self.metrics().items())
+        ]
+        return "; ".join(parts) or "none"
@@ -0,0 +1,91 @@
+"""
+Write-behind sink for the simulation's append-only outputs.
+
+Timeline rows, gossip rows and console lines are buffered in memory and handed
+to a single background thread in batches, so the event loop never blocks on
+file I/O or terminal rendering.  A batch is flushed when it reaches
+``max_lines`` entries or ``interval`` seconds after its first entry, and on
+``close()``.  The single worker thread keeps the order of writes per file.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+
+class LogSink:
+    def __init__(self, console=None, max_lines: int = 256, interval: float = 0.5):
+        self.console = console
+        self.max_lines = max_lines
+        self.interval = interval
+        self.batches = 0
+        self._pending: list[tuple[Path | None, str]] = []
+        self._first_at = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+        self._futures: list[Future] = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="softcosim-sink"
+        )
+
+    def append(self, path: Path, text: str):
+        """Queues text to be appended to path."""
+        self._add(path, text)
+
+    def print(self, line: str):
+        """Queues a line for the console."""
+        if self.console is not None:
+            self._add(None, line)
+
+    def _add(self, target: Path | None, text: str):
+        if not self._pending:
+            self._first_at = time.perf_counter()
+        self._pending.append((target, text))
+        if (
+            len(self._pending) >= self.max_lines
+            or time.perf_counter() - self._first_at >= self.interval
+        ):
+            self.flush_soon()
+        elif self._timer is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush_soon()
+                return
+            self._timer = loop.call_later(self.interval, self.flush_soon)
+
+    def flush_soon(self):
+        """Hands the buffered entries to the writer thread without waiting."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._futures = [f for f in self._futures if not f.done()]
+        self._futures.append(self._executor.submit(self._write_batch, batch))
+        self.batches += 1
+
+    async def flush(self):
+        """Flushes the buffer and waits until everything is written."""
+        self.flush_soon()
+        futures, self._futures = self._futures, []
+        for fut in futures:
+            await asyncio.wrap_future(fut)
+
+    async def close(self):
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _write_batch(self, batch: list[tuple[Path | None, str]]):
+        # one open/write per file; order within each target is preserved
+        grouped: dict[Path | None, list[str]] = {}
+        for target, text in batch:
+            grouped.setdefault(target, []).append(text)
+        for target, texts in grouped.items():
+            if target is None:
+                for line in texts:
+                    self.console.print(line)
+            else:
+                with target.open("a", encoding="utf-8") as f:
+                    f.write("".join(texts))
@@ -0,0 +1,202 @@
+"""
+Local OpenRouter-compatible stand-in for load and failure testing.
+
+Serves ``POST /api/v1/chat/completions`` (and ``/v1/chat/completions``), plain
+JSON or server-sent events, with ``usage.cost`` priced from a ``PriceTable``.
+Unlike ``SOFTCOSIM_FAKE_LLM`` it exercises the whole HTTP path of
+``llm.chat``: connection pooling, SSE decoding, retries and rate limiting.
+Point a run at it with ``SOFTCOSIM_API_URL``.
+
+Latency is a distribution spec: ``0.05`` or ``fixed:0.05``,
+``uniform:0.01,0.2``, ``exp:0.05`` (mean) or ``lognormal:0.05,0.5`` (median,
+sigma).  It is the time to first token; replies then stream at
+``tokens_per_sec``.  ``fragment`` splits every SSE event into random writes of
+at most that many bytes, and ``error_rate`` / ``throttle_rate`` answer that
+share of requests with a 500 or a 429 with ``Retry-After``.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+
+from aiohttp import web
+
+from .pricing import PriceTable, count_tokens, prompt_tokens
+
+PATHS = ("/api/v1/chat/completions", "/v1/chat/completions")
+# a few multi-byte words so fragmented streams split characters too
+WORDS = ("the", "build", "is", "green", "again", "café", "déjà", "vu", "–",
+         "someone", "merged", "on", "friday", "coffee", "is", "cold")
+
+
+def parse_dist(spec: str):
+    """Returns a sampler rng -> seconds for a latency spec."""
+    kind, _, args = str(spec).partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    try:
+        params = [float(x) for x in args.split(",")]
+    except ValueError:
+        raise ValueError(f"invalid latency {spec!r}") from None
+    if kind == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(*params)
+    if kind == "exp" and len(params) == 1:
+        return lambda rng: rng.expovariate(1 / params[0]) if params[0] > 0 else 0.0
+    if kind == "lognormal" and len(params) == 2:
+        median, sigma = params
+        return lambda rng: median * math.exp(sigma * rng.gauss(0, 1))
+    raise ValueError(
+        f"invalid latency {spec!r} (use fixed:S, uniform:A,B, exp:MEAN "
+        "or lognormal:MEDIAN,SIGMA)"
+    )
+
+
+class StubLLM:
+    def __init__(
+        self,
+        latency: str = "0",
+        tokens_per_sec: float = 0.0,
+        completion_tokens: int = 64,
+        chunk_tokens: int = 1,
+        fragment: int = 0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        max_concurrent: int = 0,
+        prices: PriceTable | None = None,
+        seed: int | None = None,
+    ):
+        self.latency = parse_dist(latency)
+        self.tokens_per_sec = tokens_per_sec
+        self.completion_tokens = completion_tokens
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.fragment = fragment
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_concurrent = max_concurrent  # beyond this, answer 429 (0: no cap)
+        self.prices = prices or PriceTable()
+        self.rng = random.Random(seed)
+        self.stats = {"requests": 0, "streamed": 0, "errors": 0, "throttled": 0,
+                      "completed": 0, "active": 0, "max_active": 0}
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        for path in PATHS:
+            app.router.add_post(path, self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        stats = self.stats
+        stats["requests"] += 1
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return _error(401, "missing API key")
+        try:
+            body = await request.json()
+            model, messages = body["model"], body["messages"]
+        except (ValueError, KeyError, TypeError):
+            return _error(400, "expected JSON with model and messages")
+        roll = self.rng.random()
+        if roll < self.error_rate:
+            stats["errors"] += 1
+            return _error(500, "injected failure")
+        if roll < self.error_rate + self.throttle_rate or (
+            self.max_concurrent and stats["active"] >= self.max_concurrent
+        ):
+            stats["throttled"] += 1
+            return _error(429, "rate limited",
+                          headers={"Retry-After": f"{self.retry_after:g}"})
+
+        stats["active"] += 1
+        stats["max_active"] = max(stats["max_active"], stats["active"])
+        try:
+            parts = self._reply(messages)
+            usage = self._usage(model, messages, parts)
+            await asyncio.sleep(self.latency(self.rng))
+            if body.get("stream"):
+                stats["streamed"] += 1
+                resp = await self._stream(request, model, parts, usage)
+            else:
+                await self._pace(len(parts))
+                resp = web.json_response({
+                    "id": f"stub-{stats['requests']}",
+                    "object": "chat.completion",
+                    "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant",
+                                             "content": "".join(parts)}}],
+                    "usage": usage,
+                })
+            stats["completed"] += 1
+            return resp
+        finally:
+            stats["active"] -= 1
+
+    def _reply(self, messages: list[dict]) -> list[str]:
+        """The reply as token-sized pieces, shaped a little by the prompt."""
+        prompt = messages[-1].get("content", "") if messages else ""
+        n = self.completion_tokens
+        words = [WORDS[self.rng.randrange(len(WORDS))] for _ in range(max(1, n))]
+        wanted = re.search(r"Write (\d+) ", prompt)
+        if "JSON list" in prompt and wanted:
+            k = max(1, int(wanted.group(1)))
+            per = max(1, len(words) // k)
+            text = json.dumps([" ".join(words[i * per:(i + 1) * per]).capitalize() + "."
+                               for i in range(k)], ensure_ascii=False)
+            return re.findall(r" ?[^ ]+", text)
+        if "python" in prompt.lower():
+            return ["print(", "'Hello", ",", " SoftCoSim", "!'", ")\n"]
+        return [words[0].capitalize()] + [" " + w for w in words[1:]] + ["."]
+
+    def _usage(self, model: str, messages: list[dict], parts: list[str]) -> dict:
+        prompt = prompt_tokens(messages)
+        completion = count_tokens("".join(parts))
+        return {"prompt_tokens": prompt, "completion_tokens": completion,
+                "total_tokens": prompt + completion,
+                "cost": self.prices.cost(model, prompt, completion)}
+
+    async def _pace(self, tokens: int):
+        if self.tokens_per_sec > 0:
+            await asyncio.sleep(tokens / self.tokens_per_sec)
+
+    async def _stream(self, request, model, parts, usage) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        step = self.chunk_tokens
+        for i in range(0, len(parts), step):
+            chunk = {"model": model, "choices": [
+                {"index": 0, "delta": {"content": "".join(parts[i:i + step])}}]}
+            await self._send(resp, chunk)
+            await self._pace(step)
+        await self._send(resp, {"model": model, "usage": usage, "choices": [
+            {"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        await self._write(resp, b"data: [DONE]\n\n")
+        await resp.write_eof()
+        return resp
+
+    async def _send(self, resp, obj: dict):
+        data = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        await self._write(resp, f"data: {data}\n\n".encode("utf-8"))
+
+    async def _write(self, resp, raw: bytes):
+        if self.fragment <= 0:
+            await resp.write(raw)
+            return
+        while raw:
+            cut = self.rng.randint(1, self.fragment)
+            await resp.write(raw[:cut])
+            raw = raw[cut:]
+
+
+def _error(status: int, message: str, headers: dict | None = None) -> web.Response:
+    return web.json_response({"error": {"code": status, "message": message}},
+                             status=status, headers=headers)
+
+
+def serve(stub: StubLLM, host: str = "127.0.0.1", port: int = 8765):
+    """Runs the stub until interrupted."""
+    web.run_app(stub.app(), host=host, port=port, print=None, access_log=None)
@@ -0,0 +1,216 @@
+"""
+Parallel parameter sweeps over many simulations.
+
+A sweep spec (JSON or TOML) describes the runs:
+
+    {
+      "base": {"days": 1, "speed": 0},
+      "grid": {"prompt": ["To-do app", "Chat app"], "budget": [0.1, 0.5]},
+      "runs": [{"prompt": "Blog engine", "days": 3}],
+      "budget": 2.0
+    }
+
+Every combination of ``grid`` values and every entry of ``runs`` is merged over
+``base``.  Runs execute in a process pool, each in its own ``run-NNN``
+subfolder of the sweep root.  The optional top-level ``budget`` caps the total
+LLM spend of the sweep: each run is granted at most what is left when it
+starts, and unspent budget is returned when it finishes.  A run that raises
+or kills its worker process is recorded and the sweep carries on.  A run that
+raises still reports what it spent; a run whose process died keeps its whole
+grant, since its spend is unknown.  Results are aggregated into
+``results.csv`` and ``results.json``.
+"""
+
+import asyncio
+import csv
+import itertools
+import json
+import os
+import time
+import tomllib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+RUN_KEYS = {
+    "prompt", "days", "budget", "start_hour", "end_hour", "speed",
+    "concurrent", "seed",
+}
+RESULT_FIELDS = [
+    "run", "folder", "status", "prompt", "days", "start_hour", "end_hour",
+    "budget", "cost", "wall_time", "morale", "fatigue", "qa_status", "error",
+]
+DEFAULTS = {
+    "prompt": "Build a to-do app",
+    "days": 1,
+    "budget": 0.5,
+    "start_hour": 9,
+    "end_hour": 17,
+    "speed": 0.0,
+}
+
+
+def load_spec(path: Path) -> dict:
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix == ".toml":
+        return tomllib.loads(text)
+    return json.loads(text)
+
+
+def expand(spec: dict) -> list[dict]:
+    """Turns a sweep spec into the list of run configs."""
+    base = {**DEFAULTS, **spec.get("base", {})}
+    configs = []
+    grid = spec.get("grid", {})
+    if grid:
+        keys = list(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            configs.append({**base, **dict(zip(keys, values))})
+    for run in spec.get("runs", []):
+        configs.append({**base, **run})
+    if not configs:
+        configs.append(base)
+    for cfg in configs:
+        unknown = set(cfg) - RUN_KEYS
+        if unknown:
+            raise ValueError(f"Unknown run option(s): {', '.join(sorted(unknown))}")
+    return configs
+
+
+def run_one(index: int, config: dict, folder: str, budget: float) -> dict:
+    """Runs one simulation; executed inside a worker process."""
+    from .engine import CompanySim
+
+    row = {"run": index, "folder": folder, "status": "ok", "budget": budget}
+    row.update({k: config[k] for k in ("prompt", "days", "start_hour", "end_hour")})
+    t0 = time.perf_counter()
+    sim = None
+    try:
+        root = Path(folder)
+        root.mkdir(parents=True, exist_ok=True)
+        sim = CompanySim(
+            config["prompt"],
+            config["days"],
+            root,
+            start_hour=config["start_hour"],
+            end_hour=config["end_hour"],
+            seconds_per_hour=config["speed"],
+            budget=budget,
+            concurrent=config.get("concurrent", False),
+            seed=config.get("seed"),
+        )
+        asyncio.run(sim.start())
+    except Exception as e:
+        row.update(status="error", error=f"{type(e).__name__}: {e}")
+        # LLM calls made before the failure were still paid for
+        row["cost"] = round(sim.cost, 6) if sim is not None else 0.0
+        row["wall_time"] = round(time.perf_counter() - t0, 4)
+        return row
+    row.update(
+        cost=round(sim.cost, 6),
+        wall_time=round(time.perf_counter() - t0, 4),
+        morale=round(sim.morale, 2),
+        fatigue=round(sim.fatigue, 2),
+        qa_status=sim.qa_status,
+    )
+    return row
+
+
+class Sweep:
+    def __init__(
+        self,
+        configs: list[dict],
+        root: Path,
+        workers: int | None = None,
+        budget: float | None = None,
+    ):
+        self.configs = configs
+        self.root = Path(root)
+        self.workers = workers or os.cpu_count() or 1
+        self.remaining = budget  # None means no global cap
+        self.results: list[dict] = []
+
+    def _grant(self, config: dict) -> float | None:
+        """Reserves budget for a run; None when the global budget is used up."""
+        want = config["budget"]
+        if self.remaining is None:
+            return want
+        grant = min(want, self.remaining)
+        if grant <= 0:
+            return None
+        self.remaining -= grant
+        return grant
+
+    def _settle(self, grant: float, row: dict):
+        """Returns the unspent part of a run's grant to the global budget."""
+        if self.remaining is not None:
+            self.remaining += max(0.0, grant - (row.get("cost") or 0.0))
+
+    def run(self) -> list[dict]:
+        # (index, config, grant); runs retried after a pool crash keep their grant
+        queue = deque((i, cfg, None) for i, cfg in enumerate(self.configs))
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        inflight: dict = {}  # future -> (index, config, grant, isolated, executor)
+        try:
+            while queue or inflight:
+                while queue and len(inflight) < self.workers:
+                    index, cfg, grant = queue.popleft()
+                    isolated = grant is not None
+                    if not isolated:
+                        grant = self._grant(cfg)
+                    if grant is None:
+                        self._record(index, cfg, status="skipped",
+                                     error="global budget exhausted")
+                        continue
+                    # runs caught in a crashed pool retry in a process of their own
+                    executor = ProcessPoolExecutor(max_workers=1) if isolated else pool
+                    folder = str(self._folder(index))
+                    fut = executor.submit(run_one, index, cfg, folder, grant)
+                    inflight[fut] = (index, cfg, grant, isolated, executor)
+                if not inflight:
+                    continue
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    index, cfg, grant, isolated, executor = inflight.pop(fut)
+                    if isolated:
+                        executor.shutdown()
+                    try:
+                        row = fut.result()
+                    except BrokenProcessPool:
+                        if isolated:
+                            self._record(index, cfg, status="crashed", budget=grant,
+                                         error="worker process died")
+                            continue
+                        # any run in the pool may have killed it; only the one whose
+                        # isolated retry dies too keeps its grant as spent
+                        queue.appendleft((index, cfg, grant))
+                        if executor is pool:
+                            pool.shutdown(wait=False)
+                            pool = ProcessPoolExecutor(max_workers=self.workers)
+                        continue
+                    self._settle(grant, row)
+                    self.results.append(row)
+        finally:
+            pool.shutdown()
+        self.results.sort(key=lambda r: r["run"])
+        self._write()
+        return self.results
+
+    def _folder(self, index: int) -> Path:
+        return self.root / f"run-{index:03d}"
+
+    def _record(self, index: int, cfg: dict, **extra):
+        row = {"run": index, "folder": str(self._folder(index)), "budget": 0.0}
+        row.update({k: cfg[k] for k in ("prompt", "days", "start_hour", "end_hour")})
+        row.update(extra)
+        self.results.append(row)
+
+    def _write(self):
+        with (self.root / "results.json").open("w", encoding="utf-8") as f:
+            json.dump(self.results, f, indent=2)
+        with (self.root / "results.csv").open("w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            for row in self.results:
+                writer.writerow({k: row.get(k, "") for k in RESULT_FIELDS})
@@ -0,0 +1,132 @@
+"""
+Team definitions and array-backed agent state.
+
+A team file (TOML, or YAML when PyYAML is installed) lists groups of agents:
+
+    [[agents]]
+    role = "manager"
+    name = "Manager"
+
+    [[agents]]
+    role = "developer"
+    count = 200
+    name = "Dev-{i}"
+    model = "mistralai/devstral-small"
+
+    [[agents]]
+    role = "qa"
+    count = 20
+    name = "QA-{i}"
+
+``count`` repeats a group and ``{i}`` in the name is replaced by 1..count.
+``id`` (default: the name) is the agent's key in ``CompanySim.agents``.
+
+Morale, fatigue and LLM spend of every agent live in one ``TeamState`` of
+NumPy arrays indexed by agent id, so office events and the clock update the
+whole team with a handful of vectorised operations.
+"""
+
+import tomllib
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import yaml
+except ImportError:  # optional
+    yaml = None
+
+ROLES = ("manager", "developer", "qa")
+
+# studio dynamics, shared by the engine and the Monte Carlo batch runner
+INITIAL_MORALE = 75.0
+FATIGUE_RATE = 5.0  # fatigue gained per simulated hour
+MORALE_DECAY = (1.0, 3.0)  # morale lost per gossip line, drawn uniformly
+GOSSIP_EVERY = 0.5  # hours between gossip lines
+# daily office events: (key, hour of day, description, morale change, fatigue change)
+OFFICE_EVENTS = (
+    ("coffee", 10, "Coffee break", 5.0, -10.0),
+    ("lunch", 12, "Lunch break", 0.0, -20.0),
+    ("meeting", 15, "Team meeting", -5.0, 0.0),
+)
+DEFAULT_TEAM = [
+    {"id": "mgr", "role": "manager", "name": "Manager"},
+    {"id": "dev", "role": "developer", "name": "Dev-A"},
+    {"id": "qa", "role": "qa", "name": "QA"},
+]
+MEMBER_KEYS = {"id", "role", "name", "model", "count"}
+
+
+def load_team(path: Path) -> list[dict]:
+    """Reads a team file and returns one spec per agent."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError("YAML team files need PyYAML (pip install pyyaml)")
+        data = yaml.safe_load(text) or {}
+    else:
+        data = tomllib.loads(text)
+    return expand_team(data.get("agents", []))
+
+
+def expand_team(groups: list[dict]) -> list[dict]:
+    members, seen = [], set()
+    for group in groups:
+        unknown = set(group) - MEMBER_KEYS
+        if unknown:
+            raise ValueError(f"Unknown team option(s): {', '.join(sorted(unknown))}")
+        if group.get("role") not in ROLES:
+            raise ValueError(f"Team role must be one of {', '.join(ROLES)}: {group}")
+        count = group.get("count", 1)
+        default = group["role"].capitalize() + ("-{i}" if count > 1 else "")
+        name = group.get("name", default)
+        for i in range(1, count + 1):
+            member = {"role": group["role"], "name": name.format(i=i)}
+            if "model" in group:
+                member["model"] = group["model"]
+            member["id"] = group["id"].format(i=i) if "id" in group else member["name"]
+            if member["id"] in seen:
+                raise ValueError(f"Duplicate team member id {member['id']!r}")
+            seen.add(member["id"])
+            members.append(member)
+    if not any(m["role"] == "manager" for m in members):
+        raise ValueError("A team needs a manager")
+    return members
+
+
+class TeamState:
+    """Per-agent morale, fatigue and spend, indexed by agent id."""
+
+    __slots__ = ("morale", "fatigue", "cost")
+
+    def __init__(self, size: int, morale: float = INITIAL_MORALE):
+        self.morale = np.full(size, morale)
+        self.fatigue = np.zeros(size)
+        self.cost = np.zeros(size)
+
+    def __len__(self) -> int:
+        return len(self.morale)
+
+    # updates work in place so a tick allocates nothing, whatever the team size
+    def tire(self, amount: float):
+        self.fatigue += amount
+        np.minimum(self.fatigue, 100.0, out=self.fatigue)
+
+    def rest(self, amount: float):
+        self.fatigue -= amount
+        np.maximum(self.fatigue, 0.0, out=self.fatigue)
+
+    def cheer(self, amount):
+        """Raises (or with a negative amount lowers) everyone's morale."""
+        self.morale += amount
+        np.clip(self.morale, 0.0, 100.0, out=self.morale)
+
+    def apply(self, morale: float, fatigue: float):
+        """Applies an office event's effect."""
+        if morale:
+            self.cheer(morale)
+        if fatigue > 0:
+            self.tire(fatigue)
+        elif fatigue < 0:
+            self.rest(-fatigue)
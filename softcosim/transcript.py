@@ -0,0 +1,111 @@
+"""
+Record and replay of LLM transcripts.
+
+A transcript is a JSON-lines file with one entry per chat() call: the request
+hash, model, reply, cost, latency and (for streamed calls) time to first token.
+Replaying a transcript serves the same replies without touching the network,
+optionally sleeping for the recorded latencies, so seeded runs are repeatable
+and cost nothing.  A request for a model the transcript never saw raises
+``ReplayMiss``; the engine logs it and drops that agent's action.
+"""
+
+import asyncio
+import json
+from collections import defaultdict, deque
+from pathlib import Path
+
+from .cache import request_key
+
+
+class ReplayMiss(LookupError):
+    """A replayed request has no recorded reply to serve."""
+
+
+class Recorder:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.calls = 0
+        self._fh = self.path.open("a", encoding="utf-8")
+
+    def record(
+        self,
+        model: str,
+        messages: list[dict],
+        reply: str,
+        cost: float,
+        latency: float,
+        ttft: float | None = None,
+    ):
+        entry = {
+            "key": request_key(model, messages),
+            "model": model,
+            "reply": reply,
+            "cost": cost,
+            "latency": round(latency, 6),
+        }
+        if ttft is not None:
+            entry["ttft"] = round(ttft, 6)
+        self._fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._fh.flush()
+        self.calls += 1
+
+    def close(self):
+        self._fh.close()
+
+
+class Replayer:
+    """
+    Serves recorded replies.  Repeated requests get their recordings in the
+    original order, cycling when exhausted; requests that were never recorded
+    fall back to the recordings of the same model, round-robin.  Both kinds
+    of miss are counted in ``misses``.
+    """
+
+    def __init__(self, path: Path, latency: bool = False):
+        self.path = Path(path)
+        self.latency = latency
+        self.calls = 0
+        self.misses = 0
+        self._by_key: dict[str, deque] = defaultdict(deque)
+        self._by_model: dict[str, deque] = defaultdict(deque)
+        # how far each reply queue has turned, so a checkpoint can restore it
+        self._turns: dict[str, dict[str, int]] = {"key": {}, "model": {}}
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._by_key[entry["key"]].append(entry)
+                self._by_model[entry["model"]].append(entry)
+        if not self._by_model:
+            raise ValueError(f"Transcript {self.path} has no entries")
+
+    async def chat(
+        self, model: str, messages: list[dict]
+    ) -> tuple[str, float, float]:
+        """Same contract as llm.chat: returns (reply, usd_cost, latency_s)."""
+        key = request_key(model, messages)
+        entries, turns = self._by_key.get(key), self._turns["key"]
+        if not entries:
+            self.misses += 1
+            entries, turns, key = self._by_model.get(model), self._turns["model"], model
+            if not entries:
+                raise ReplayMiss(f"No recorded replies for model {model!r}")
+        entry = entries[0]
+        entries.rotate(-1)
+        turns[key] = (turns.get(key, 0) + 1) % len(entries)
+        self.calls += 1
+        if self.latency and entry["latency"] > 0:
+            await asyncio.sleep(entry["latency"])
+        return entry["reply"], entry["cost"], entry["latency"]
+
+    def state(self) -> dict:
+        return {"calls": self.calls, "misses": self.misses, "turns": self._turns}
+
+    def load_state(self, state: dict):
+        """Picks up where a checkpointed replay left off."""
+        self.calls, self.misses = state["calls"], state["misses"]
+        for kind, queues in (("key", self._by_key), ("model", self._by_model)):
+            for name, n in state["turns"][kind].items():
+                queues[name].rotate(-n)
+                self._turns[kind][name] = n
@@ -1,9 +1,11 @@
 import asyncio
-import pytest
 from pathlib import Path
 
+import pytest
+
 from softcosim.engine import CompanySim
 
+
 @pytest.mark.asyncio
 async def test_developer_creates_hello(tmp_path: Path, monkeypatch):
     """
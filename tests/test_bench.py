@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from softcosim import bench
+from softcosim.__main__ import app
+
+pytestmark = pytest.mark.bench
+
+
+def test_suite_reports_every_case():
+    cases = bench.suite(sizes=(100, 1000), io_ops=200, e2e_days=1, e2e_latency=0,
+                        http_requests=200)
+    results = bench.run_suite(cases)
+    assert set(results["results"]) == {
+        "dispatch-100", "dispatch-1000", "queue-heap-100", "queue-heap-1000",
+        "queue-calendar-100", "queue-calendar-1000", "hold-heap-100", "hold-heap-1000",
+        "hold-calendar-100", "hold-calendar-1000", "log", "fs_write", "e2e", "http",
+    }
+    for r in results["results"].values():
+        assert r["ops"] > 0 and r["ops_per_sec"] > 0
+        assert r["peak_alloc_bytes"] > 0
+    assert results["results"]["dispatch-1000"]["ops"] == 1000
+    # peaks are per case, so a small case after a large one reports less
+    assert (results["results"]["queue-heap-100"]["peak_alloc_bytes"]
+            < results["results"]["dispatch-1000"]["peak_alloc_bytes"])
+
+
+def test_compare_flags_throughput_drops():
+    base = {"results": {"log": {"ops_per_sec": 1000.0}, "e2e": {"ops_per_sec": 50.0}}}
+    cur = {"results": {"log": {"ops_per_sec": 850.0}, "e2e": {"ops_per_sec": 49.0}}}
+    regressions = bench.compare(cur, base, threshold=0.1)
+    assert len(regressions) == 1 and regressions[0].startswith("log:")
+    assert bench.compare(cur, base, threshold=0.2) == []
+
+
+def test_cli_fails_on_regression(tmp_path: Path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": {"fs_write": {"ops_per_sec": 1e12}}}))
+    out = tmp_path / "bench.json"
+    result = CliRunner().invoke(
+        app,
+        ["bench", "--sizes", "100", "--io-ops", "50", "--days", "1",
+         "--latency", "0", "--http-requests", "50", "--no-alloc", "--out", str(out),
+         "--baseline", str(baseline)],
+    )
+    assert result.exit_code == 1, result.stdout
+    assert "Regression" in result.stdout
+    assert "fs_write" in json.loads(out.read_text())["results"]
@@ -0,0 +1,65 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from softcosim.cache import ResponseCache
+from softcosim.engine import CompanySim
+
+MSG = [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}]
+
+
+def test_cache_hit_miss_and_savings(tmp_path: Path):
+    cache = ResponseCache(tmp_path)
+    assert cache.get("m", MSG) is None
+    cache.put("m", MSG, "reply", 0.25)
+    assert cache.get("m", MSG) == ("reply", 0.25)
+    assert cache.get("other-model", MSG) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.saved_usd == 0.25
+
+    # entries survive a restart
+    reopened = ResponseCache(tmp_path)
+    assert reopened.get("m", MSG) == ("reply", 0.25)
+
+
+def test_cache_expires_entries(tmp_path: Path, monkeypatch):
+    cache = ResponseCache(tmp_path, ttl=60)
+    cache.put("m", MSG, "reply", 0.1)
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 120)
+    assert cache.get("m", MSG) is None
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = ResponseCache(tmp_path, max_bytes=300)
+    prompts = [[{"role": "user", "content": str(i)}] for i in range(3)]
+    cache.put("m", prompts[0], "a" * 50, 0.0)
+    cache.put("m", prompts[1], "b" * 50, 0.0)
+    cache.get("m", prompts[0])  # 0 is now more recent than 1
+    cache.put("m", prompts[2], "c" * 50, 0.0)
+    assert cache.get("m", prompts[1]) is None
+    assert cache.get("m", prompts[0]) is not None
+    assert cache.get("m", prompts[2]) is not None
+    assert sum(os.path.getsize(p) for p in tmp_path.glob("*.json")) <= 300
+
+
+@pytest.mark.asyncio
+async def test_repeated_run_is_served_from_cache(tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    first = CompanySim(prompt="Cached", days=1, root=tmp_path / "run1",
+                       seconds_per_hour=0, cache=ResponseCache(cache_dir))
+    (tmp_path / "run1").mkdir()
+    await first.start()
+
+    second = CompanySim(prompt="Cached", days=1, root=tmp_path / "run2",
+                        seconds_per_hour=0, cache=ResponseCache(cache_dir))
+    (tmp_path / "run2").mkdir()
+    await second.start()
+
+    assert second.cache.misses == 0
+    assert second.cache.hits > 0
+    summary = (tmp_path / "run2" / "README.md").read_text(encoding="utf-8")
+    assert f"LLM cache: {second.cache.hits} hits, 0 misses" in summary
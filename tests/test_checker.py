@@ -0,0 +1,83 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from softcosim import checker
+from softcosim.checker import check, parse_report
+
+
+def test_check_reports_per_file_results(tmp_path: Path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "ok.py").write_text("print('hi')\n")
+    (tmp_path / "pkg" / "bad.py").write_text("def broken(:\n")
+
+    report = check(tmp_path)
+    assert report["status"] == "FAIL"
+    files = {f["path"]: f for f in report["files"]}
+    assert files["ok.py"]["status"] == "PASS"
+    assert files["pkg/bad.py"]["status"] == "FAIL"
+    assert "SyntaxError" in files["pkg/bad.py"]["error"]
+
+
+def test_manifest_skips_unchanged_files(tmp_path: Path, monkeypatch):
+    src, manifest = tmp_path / "src", tmp_path / "qa" / "manifest.json"
+    src.mkdir()
+    for i in range(3):
+        (src / f"m{i}.py").write_text(f"x = {i}\n")
+    (src / "bad.py").write_text("x = (\n")
+
+    first = check(src, manifest)
+    assert (first["checked"], first["unchanged"]) == (4, 0)
+
+    compiled = []
+    real = checker._compile_one
+    monkeypatch.setattr(checker, "_compile_one",
+                        lambda p: compiled.append(p) or real(p))
+    (src / "m1.py").write_text("x = 'changed'\n")
+    second = check(src, manifest)
+    # the failing file is retried, passed and unchanged files are not
+    assert sorted(Path(p).name for p in compiled) == ["bad.py", "m1.py"]
+    assert (second["checked"], second["unchanged"]) == (2, 2)
+    assert second["status"] == "FAIL"
+
+    (src / "bad.py").write_text("x = ()\n")
+    assert check(src, manifest)["status"] == "PASS"
+    assert check(src, manifest)["checked"] == 0
+
+
+def test_manifest_skips_hashing_files_with_unchanged_stat(tmp_path: Path, monkeypatch):
+    src, manifest = tmp_path / "src", tmp_path / "manifest.json"
+    src.mkdir()
+    for i in range(3):
+        (src / f"m{i}.py").write_text(f"x = {i}\n")
+    check(src, manifest)
+
+    hashed = []
+    real = checker.hashlib.sha256
+    monkeypatch.setattr(checker.hashlib, "sha256",
+                        lambda b: hashed.append(b) or real(b))
+    assert check(src, manifest)["checked"] == 0
+    assert hashed == []
+    (src / "m2.py").write_text("x = 'two'\n")
+    assert check(src, manifest)["checked"] == 1
+    assert hashed == [b"x = 'two'\n"]
+
+
+def test_parallel_check_matches_serial(tmp_path: Path):
+    for i in range(checker.PARALLEL_MIN * 2):
+        (tmp_path / f"m{i}.py").write_text("x = 1\n" if i % 5 else "x = \n")
+    assert check(tmp_path, workers=2) == check(tmp_path, workers=1)
+
+
+def test_script_prints_json_report(tmp_path: Path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    proc = subprocess.run(
+        [sys.executable, checker.__file__, str(tmp_path), "--manifest",
+         str(tmp_path / "manifest.json")],
+        capture_output=True, text=True,
+    )
+    assert proc.returncode == 0
+    report = parse_report("docker noise\n" + proc.stdout)
+    assert report["status"] == "PASS"
+    assert json.loads((tmp_path / "manifest.json").read_text())["files"]
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import signal
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from softcosim import checkpoint
+from softcosim.__main__ import app
+from softcosim.engine import CompanySim
+from softcosim.transcript import Recorder, Replayer
+
+OUTPUTS = ("timeline.md", "gossip.md", "events.jsonl")
+
+
+def make_sim(root: Path, **kw) -> CompanySim:
+    root.mkdir()
+    return CompanySim(prompt="Checkpoint", days=3, root=root, seconds_per_hour=0,
+                      seed=7, **kw)
+
+
+@pytest.fixture
+def reference(tmp_path: Path) -> dict:
+    sim = make_sim(tmp_path / "ref")
+    asyncio.run(sim.start())
+    return {name: (sim.root / name).read_bytes() for name in OUTPUTS} | {
+        "cost": sim.cost, "morale": sim.morale, "dispatched": sim.dispatched,
+    }
+
+
+def patch_log(sim: CompanySim, msg: str, action):
+    """Runs action() when msg is logged, before it reaches the files."""
+    real_log = sim.log
+
+    def log(text, kind="INFO", agent=None):
+        if text == msg:
+            action()
+        real_log(text, kind, agent)
+
+    sim.log = log
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+async def test_resume_after_crash_matches_uninterrupted_run(tmp_path: Path, reference,
+                                                            concurrent):
+    sim = make_sim(tmp_path / "run", checkpoint_every=4, concurrent=concurrent)
+
+    def power_cut():
+        if sim.now > 8:
+            raise RuntimeError("power cut")
+
+    patch_log(sim, "Lunch break", power_cut)
+    with pytest.raises(RuntimeError):
+        await sim.start()
+    saved = checkpoint.load(sim.checkpoint_path)
+    assert 4 <= saved["now"] < 11  # the second lunch is at sim hour 11
+    assert {e["fn"][1] for e in saved["events"]} >= {"deadline", "lunch_break"}
+    assert saved["gossip"]  # batched lines not yet spoken
+
+    resumed = CompanySim.resume(sim.root)
+    await resumed.start()
+    for name in OUTPUTS:
+        assert (resumed.root / name).read_bytes() == reference[name], name
+    assert resumed.cost == reference["cost"]
+    assert resumed.morale == reference["morale"]
+    assert resumed.dispatched == reference["dispatched"]
+    assert "Final cost" in (resumed.root / "README.md").read_text(encoding="utf-8")
+
+
+def test_sigint_checkpoints_and_stops(tmp_path: Path, reference):
+    sim = make_sim(tmp_path / "run", checkpoint_every=0)
+    patch_log(sim, "Team meeting", lambda: os.kill(os.getpid(), signal.SIGINT))
+    asyncio.run(sim.start())
+    assert sim.interrupted and sim.checkpoints == 1
+    assert sim.now < sim.total_hours
+    assert not (sim.root / "README.md").exists()
+
+    result = CliRunner().invoke(app, ["resume", str(sim.root)])
+    assert result.exit_code == 0, result.stdout
+    for name in OUTPUTS:
+        assert (sim.root / name).read_bytes() == reference[name], name
+
+
+def test_resumed_replay_never_reaches_the_api(tmp_path: Path, monkeypatch):
+    transcript = tmp_path / "calls.jsonl"
+    recorded = make_sim(tmp_path / "record", recorder=Recorder(transcript))
+    asyncio.run(recorded.start())
+
+    sim = make_sim(tmp_path / "run", checkpoint_every=0, replay=Replayer(transcript))
+    patch_log(sim, "Team meeting", lambda: os.kill(os.getpid(), signal.SIGINT))
+    asyncio.run(sim.start())
+    assert sim.interrupted and sim.replay.calls > 0
+
+    def no_api(*args, **kwargs):
+        raise AssertionError("the API was called")
+
+    monkeypatch.delenv("SOFTCOSIM_FAKE_LLM")
+    monkeypatch.setattr("softcosim.agents.chat", no_api)
+    monkeypatch.setattr("softcosim.__main__.ensure_api_key", no_api)
+    result = CliRunner().invoke(app, ["resume", str(sim.root)])
+    assert result.exit_code == 0, result.stdout
+    for name in OUTPUTS:
+        assert (sim.root / name).read_bytes() == (recorded.root / name).read_bytes()
+    assert "Replayed LLM calls" in (sim.root / "README.md").read_text(encoding="utf-8")
+
+
+def test_pending_gossip_refill_is_stored(tmp_path: Path):
+    sim = make_sim(tmp_path / "run")
+    sim._prepare_fs()
+    dev = sim.agents["dev"]
+    sim.schedule(0, dev.refill_gossip, "Dev refills gossip", tag="gossip")
+    saved = checkpoint.snapshot(sim)
+    assert saved["events"][0]["fn"] == ["dev", "refill_gossip"]
+    resumed = make_sim(tmp_path / "resumed")
+    checkpoint.restore(resumed, saved, resumed._rules())
+    assert resumed.events.pop().fn == resumed.agents["dev"].refill_gossip
+
+
+def test_unserializable_event_is_reported(tmp_path: Path):
+    sim = make_sim(tmp_path / "run")
+    sim.schedule(1, lambda: None, "anonymous")
+    with pytest.raises(ValueError, match="cannot checkpoint"):
+        checkpoint.snapshot(sim)
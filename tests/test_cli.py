@@ -121,3 +121,24 @@ def test_cli_prompts_for_defaults(tmp_path, monkeypatch):
     assert result.exit_code == 0, f"CLI failed with output:\n{result.stdout}"
     assert "Start hour" in result.stdout
     assert folder.exists()
+
+
+def test_cli_headless_skips_speed_prompt(tmp_path, monkeypatch):
+    """--headless runs on the virtual clock and prints a throughput summary."""
+    folder = tmp_path / "run5"
+    monkeypatch.setenv("OPENROUTER_API_KEY", "dummy")
+
+    result = runner.invoke(
+        app,
+        [
+            "--folder", str(folder), "--prompt", "Test", "--days", "3",
+            "--budget", "1", "--start-hour", "9", "--end-hour", "17",
+            "--headless",
+        ],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0, f"CLI failed with output:\n{result.stdout}"
+    assert "events/s" in result.stdout
+    assert "Seconds per simulated hour" not in result.stdout
+    assert "Deadline reached" in (folder / "timeline.md").read_text(encoding="utf-8")
@@ -0,0 +1,46 @@
+import io
+from pathlib import Path
+
+import pytest
+from rich.console import Console
+
+from softcosim.engine import CompanySim
+
+
+def _text(renderable) -> str:
+    console = Console(file=io.StringIO(), width=140, color_system=None)
+    console.print(renderable)
+    return console.file.getvalue()
+
+
+def test_render_shows_clock_gauges_agents_and_events(tmp_path: Path):
+    sim = CompanySim("Dash", 2, tmp_path, seconds_per_hour=0, dashboard=True)
+    dash = sim.dashboard
+    sim.now = 9.5
+    sim.state.cost[1] = 0.25
+    sim.llm_calls["Manager"] = ("google/gemini-2.5-flash", 0.0)
+    for i in range(50):
+        sim.log(f"event {i}\nsecond line")
+
+    out = _text(dash.render())
+    assert "Day 2/2 10:30" in out
+    assert "Morale" in out and "$0.0000 / $0.50" in out
+    assert out.index("Dev-A") < out.index("QA")  # biggest spender first
+    assert "In-flight LLM calls (1)" in out
+    assert "Manager: google/gemini-2.5-flash" in out
+    # only the last rows are kept, and only their first line is shown
+    assert len(dash.events) == 12
+    assert "event 49" in out and "event 37" not in out and "second line" not in out
+
+
+@pytest.mark.asyncio
+async def test_dashboard_frames_do_not_follow_event_rate(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "1")
+    sim = CompanySim("Dash", 20, tmp_path, seconds_per_hour=0, dashboard=True)
+    sim.console = Console(file=io.StringIO(), width=140)
+    await sim.start()
+
+    assert sim.dispatched > 300
+    # a handful of frames at 4 fps, plus the final one
+    assert sim.dashboard.frames < 20
+    assert "Deadline reached" in sim.console.file.getvalue()
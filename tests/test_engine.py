@@ -1,9 +1,11 @@
-import pytest
 import asyncio
 from pathlib import Path
 
+import pytest
+
 from softcosim.engine import CompanySim
 
+
 @pytest.mark.asyncio
 async def test_timeline_logs_events(tmp_path: Path, monkeypatch):
     """
@@ -50,3 +52,111 @@ async def test_fatigue_decay_and_recovery(tmp_path: Path, monkeypatch):
         if "Coffee break" in line or "Lunch break" in line
     ]
     assert lines
+
+
+@pytest.mark.asyncio
+async def test_concurrent_dispatch_serializes_per_agent(tmp_path: Path, monkeypatch):
+    """Slow agent actions overlap across agents but never within one agent."""
+    from softcosim.agents import Agent
+
+    running: dict[str, int] = {}
+    peak = {"agent": 0, "total": 0}
+
+    async def slow_gossip(self):
+        running[self.name] = running.get(self.name, 0) + 1
+        peak["agent"] = max(peak["agent"], running[self.name])
+        peak["total"] = max(peak["total"], sum(running.values()))
+        await asyncio.sleep(0.1)
+        running[self.name] -= 1
+        self.sim.log(f"{self.name} whispers: 'slow'", kind="GOSSIP")
+
+    monkeypatch.setattr(Agent, "gossip", slow_gossip)
+
+    # 8 simulated hours at 0.05 s/h; a 0.1 s gossip outlasts the next one's start
+    sim = CompanySim(
+        prompt="Concurrent", days=1, root=tmp_path,
+        seconds_per_hour=0.05, concurrent=True,
+    )
+    await sim.start()
+
+    assert peak["agent"] == 1
+    assert peak["total"] > 1  # gossips of different agents overlapped
+    content = (tmp_path / "timeline.md").read_text(encoding="utf-8")
+    assert content.count("whispers") == 15
+    # everything in flight finishes before the deadline is logged
+    assert content.rindex("whispers") < content.index("Deadline reached")
+
+
+@pytest.mark.asyncio
+async def test_virtual_clock_runs_month_quickly(tmp_path: Path, capsys, monkeypatch):
+    """speed 0 skips real-time pacing: 30 days run without a single real sleep."""
+    slept = []
+    real_sleep = asyncio.sleep
+
+    async def spy_sleep(delay, *args):
+        slept.append(delay)
+        return await real_sleep(0, *args)
+    monkeypatch.setattr(asyncio, "sleep", spy_sleep)
+
+    sim = CompanySim(prompt="Virtual", days=30, root=tmp_path, seconds_per_hour=0)
+    await sim.start()
+    assert [d for d in slept if d > 0] == []
+
+    assert sim.now == sim.total_hours
+    assert sim.dispatched > 30 * 15
+    content = (tmp_path / "timeline.md").read_text(encoding="utf-8")
+    assert "Deadline reached – stopping" in content
+    out = capsys.readouterr().out
+    assert "events/s" in out
+    assert "Coffee break" not in out
+
+
+def test_recurring_events_are_created_lazily(tmp_path: Path):
+    """The heap holds one pending occurrence per rule, whatever --days says."""
+    short = CompanySim(prompt="Lazy", days=1, root=tmp_path)
+    short._schedule_initial_events()
+    long = CompanySim(prompt="Lazy", days=10_000, root=tmp_path)
+    long._schedule_initial_events()
+    # kickoff + deadline + coffee, lunch, meeting and gossip rules
+    assert len(short.events) == len(long.events) == 6
+
+
+@pytest.mark.asyncio
+async def test_recurring_events_fire_every_day(tmp_path: Path):
+    sim = CompanySim(prompt="Lazy", days=3, root=tmp_path, seconds_per_hour=0)
+    await sim.start()
+    content = (tmp_path / "timeline.md").read_text(encoding="utf-8")
+    for name in ("Coffee break", "Lunch break", "Team meeting"):
+        assert content.count(name) == 3
+    assert content.count("whispers") == 3 * 15
+    assert len(sim.events) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("queue", ["heap", "calendar"])
+async def test_budget_halt_keeps_deadline(tmp_path: Path, queue):
+    """Exceeding the budget cancels pending work but the deadline still fires."""
+    sim = CompanySim(prompt="Halt", days=2, root=tmp_path, seconds_per_hour=0,
+                     queue=queue)
+    sim.schedule(3.25, lambda: sim.add_cost(1.0), "Expensive call")
+    await sim.start()
+
+    content = (tmp_path / "timeline.md").read_text(encoding="utf-8")
+    halt = content.index("Budget exceeded")
+    assert "whispers" not in content[halt:]
+    assert "Coffee break" not in content[halt:]
+    last = content.rstrip().splitlines()[-1]
+    assert last.startswith("| 16.00 | INFO | Deadline reached")
+    assert sim.halted and not sim.events
+
+
+@pytest.mark.asyncio
+async def test_setup_failure_closes_up_without_masking_it(tmp_path: Path):
+    from softcosim.transcript import Recorder
+
+    recorder = Recorder(tmp_path / "calls.jsonl")
+    sim = CompanySim(prompt="Missing", days=1, root=tmp_path / "missing",
+                     seconds_per_hour=0, recorder=recorder)
+    with pytest.raises(FileNotFoundError):
+        await sim.start()
+    assert sim.event_log is None and recorder._fh.closed
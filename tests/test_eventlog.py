@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from softcosim.__main__ import app
+from softcosim.engine import CompanySim
+from softcosim.eventlog import EventReader, index_path, render_gossip, render_timeline
+
+
+@pytest.fixture
+async def run_dir(tmp_path: Path) -> Path:
+    sim = CompanySim(prompt="Event log", days=2, root=tmp_path,
+                     seconds_per_hour=0, seed=1)
+    await sim.start()
+    return tmp_path
+
+
+async def test_markdown_renders_from_event_log(run_dir: Path):
+    """The log holds everything the markdown tables show."""
+    with EventReader(run_dir / "events.jsonl") as reader:
+        records = list(reader.query())
+        assert len(reader) == len(records)
+    timeline = (run_dir / "timeline.md").read_text(encoding="utf-8")
+    assert render_timeline(records) == timeline
+    assert render_gossip(records) == (run_dir / "gossip.md").read_text(encoding="utf-8")
+    speakers = {r["agent"] for r in records if r["kind"] == "GOSSIP"}
+    assert speakers <= {"Manager", "Dev-A", "QA"}
+
+
+async def test_query_matches_full_scan(run_dir: Path):
+    lines = (run_dir / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    everything = [json.loads(line) for line in lines]
+    with EventReader(run_dir / "events.jsonl") as reader:
+        for start, end, kinds, agent in [
+            (2.0, 5.5, None, None),
+            (None, 3.0, ["EVENT"], None),
+            (8.0, None, ["GOSSIP", "INFO"], None),
+            (None, None, None, "Dev-A"),
+            (100.0, None, None, None),
+        ]:
+            expected = [
+                r for r in everything
+                if (start is None or r["t"] >= start) and (end is None or r["t"] <= end)
+                and (kinds is None or r["kind"] in kinds)
+                and (agent is None or r["agent"] == agent)
+            ]
+            assert list(reader.query(start, end, kinds=kinds, agent=agent)) == expected
+
+
+async def test_stale_index_is_rebuilt(run_dir: Path):
+    with EventReader(run_dir / "events.jsonl") as reader:
+        expected = list(reader.query(3.0, 6.0))
+    index_path(run_dir / "events.jsonl").unlink()
+    with (run_dir / "events.jsonl").open("a", encoding="utf-8") as f:
+        f.write('{"t": 99, "kind"')  # torn write of a killed run
+    with EventReader(run_dir / "events.jsonl") as reader:
+        assert list(reader.query(3.0, 6.0)) == expected
+
+
+async def test_query_cli(run_dir: Path):
+    result = CliRunner().invoke(
+        app, ["query", str(run_dir), "--kind", "EVENT", "--from", "0", "--to", "8"]
+    )
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert lines and all(" EVENT | " in line for line in lines)
+    assert any("Lunch break" in line for line in lines)
+
+    result = CliRunner().invoke(app, ["query", str(run_dir), "--format", "jsonl",
+                                      "--agent", "Manager"])
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert all(json.loads(line)["agent"] == "Manager" for line in lines)
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from softcosim.eventqueue import (
+    BACKGROUND,
+    CRITICAL,
+    NORMAL,
+    CalendarQueue,
+    Event,
+    HeapQueue,
+    make_queue,
+)
+
+BACKENDS = [HeapQueue, lambda: CalendarQueue(width=0.5), CalendarQueue]
+
+
+def drain(q):
+    out = []
+    while (evt := q.pop()) is not None:
+        out.append(evt)
+    return out
+
+
+@pytest.mark.parametrize("make", BACKENDS)
+def test_ties_break_by_priority_then_fifo(make):
+    q = make()
+    for i in range(5):
+        q.push(Event(1.0, None, f"bg-{i}", priority=BACKGROUND))
+        q.push(Event(1.0, None, f"normal-{i}", priority=NORMAL))
+    q.push(Event(1.0, None, "critical", priority=CRITICAL))
+    q.push(Event(0.5, None, "early", priority=BACKGROUND))
+    assert [e.desc for e in drain(q)] == (
+        ["early", "critical"]
+        + [f"normal-{i}" for i in range(5)]
+        + [f"bg-{i}" for i in range(5)]
+    )
+
+
+@pytest.mark.parametrize("make", BACKENDS)
+def test_cancel_handles_and_tags(make):
+    q = make()
+    gossip = [q.push(Event(t, None, "gossip", tag="gossip")) for t in (1, 2, 3)]
+    work = q.push(Event(2.5, None, "work", tag="work"))
+    keep = q.push(Event(4, None, "deadline", tag="deadline"))
+    assert len(q) == 5
+
+    q.cancel(work)
+    q.cancel(work)  # cancelling twice is harmless
+    q.cancel_tag("gossip")
+    assert len(q) == 1 and q.tags() == ["deadline"]
+    # events pushed after the cancel are alive again
+    later = q.push(Event(3.5, None, "gossip", tag="gossip"))
+    assert set(q) == {later, keep}
+    assert drain(q) == [later, keep]
+    assert not q and all(q.alive(g) is False for g in gossip)
+
+
+@pytest.mark.parametrize("make", BACKENDS)
+def test_cancel_after_pop_is_a_no_op(make):
+    q = make()
+    first = q.push(Event(1, None, "a", tag="work"))
+    second = q.push(Event(2, None, "b", tag="work"))
+    assert q.pop() is first
+    q.cancel(first)
+    assert len(q) == 1 and q and q.tags() == ["work"]
+    assert q.peek() is second and q.alive(second) and not q.alive(first)
+    assert drain(q) == [second]
+
+
+@pytest.mark.parametrize("make", BACKENDS)
+def test_backends_agree_on_random_workload(make):
+    rng = random.Random(3)
+    q = make()
+    ref = HeapQueue()
+    popped, expected = [], []
+    for _ in range(2000):
+        if rng.random() < 0.6 or not ref:
+            t = rng.choice([rng.uniform(0, 50), float(rng.randint(0, 50))])
+            prio = rng.choice([CRITICAL, NORMAL, BACKGROUND])
+            q.push(Event(t, None, priority=prio))
+            ref.push(Event(t, None, priority=prio))
+        else:
+            a, b = q.pop(), ref.pop()
+            popped.append((a.t, a.priority))
+            expected.append((b.t, b.priority))
+    popped += [(e.t, e.priority) for e in drain(q)]
+    expected += [(e.t, e.priority) for e in drain(ref)]
+    assert popped == expected
+
+
+
+@pytest.mark.parametrize("width", [None, 100.0])
+def test_calendar_queue_handles_hold_workload(width):
+    """Many pending events, each pop pushing one a little later."""
+    rng = random.Random(5)
+    q, ref = CalendarQueue(width), HeapQueue()
+    for _ in range(20_000):
+        t = rng.uniform(0, 8)
+        q.push(Event(t, None))
+        ref.push(Event(t, None))
+    order, expected = [], []
+    for i in range(25_000):
+        a, b = q.pop(), ref.pop()
+        order.append(a.t)
+        expected.append(b.t)
+        if i < 5_000:
+            t = a.t + rng.uniform(0, 0.05)
+            q.push(Event(t, None))
+            ref.push(Event(t, None))
+    assert order == expected and not q and len(list(q)) == 0
+    if width is None:
+        assert q.width < 0.1  # narrowed to the event density
+    else:
+        assert len(q._cur) < 20_000  # consumed entries were trimmed
+
+def test_make_queue_rejects_unknown_backend():
+    assert isinstance(make_queue("calendar"), CalendarQueue)
+    with pytest.raises(ValueError):
+        make_queue("wheel")
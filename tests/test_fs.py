@@ -1,9 +1,11 @@
-import pytest
-from pathlib import Path
 import tempfile
+from pathlib import Path
+
+import pytest
 
 from softcosim.fs import safe_path
 
+
 def test_safe_path_allows_valid_paths():
     """
     Tests that safe_path correctly resolves paths that are within the root directory.
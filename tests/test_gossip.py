@@ -1,9 +1,11 @@
 import asyncio
-import pytest
 from pathlib import Path
 
+import pytest
+
 from softcosim.engine import CompanySim
 
+
 @pytest.mark.asyncio
 async def test_gossip_and_morale(tmp_path: Path, monkeypatch):
     """
@@ -33,3 +35,71 @@ async def test_gossip_and_morale(tmp_path: Path, monkeypatch):
     assert "| Morale |" in timeline_content
     assert "| Fatigue |" in timeline_content
     assert "GOSSIP" in timeline_content
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrent", [False, True])
+async def test_gossip_is_fetched_in_batches(tmp_path: Path, monkeypatch, concurrent):
+    """Each gossip request returns several lines; every line is still logged."""
+    import json
+
+    from softcosim import agents
+
+    requests = []
+
+    async def fake_chat(model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        requests.append(prompt)
+        if "JSON list" in prompt:
+            n = len(requests)
+            return json.dumps([f"rumour {n}.{i}" for i in range(8)]), 0.0, 0.0
+        return "print('Hello, SoftCoSim!')", 0.0, 0.0
+
+    monkeypatch.setattr(agents, "chat", fake_chat)
+    sim = CompanySim(prompt="Test Gossip", days=2, root=tmp_path, seconds_per_hour=0,
+                     concurrent=concurrent, seed=3, gossip_batch=8)
+    await sim.start()
+
+    gossip = (tmp_path / "gossip.md").read_text().splitlines()[4:]
+    assert len(gossip) == 30
+    assert all("| rumour " in line for line in gossip)
+    batch_requests = sum("JSON list" in p for p in requests)
+    # 30 lines over 3 agents: at most one batch per 8 lines, plus read-ahead
+    assert batch_requests <= 8
+    assert sim.morale < 75.0
+
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrent", [False, True])
+async def test_fake_llm_batches_and_refills_log_at_their_gossip(tmp_path: Path,
+                                                                 monkeypatch,
+                                                                concurrent):
+    """Refills are logged at the hour of the gossip that ran the buffer low."""
+    import json
+
+    monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "1")
+    requests = {}
+    for batch in (1, 8):
+        root = tmp_path / str(batch)
+        root.mkdir()
+        sim = CompanySim(prompt="Batch", days=5, root=root, seconds_per_hour=0,
+                         concurrent=concurrent, seed=5, gossip_batch=batch)
+        await sim.start()
+        requests[batch] = sum(m["requests"] for m in sim.limiter.metrics().values())
+
+    with (root / "events.jsonl").open(encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    gossip = {(r["agent"], r["t"]) for r in records if r["kind"] == "GOSSIP"}
+    refills = [(r["agent"], r["t"]) for r in records
+               if " LLM call " in r["msg"] and r["t"] > 0.5]
+    assert refills and set(refills) <= gossip
+    assert requests[8] * 5 < requests[1]
+
+def test_parse_lines_accepts_lists_and_plain_text():
+    from softcosim.agents import parse_lines
+
+    assert parse_lines('["a", " b ", ""]') == ["a", "b"]
+    assert parse_lines('```json\n["a", "b"]\n```') == ["a", "b"]
+    assert parse_lines("1. first\n- second\n") == ["first", "second"]
+    assert parse_lines("FAKE-LLM-REPLY") == ["FAKE-LLM-REPLY"]
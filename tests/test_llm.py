@@ -1,9 +1,11 @@
-import pytest
-from pathlib import Path
 import os
+from pathlib import Path
+
+import pytest
 
 from softcosim.engine import CompanySim
 
+
 @pytest.mark.asyncio
 async def test_llm_fake_mode(tmp_path: Path, monkeypatch):
     """
@@ -41,3 +43,151 @@ async def test_llm_real_mode_cost_tracking(tmp_path: Path, monkeypatch):
     agent = sim.agents["mgr"]
     await agent.ask_llm("system", "user")
     assert sim.cost > 0.0
+
+
+@pytest.mark.asyncio
+async def test_session_pool_reuses_connections(monkeypatch):
+    """Calls made through a SessionPool share one keep-alive connection."""
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from softcosim import llm
+
+    async def completions(request):
+        return web.json_response(
+            {"choices": [{"message": {"content": "hi"}}], "usage": {"cost": 0.001}}
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    async with TestServer(app) as server:
+        monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "0")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "dummy")
+        url = str(server.make_url("/v1/chat/completions"))
+        monkeypatch.setattr(llm, "API_URL", url)
+        pool = llm.SessionPool(limit=2)
+        msg = [{"role": "user", "content": "u"}]
+        for _ in range(3):
+            reply, cost, _ = await llm.chat("model", msg, pool=pool)
+            assert reply == "hi" and cost == 0.001
+        await pool.close()
+
+    assert pool.requests == 3
+    assert pool.created == 1
+    assert pool.reused == 2
+
+
+def _sse(*deltas: str, cost: float | None = None) -> bytes:
+    import json
+
+    events = [{"choices": [{"delta": {"content": d}}]} for d in deltas]
+    if cost is not None:
+        events.append({"choices": [{"delta": {}}], "usage": {"cost": cost}})
+    body = ": OPENROUTER PROCESSING\n\n"
+    body += "".join(f"data: {json.dumps(e, ensure_ascii=False)}\n\n" for e in events)
+    return (body + "data: [DONE]\n\n").encode("utf-8")
+
+
+def test_sse_decoder_handles_split_events_and_characters():
+    from softcosim.llm import SSEDecoder
+
+    raw = _sse("Hé", "llo ", "wörld ✓")
+    for size in (1, 2, 3, 7, len(raw)):
+        decoder, events = SSEDecoder(), []
+        for i in range(0, len(raw), size):
+            events += decoder.feed(raw[i:i + size])
+        events += decoder.close()
+        assert len(events) == 4 and events[-1] == "[DONE]"
+        assert "wörld ✓" in events[2]
+
+
+
+@pytest.mark.parametrize("eol", [b"\r\n", b"\r", b"\n"])
+def test_sse_decoder_splits_line_endings_at_every_offset(eol):
+    import json
+
+    from softcosim.llm import SSEDecoder
+
+    raw = _sse("a", "b").replace(b"\n", eol) + b"data:  two spaces" + eol * 2
+    for cut in range(len(raw) + 1):
+        decoder = SSEDecoder()
+        events = decoder.feed(raw[:cut]) + decoder.feed(raw[cut:]) + decoder.close()
+        assert len(events) == 4, cut
+        deltas = [json.loads(e)["choices"][0]["delta"]["content"] for e in events[:2]]
+        assert deltas == ["a", "b"]
+        assert events[2:] == ["[DONE]", " two spaces"]
+
+async def _stream_server(body: bytes, chunk: int, delay: float = 0.0):
+    """Serves body as an SSE stream, chunk bytes per write."""
+    import asyncio
+
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    state = {"sent": 0}
+
+    async def completions(request):
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        try:
+            for i in range(0, len(body), chunk):
+                await resp.write(body[i:i + chunk])
+                state["sent"] = i + chunk
+                await asyncio.sleep(delay)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        return resp
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    return TestServer(app), state
+
+
+@pytest.mark.asyncio
+async def test_stream_reassembles_reply_across_chunks(monkeypatch):
+    from softcosim import llm
+
+    server, _ = await _stream_server(_sse("Hé", "llo ", "wörld ✓", cost=0.002), chunk=5)
+    async with server:
+        monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "0")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "dummy")
+        url = str(server.make_url("/v1/chat/completions"))
+        monkeypatch.setattr(llm, "API_URL", url)
+        seen = []
+        reply, cost, _ = await llm.chat(
+            "model", [{"role": "user", "content": "u"}], stream=True,
+            on_token=lambda tokens: seen.append(tokens.ttft) and False,
+        )
+    assert reply == "Héllo wörld ✓"
+    assert cost == 0.002
+    assert len(seen) == 3 and seen[0] is not None
+
+
+@pytest.mark.asyncio
+async def test_stream_aborts_once_over_budget(tmp_path: Path, monkeypatch):
+    from softcosim import llm
+    from softcosim.pricing import CompletionStats, PriceTable
+
+    deltas = [f"tok{i} " for i in range(2000)]
+    server, state = await _stream_server(_sse(*deltas, cost=1.0), chunk=64, delay=0.001)
+    async with server:
+        monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "0")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "dummy")
+        url = str(server.make_url("/v1/chat/completions"))
+        monkeypatch.setattr(llm, "API_URL", url)
+        sim = CompanySim(prompt="Test LLM", days=1, root=tmp_path, budget=0.01,
+                         stream=True, prices=PriceTable({"model": (0.0, 1000.0)}))
+        # admission expects a short reply; the stream check catches the long one
+        sim.completions = CompletionStats(default=5)
+        agent = sim.agents["mgr"]
+        agent.model = "model"
+        reply = await agent.ask_llm("system", "user")
+        await sim.http.close()
+        await sim.sink.close()
+
+    assert reply.startswith("tok0 tok1 ") and len(reply.split()) < 100
+    assert sim.halted
+    assert 0.01 < sim.cost < 0.02
+    assert state["sent"] < len(_sse(*deltas))
+    timeline = (tmp_path / "timeline.md").read_text(encoding="utf-8")
+    assert "LLM stream aborted after 11 tokens" in timeline
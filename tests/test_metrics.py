@@ -0,0 +1,60 @@
+import json
+import random
+from pathlib import Path
+
+from softcosim.engine import CompanySim
+from softcosim.metrics import Histogram, Metrics
+
+
+def test_histogram_quantiles_are_within_bucket_precision():
+    rng = random.Random(3)
+    values = sorted(rng.lognormvariate(-4, 2) for _ in range(10_000))
+    hist = Histogram()
+    for v in values:
+        hist.record(v)
+    hist.record(0.0)
+    assert hist.count == 10_001 and hist.min == 0.0 and hist.max == values[-1]
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * 10_001) - 1]
+        assert exact <= hist.quantile(q) <= exact * 1.07
+    assert len(hist.buckets) < 600
+
+
+def test_prometheus_text_format():
+    m = Metrics()
+    m.inc("llm_requests_total", model='a"b')
+    m.inc("llm_requests_total", 2, model="c")
+    for v in (0.001, 0.002, 0.5):
+        m.observe("llm_latency_seconds", v, model="c")
+    text = m.to_prometheus()
+    assert "# TYPE softcosim_llm_requests_total counter" in text
+    assert 'softcosim_llm_requests_total{model="a\\"b"} 1' in text
+    assert 'softcosim_llm_requests_total{model="c"} 2' in text
+    assert "# TYPE softcosim_llm_latency_seconds histogram" in text
+    assert 'softcosim_llm_latency_seconds_bucket{model="c",le="+Inf"} 3' in text
+    assert 'softcosim_llm_latency_seconds_count{model="c"} 3' in text
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+               if line.startswith("softcosim_llm_latency_seconds_bucket")]
+    assert buckets == sorted(buckets)
+
+
+async def test_run_exports_metrics(tmp_path: Path):
+    sim = CompanySim(prompt="Metrics", days=1, root=tmp_path, seconds_per_hour=0,
+                     metrics=True)
+    await sim.start()
+    summary = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+    hists = {(h["name"], h["labels"].get("handler") or h["labels"].get("model"))
+             for h in summary["histograms"]}
+    assert ("handler_seconds", "lunch_break") in hists
+    assert ("llm_latency_seconds", "google/gemini-2.5-flash") in hists
+    assert ("fs_write_seconds", None) in hists and ("sandbox_seconds", None) in hists
+    events = sum(c["value"] for c in summary["counters"] if c["name"] == "events_total")
+    assert events == sim.dispatched
+    assert "softcosim_handler_seconds_bucket" in (tmp_path / "metrics.prom").read_text()
+
+
+async def test_metrics_are_off_by_default(tmp_path: Path):
+    sim = CompanySim(prompt="Metrics", days=1, root=tmp_path, seconds_per_hour=0)
+    await sim.start()
+    assert sim.metrics is None
+    assert not (tmp_path / "metrics.prom").exists()
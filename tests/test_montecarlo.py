@@ -0,0 +1,53 @@
+import csv
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from softcosim.engine import CompanySim
+from softcosim.montecarlo import PERCENTILES, MonteCarlo, calendar
+
+
+def test_calendar_matches_engine_schedule():
+    events = calendar(2)
+    keys = [k for _, k in events]
+    assert keys.count("gossip") == 30
+    assert keys.count("coffee") == keys.count("lunch") == keys.count("meeting") == 2
+    assert events[-1] == (16.0, "deadline")
+    # office events go before gossip at the same time
+    assert keys[keys.index("coffee") + 1] == "gossip"
+    assert events[keys.index("coffee")][0] == events[keys.index("coffee") + 1][0]
+
+
+@pytest.mark.asyncio
+async def test_lanes_reproduce_engine_dynamics(tmp_path: Path, monkeypatch):
+    """With a fixed gossip decay every lane ends where a real run ends."""
+    monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "1")
+    sim = CompanySim("MC", 2, tmp_path, seconds_per_hour=0, gossip_batch=1)
+    sim.MORALE_DECAY = (0.5, 0.5)
+    await sim.start()
+
+    mc = MonteCarlo(50, 2, seed=0, morale_decay=(0.5, 0.5)).run()
+    assert np.allclose(mc.state.morale, sim.morale)
+    assert np.allclose(mc.state.fatigue, sim.fatigue)
+
+
+def test_percentile_curves_and_throughput(tmp_path: Path):
+    mc = MonteCarlo(10_000, 10, seed=1).run()
+    rows = mc.rows()
+    assert len(rows) == len(mc.events) + 1
+    assert rows[0]["morale_p50"] == 75.0 and rows[0]["fatigue_p95"] == 0.0
+    mid = rows[20]
+    values = [mid[f"morale_p{p}"] for p in PERCENTILES]
+    assert values == sorted(values) and values[0] < values[-1]
+    assert mc.studio_days_per_sec > 50_000
+
+    mc.write_csv(tmp_path / "curves.csv")
+    with (tmp_path / "curves.csv").open() as f:
+        assert len(list(csv.DictReader(f))) == len(rows)
+
+
+def test_same_seed_same_curves():
+    a = MonteCarlo(100, 3, seed=7).run().rows()
+    b = MonteCarlo(100, 3, seed=7).run().rows()
+    assert a == b
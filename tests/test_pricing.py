@@ -0,0 +1,99 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from softcosim.engine import CompanySim
+from softcosim.pricing import (
+    BudgetRefused,
+    CompletionStats,
+    PriceTable,
+    count_tokens,
+    prompt_tokens,
+)
+
+CHEAP, PRICEY = "cheap/model", "pricey/model"
+
+
+def test_count_tokens_is_roughly_bpe_sized():
+    assert count_tokens("") == 0
+    assert count_tokens("Hello, world!") == 4
+    text = "Write a python script that prints 'Hello, SoftCoSim!' " * 20
+    assert 200 < count_tokens(text) < 400
+    assert prompt_tokens([{"role": "user", "content": "hi"}]) == 5
+
+
+def test_price_table_loads_json_and_toml(tmp_path: Path):
+    (tmp_path / "p.json").write_text(json.dumps(
+        {"models": {CHEAP: {"prompt": 0.1, "completion": 0.2}}}))
+    (tmp_path / "p.toml").write_text(
+        f'[models."{CHEAP}"]\nprompt = 0.1\ncompletion = 0.2\n')
+    for name in ("p.json", "p.toml"):
+        table = PriceTable.load(tmp_path / name)
+        assert table.cost(CHEAP, 1_000_000, 1_000_000) == pytest.approx(0.3)
+    (tmp_path / "bad.json").write_text('{"models": {"m": {"prompt": 1}}}')
+    with pytest.raises(ValueError):
+        PriceTable.load(tmp_path / "bad.json")
+
+
+def test_completion_stats_learn_reply_length():
+    stats = CompletionStats(default=100)
+    assert stats.expect(CHEAP) == 100
+    stats.observe(CHEAP, "word" + " word" * 9)
+    assert stats.expect(CHEAP) == 10
+
+
+def _sim(tmp_path: Path, budget: float) -> CompanySim:
+    # $0.01 per expected reply of 10 tokens on the pricey model, $0.001 on the cheap one
+    prices = PriceTable({PRICEY: (0.0, 1000.0), CHEAP: (0.0, 100.0)})
+    sim = CompanySim("Test", 1, tmp_path, budget=budget, prices=prices)
+    sim.completions = CompletionStats(default=10)
+    return sim
+
+
+@pytest.mark.asyncio
+async def test_admission_downgrades_then_refuses(tmp_path: Path):
+    sim = _sim(tmp_path, budget=0.005)
+    agent = sim.agents["mgr"]
+    assert await sim.admit(agent, PRICEY, []) == (CHEAP, pytest.approx(0.001))
+    assert sim.reserved == pytest.approx(0.001)
+
+    sim.settle(agent, CHEAP, 0.001, "x", 0.0045)
+    assert sim.reserved == 0
+    assert sim.spend_by_agent == {"Manager": 0.0045}
+    assert sim.spend_by_model == {CHEAP: 0.0045}
+    with pytest.raises(BudgetRefused):
+        await sim.admit(agent, PRICEY, [])
+    assert sim.admission == {"downgraded": 1, "deferred": 0, "refused": 1}
+    await sim.sink.close()
+
+
+@pytest.mark.asyncio
+async def test_admission_defers_until_inflight_calls_settle(tmp_path: Path):
+    sim = _sim(tmp_path, budget=0.015)
+    mgr, dev = sim.agents["mgr"], sim.agents["dev"]
+    model, first = await sim.admit(mgr, PRICEY, [])
+    waiting = asyncio.create_task(sim.admit(dev, PRICEY, []))
+    await asyncio.sleep(0)
+    assert not waiting.done() and sim.admission["deferred"] == 1
+
+    sim.settle(mgr, model, first, "short", 0.002)
+    assert await waiting == (PRICEY, pytest.approx(0.01))
+    await sim.sink.close()
+
+
+@pytest.mark.asyncio
+async def test_refused_call_halts_run_without_spending(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "1")
+    sim = CompanySim("Test", 1, tmp_path, seconds_per_hour=0, budget=1e-9)
+    await sim.start()
+
+    timeline = (tmp_path / "timeline.md").read_text(encoding="utf-8")
+    assert "Manager LLM call refused" in timeline
+    assert "Budget exhausted – halting simulation" in timeline
+    assert "Project plan" not in timeline
+    assert "Deadline reached" in timeline
+    assert sim.cost == 0 and sim.admission["refused"] == 1
+    readme = (tmp_path / "README.md").read_text(encoding="utf-8")
+    assert "Spend by agent: none" in readme and "1 refused" in readme
@@ -1,23 +1,30 @@
 import asyncio
-import pytest
-import types
+import os
+import stat
+import sys
 from pathlib import Path
 
-import sys
+import pytest
+
+from softcosim import docker_runner
 from softcosim.engine import CompanySim
 
+REPORT = (
+    '{"status": "PASS", "checked": 1, "unchanged": 0, '
+    '"files": [{"path": "hello.py", "status": "PASS", "cached": false}]}\n'
+)
+
 @pytest.mark.asyncio
 async def test_qa_logs_results(tmp_path: Path, monkeypatch):
     """
     Tests that the QA agent runs and logs the results of the test run.
     """
     # Mock the docker runner to avoid actual docker calls
-    def fake_run_pytest(_):
-        return "PASS"
-    
-    # We need to create a fake docker_runner module to monkeypatch
-    docker_runner_mock = types.SimpleNamespace(run_pytest=fake_run_pytest)
-    sys.modules['softcosim.docker_runner'] = docker_runner_mock
+    async def fake_run_pytest(_, on_output=None):
+        on_output(REPORT)
+        return REPORT
+
+    monkeypatch.setattr(docker_runner, "run_pytest", fake_run_pytest)
     
     # Speed up the test by removing the sleep
     async def fake_sleep(_):
@@ -37,4 +44,157 @@ async def test_qa_logs_results(tmp_path: Path, monkeypatch):
     timeline_content = timeline_path.read_text(encoding="utf-8")
     
     assert "QA: Running tests in Docker" in timeline_content
-    assert "QA: Syntax check PASS" in timeline_content
+    assert "QA: Syntax check PASS (1 checked, 0 unchanged)" in timeline_content
+    assert (tmp_path / "qa" / "report.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_sim_keeps_running_while_qa_runs(tmp_path: Path, monkeypatch):
+    """In concurrent mode other events are processed while the sandbox runs."""
+    async def slow_run_pytest(_, on_output=None):
+        await asyncio.sleep(0.2)
+        on_output(REPORT)
+        return REPORT
+
+    monkeypatch.setattr(docker_runner, "run_pytest", slow_run_pytest)
+    sim = CompanySim(prompt="Test QA", days=1, root=tmp_path,
+                     seconds_per_hour=0.05, concurrent=True)
+    await sim.start()
+
+    lines = (tmp_path / "timeline.md").read_text(encoding="utf-8").splitlines()
+    start = next(i for i, line in enumerate(lines) if "QA: Running tests" in line)
+    end = next(i for i, line in enumerate(lines) if "QA: Syntax check PASS" in line)
+    assert any("EVENT" in line or "GOSSIP" in line for line in lines[start + 1:end])
+
+
+def _docker_shim(tmp_path: Path, monkeypatch, body: str) -> Path:
+    """Puts a fake `docker` executable first on PATH; returns its call log."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    calls = tmp_path / "docker_calls.txt"
+    shim = bin_dir / "docker"
+    shim.write_text(f'#!/bin/sh\necho "$@" >> "{calls}"\n{body}\n')
+    shim.chmod(shim.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.delenv("SOFTCOSIM_NO_DOCKER", raising=False)
+    return calls
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.platform == "win32", reason="shell shim")
+async def test_runner_streams_output(tmp_path: Path, monkeypatch):
+    from softcosim.docker_runner import run_pytest
+
+    _docker_shim(tmp_path, monkeypatch,
+                 'if [ "$1" = run ]; then echo checking; sleep 0.2; echo PASS; fi')
+    chunks = []
+    result = await run_pytest(str(tmp_path), on_output=chunks.append)
+    assert result == "checking\nPASS\n"
+    assert chunks[0] == "checking\n" and len(chunks) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.platform == "win32", reason="shell shim")
+async def test_runner_kills_container_on_timeout_and_cancel(tmp_path: Path,
+                                                             monkeypatch):
+    from softcosim.docker_runner import run_pytest
+
+    calls = _docker_shim(tmp_path, monkeypatch,
+                         'if [ "$1" = run ]; then echo started; exec sleep 5; fi')
+    result = await run_pytest(str(tmp_path), timeout=0.2)
+    assert "timed out" in result
+    assert "kill softcosim-qa-" in calls.read_text()
+
+    calls.unlink()
+    task = asyncio.create_task(run_pytest(str(tmp_path)))
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert "kill softcosim-qa-" in calls.read_text()
+
+
+@pytest.mark.asyncio
+async def test_budget_halt_cancels_running_sandbox(tmp_path: Path, monkeypatch):
+    async def hanging_run_pytest(_, on_output=None):
+        await asyncio.sleep(30)
+        return "PASS"
+
+    monkeypatch.setattr(docker_runner, "run_pytest", hanging_run_pytest)
+    sim = CompanySim(prompt="Test QA", days=1, root=tmp_path,
+                     seconds_per_hour=0.05, concurrent=True)
+    sim.schedule(0.5, lambda: sim.add_cost(1.0), "Expensive call")
+    await asyncio.wait_for(sim.start(), timeout=5)
+
+    content = (tmp_path / "timeline.md").read_text(encoding="utf-8")
+    assert "QA: Sandbox cancelled" in content
+    assert "Syntax check" not in content
+    assert "Deadline reached" in content
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.platform == "win32", reason="shell shim")
+async def test_sandbox_pool_reuses_and_recycles_containers(tmp_path: Path, monkeypatch):
+    from softcosim.docker_runner import SandboxPool
+
+    calls = _docker_shim(tmp_path, monkeypatch, (
+        'case "$1" in\n'
+        '  exec) if [ -e "$DOCKER_HANG" ]; then exec sleep 5; fi; echo PASS ;;\n'
+        'esac'
+    ))
+    hang = tmp_path / "hang"
+    monkeypatch.setenv("DOCKER_HANG", str(hang))
+    pool = SandboxPool(str(tmp_path), size=2, timeout=0.2)
+    await pool.start()
+    outputs = await asyncio.gather(*(pool.run() for _ in range(4)))
+    assert all(out == "PASS\n" for out, _ in outputs)
+    assert {job["container"] for _, job in outputs} == set(pool._containers)
+    assert all(job["queue_wait"] >= 0 and job["exec_time"] >= 0 for _, job in outputs)
+
+    hang.touch()
+    out, job = await pool.run()
+    assert "timed out" in out
+    hang.unlink()
+    await pool.close()
+
+    log = calls.read_text().splitlines()
+    assert sum(line.startswith("run -d") for line in log) == 3  # 2 warm + 1 replacement
+    assert sum(line.startswith("exec") for line in log) == 5
+    assert f"rm -f {job['container']}" in log
+    assert pool.recycled == 1 and len(pool.jobs) == 5
+    assert log[-1].startswith("rm -f softcosim-sbx-")
+    assert pool.summary().startswith("5 jobs")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.platform == "win32", reason="shell shim")
+async def test_sandbox_pool_falls_back_when_containers_cannot_be_replaced(
+        tmp_path: Path, monkeypatch):
+    from softcosim.docker_runner import SandboxPool
+
+    calls = _docker_shim(tmp_path, monkeypatch, (
+        'case "$1" in\n'
+        '  run) if [ "$2" = -d ] && [ -e "$DOCKER_BROKEN" ]; then\n'
+        '         echo no space; exit 1\n'
+        '       fi\n'
+        '       if [ "$2" = --rm ]; then echo ONE-OFF; fi ;;\n'
+        '  exec) if [ -e "$DOCKER_BROKEN" ]; then exit 125; fi; echo PASS ;;\n'
+        'esac'
+    ))
+    broken = tmp_path / "broken"
+    monkeypatch.setenv("DOCKER_BROKEN", str(broken))
+    pool = SandboxPool(str(tmp_path), size=1, timeout=2, retry_delay=0.01)
+    await pool.start()
+    broken.touch()
+    # the failed exec loses the only container; the waiter must not hang
+    (first, _), (second, job) = await asyncio.wait_for(
+        asyncio.gather(pool.run(), pool.run()), timeout=5)
+    assert second == "ONE-OFF\n" and job["fallback"]
+    out, job = await pool.run()
+    assert out == "ONE-OFF\n" and job["queue_wait"] < 1
+    await pool.close()
+
+    assert pool.live == 0 and pool.lost == 1
+    log = calls.read_text().splitlines()
+    assert sum(line.startswith("run -d") for line in log) == 4
+    assert "1 lost (Could not start sandbox container: no space)" in pool.summary()
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from softcosim import llm
+from softcosim.eventqueue import BACKGROUND, CRITICAL
+from softcosim.llm import LLMHTTPError
+from softcosim.ratelimit import RequestScheduler
+
+MSG = [{"role": "user", "content": "u"}]
+
+
+@pytest.mark.asyncio
+async def test_retries_429_honoring_retry_after(monkeypatch):
+    hits = []
+
+    async def completions(request):
+        hits.append(time.monotonic())
+        if len(hits) <= 2:
+            return web.json_response({"error": "slow down"}, status=429,
+                                     headers={"Retry-After": "0.2"})
+        return web.json_response(
+            {"choices": [{"message": {"content": "hi"}}], "usage": {"cost": 0.001}}
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    async with TestServer(app) as server:
+        monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "0")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "dummy")
+        url = str(server.make_url("/v1/chat/completions"))
+        monkeypatch.setattr(llm, "API_URL", url)
+        sched = RequestScheduler(base_delay=0.01, seed=0)
+        reply, cost, _ = await sched.run("m", lambda: llm.chat("m", MSG))
+
+    assert reply == "hi" and cost == 0.001
+    assert len(hits) == 3
+    assert all(b - a >= 0.2 for a, b in zip(hits, hits[1:]))
+    m = sched.metrics()["m"]
+    assert (m["requests"], m["retries"], m["throttled"]) == (3, 2, 2)
+
+
+@pytest.mark.asyncio
+async def test_gives_up_on_client_errors_and_after_max_retries():
+    calls = 0
+
+    async def failing(status):
+        nonlocal calls
+        calls += 1
+        raise LLMHTTPError(status, "nope")
+
+    sched = RequestScheduler(max_retries=2, base_delay=0.001)
+    with pytest.raises(LLMHTTPError):
+        await sched.run("m", lambda: failing(400))
+    assert calls == 1
+    with pytest.raises(LLMHTTPError):
+        await sched.run("m", lambda: failing(503))
+    assert calls == 4
+
+
+@pytest.mark.asyncio
+async def test_critical_requests_overtake_background_ones():
+    sched = RequestScheduler(concurrency=1)
+    gate = asyncio.Event()
+    order = []
+
+    async def call(name):
+        if name == "first":
+            await gate.wait()
+        order.append(name)
+
+    first = asyncio.create_task(sched.run("m", lambda: call("first")))
+    await asyncio.sleep(0.01)
+    waiting = [
+        asyncio.create_task(sched.run("m", lambda n=n: call(n), priority=p))
+        for n, p in (("gossip-1", BACKGROUND), ("gossip-2", BACKGROUND),
+                     ("plan", CRITICAL), ("code", CRITICAL))
+    ]
+    await asyncio.sleep(0.01)
+    assert sched.metrics()["m"]["queue_depth"] == 4
+    gate.set()
+    await asyncio.gather(first, *waiting)
+
+    assert order == ["first", "plan", "code", "gossip-1", "gossip-2"]
+    m = sched.metrics()["m"]
+    assert m["max_queue_depth"] == 4 and m["queue_depth"] == 0
+    assert m["max_wait"] > 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_and_tpm_limits():
+    sched = RequestScheduler(concurrency=2, limits={"slow": (1, 600)})
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    await asyncio.gather(*(sched.run("m", call) for _ in range(6)))
+    assert peak == 2
+
+    # 600 tokens/minute refill at 10/s: the second call waits ~0.5 s
+    t0 = time.perf_counter()
+    await sched.run("slow", call, tokens=595)
+    await sched.run("slow", call, tokens=10)
+    assert time.perf_counter() - t0 >= 0.45
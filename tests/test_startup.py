@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+# modules `softcosim --help` must not load
+HEAVY = ("aiohttp", "numpy", "asyncio", "softcosim.engine", "softcosim.llm")
+# self time of softcosim's own modules under --help, as measured by -X importtime;
+# about 0.1 ms today, so only a heavy import creeping back in can reach it
+OWN_BUDGET_US = 50_000
+
+
+def _importtime(*args: str) -> dict[str, int]:
+    """Self time (us) of every module imported by `python -X importtime args`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True, text=True, check=True, env={**os.environ, "NO_COLOR": "1"},
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_us, _, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(self_us)
+    return times
+
+
+def test_help_stays_within_import_budget():
+    times = _importtime("-m", "softcosim", "--help")
+    assert "typer" in times
+    assert [m for m in HEAVY if m in times] == []
+    own = sum(us for name, us in times.items() if name.split(".")[0] == "softcosim")
+    assert own < OWN_BUDGET_US
+
+
+def test_fake_run_never_imports_aiohttp(tmp_path):
+    script = textwrap.dedent(f"""
+        import asyncio, sys
+        from pathlib import Path
+        from softcosim.engine import CompanySim
+        sim = CompanySim("x", 1, Path({str(tmp_path)!r}), seconds_per_hour=0)
+        asyncio.run(sim.start())
+        print("aiohttp" in sys.modules)
+    """)
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                          text=True, check=True)
+    assert proc.stdout.split()[-1] == "False"
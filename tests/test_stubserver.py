@@ -0,0 +1,96 @@
+import asyncio
+import random
+from pathlib import Path
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from softcosim import llm
+from softcosim.engine import CompanySim
+from softcosim.pricing import PriceTable
+from softcosim.ratelimit import RequestScheduler
+from softcosim.stubserver import StubLLM, parse_dist
+
+MESSAGES = [{"role": "user", "content": "status?"}]
+
+
+@pytest.fixture
+async def use_stub(monkeypatch):
+    """Starts a stub server and points llm.chat at it over real HTTP."""
+    servers = []
+
+    async def start(stub: StubLLM) -> StubLLM:
+        server = TestServer(stub.app())
+        await server.start_server()
+        servers.append(server)
+        url = str(server.make_url("/api/v1/chat/completions"))
+        monkeypatch.setattr(llm, "API_URL", url)
+        return stub
+
+    monkeypatch.setenv("SOFTCOSIM_FAKE_LLM", "0")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "dummy")
+    yield start
+    for server in servers:
+        await server.close()
+
+
+async def test_stream_and_plain_replies_agree(use_stub):
+    prices = PriceTable({"m": (1.0, 2.0)})
+    stub = await use_stub(StubLLM(completion_tokens=40, fragment=3, chunk_tokens=2,
+                                  prices=prices, seed=1))
+    pool = llm.SessionPool()
+    try:
+        plain, plain_cost, _ = await llm.chat("m", MESSAGES, pool=pool)
+        deltas = []
+        streamed, cost, _ = await llm.chat(
+            "m", MESSAGES, stream=True, pool=pool,
+            on_token=lambda tokens: deltas.append(tokens.parts[-1]) and False,
+        )
+    finally:
+        await pool.close()
+    # fragmented writes split multi-byte characters; the decoder must cope
+    assert "�" not in streamed and len(deltas) > 10
+    assert len(plain.split()) == len(streamed.split()) == 40
+    assert plain_cost > 0 and cost > 0
+    assert stub.stats["streamed"] == 1 and stub.stats["completed"] == 2
+    assert pool.reused >= 1
+
+
+async def test_injected_throttling_is_retried(use_stub):
+    stub = await use_stub(StubLLM(throttle_rate=0.3, error_rate=0.1,
+                                  retry_after=0, seed=4))
+    limiter = RequestScheduler(concurrency=8, base_delay=0.001, max_retries=20, seed=0)
+    pool = llm.SessionPool(limit=8)
+    try:
+        replies = await asyncio.gather(*(
+            limiter.run("m", lambda: llm.chat("m", MESSAGES, pool=pool))
+            for _ in range(100)
+        ))
+    finally:
+        await pool.close()
+    assert all(text for text, _, _ in replies)
+    m = limiter.metrics()["m"]
+    assert stub.stats["throttled"] == m["throttled"] > 0
+    assert stub.stats["errors"] > 0
+    assert m["retries"] == stub.stats["throttled"] + stub.stats["errors"]
+
+
+async def test_simulation_runs_against_stub(use_stub, tmp_path: Path):
+    stub = await use_stub(StubLLM(seed=2))
+    sim = CompanySim(prompt="Stub", days=1, root=tmp_path, seconds_per_hour=0,
+                     concurrent=True, seed=2)
+    await sim.start()
+    assert sim.cost > 0 and stub.stats["requests"] == sim.http.requests
+    assert (tmp_path / "src" / "hello.py").read_text() == "print('Hello, SoftCoSim!')\n"
+    gossip = (tmp_path / "gossip.md").read_text(encoding="utf-8").splitlines()[4:]
+    assert len(gossip) > 5 and not any("[" in line for line in gossip)
+
+
+def test_parse_dist():
+    rng = random.Random(0)
+    assert parse_dist("0.25")(rng) == 0.25
+    assert 0.1 <= parse_dist("uniform:0.1,0.2")(rng) <= 0.2
+    samples = sorted(parse_dist("lognormal:0.05,0.5")(rng) for _ in range(2001))
+    assert 0.045 < samples[1000] < 0.055
+    with pytest.raises(ValueError):
+        parse_dist("gamma:1")
@@ -0,0 +1,94 @@
+import csv
+import json
+from pathlib import Path
+
+from softcosim.sweep import Sweep, expand, run_one
+
+
+def test_expand_grid_and_runs():
+    spec = {
+        "base": {"days": 2},
+        "grid": {"prompt": ["A", "B"], "budget": [0.1, 0.2]},
+        "runs": [{"prompt": "C", "days": 5}],
+    }
+    configs = expand(spec)
+    assert len(configs) == 5
+    assert {(c["prompt"], c["budget"]) for c in configs[:4]} == {
+        ("A", 0.1), ("A", 0.2), ("B", 0.1), ("B", 0.2)
+    }
+    assert configs[4]["prompt"] == "C" and configs[4]["days"] == 5
+    assert all(c["speed"] == 0.0 for c in configs)
+
+
+def test_sweep_aggregates_and_survives_failures(tmp_path: Path):
+    configs = expand({
+        "base": {"days": 1, "seed": 1},
+        "runs": [{"prompt": "ok-1"}, {"prompt": "broken", "days": "x"},
+                 {"prompt": "ok-2"}],
+    })
+    results = Sweep(configs, tmp_path, workers=2).run()
+
+    assert [r["status"] for r in results] == ["ok", "error", "ok"]
+    assert "TypeError" in results[1]["error"]
+    for r in (results[0], results[2]):
+        assert r["qa_status"] in {"PASS", "FAIL"}
+        assert r["morale"] < 75.0
+        assert (Path(r["folder"]) / "timeline.md").exists()
+
+    rows = list(csv.DictReader((tmp_path / "results.csv").open(encoding="utf-8")))
+    assert [row["prompt"] for row in rows] == ["ok-1", "broken", "ok-2"]
+    assert json.loads((tmp_path / "results.json").read_text())[0]["run"] == 0
+
+
+def test_sweep_global_budget_caps_runs(tmp_path: Path):
+    configs = expand({"grid": {"prompt": ["A", "B", "C"]}, "base": {"budget": 1.0}})
+    sweep = Sweep(configs, tmp_path, workers=1, budget=1.5)
+    results = sweep.run()
+    # fake LLM calls are free, so every run gets its budget back
+    assert [r["budget"] for r in results] == [1.0, 1.0, 1.0]
+    assert sweep.remaining == 1.5
+
+    sweep = Sweep(configs, tmp_path / "none", workers=1, budget=0.0)
+    (tmp_path / "none").mkdir()
+    assert [r["status"] for r in sweep.run()] == ["skipped"] * 3
+
+
+def test_failed_run_keeps_what_it_spent(tmp_path: Path, monkeypatch):
+    from softcosim.engine import CompanySim
+
+    async def spend_then_fail(self):
+        self.cost = 0.3
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(CompanySim, "start", spend_then_fail)
+    config = expand({"base": {"budget": 1.0}})[0]
+    row = run_one(0, config, str(tmp_path / "run-000"), 1.0)
+    assert row["status"] == "error" and row["cost"] == 0.3
+
+    sweep = Sweep([config], tmp_path, budget=2.0)
+    grant = sweep._grant(config)
+    sweep._settle(grant, row)
+    assert sweep.remaining == 1.7
+
+
+def test_pool_crash_retries_runs_on_their_own_grant(tmp_path: Path, monkeypatch):
+    import os
+
+    from softcosim.engine import CompanySim
+
+    start = CompanySim.start
+
+    async def crash_on_prompt(self):
+        if self.prompt == "crash":
+            os._exit(1)
+        await start(self)
+
+    monkeypatch.setattr(CompanySim, "start", crash_on_prompt)
+    configs = expand({"grid": {"prompt": ["a", "crash", "b"]},
+                      "base": {"budget": 1.0}})
+    sweep = Sweep(configs, tmp_path, workers=3, budget=3.0)
+    results = sweep.run()
+    assert [r["status"] for r in results] == ["ok", "crashed", "ok"]
+    assert [r["budget"] for r in results] == [1.0, 1.0, 1.0]
+    # only the run that died keeps its grant
+    assert sweep.remaining == 2.0
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from softcosim.agents import Developer, Manager
+from softcosim.engine import CompanySim
+from softcosim.team import TeamState, load_team
+
+TEAM = """
+[[agents]]
+role = "manager"
+name = "Boss"
+
+[[agents]]
+role = "developer"
+count = 200
+name = "Dev-{i}"
+model = "cheap/model"
+
+[[agents]]
+role = "qa"
+count = 20
+name = "QA-{i}"
+"""
+
+
+def test_load_team_expands_groups(tmp_path: Path):
+    path = tmp_path / "team.toml"
+    path.write_text(TEAM)
+    team = load_team(path)
+    assert len(team) == 221
+    assert team[1] == {"role": "developer", "name": "Dev-1", "model": "cheap/model",
+                       "id": "Dev-1"}
+    assert team[-1]["name"] == "QA-20"
+
+    path.write_text('[[agents]]\nrole = "developer"\n')
+    with pytest.raises(ValueError, match="manager"):
+        load_team(path)
+    path.write_text('[[agents]]\nrole = "intern"\n')
+    with pytest.raises(ValueError, match="role"):
+        load_team(path)
+
+
+def test_team_state_updates_are_vectorised_and_clamped():
+    state = TeamState(4)
+    state.morale[:] = [1, 50, 97, 100]
+    state.cheer(5)
+    assert state.morale.tolist() == [6, 55, 100, 100]
+    state.cheer(-10)
+    assert state.morale.tolist() == [0, 45, 90, 90]
+    before = state.fatigue
+    state.tire(150)
+    state.rest(30)
+    assert state.fatigue is before and state.fatigue.tolist() == [70] * 4
+
+
+@pytest.mark.asyncio
+async def test_large_team_runs_on_shared_arrays(tmp_path: Path):
+    path = tmp_path / "team.toml"
+    path.write_text(TEAM)
+    root = tmp_path / "run"
+    root.mkdir()
+    sim = CompanySim("Big studio", 1, root, seconds_per_hour=0, seed=1,
+                     team=load_team(path))
+    await sim.start()
+
+    assert isinstance(sim.agents["Boss"], Manager)
+    dev = sim.agents["Dev-7"]
+    assert isinstance(dev, Developer) and dev.model == "cheap/model"
+    assert not hasattr(dev, "__dict__")
+    assert sim.state.morale.shape == (221,)
+    assert dev.fatigue == sim.fatigue == pytest.approx(sim.state.fatigue[0])
+    assert sim.morale < 75.0
+    # every developer wrote a file and one QA run checked them all
+    assert len(list((root / "src").glob("hello*.py"))) == 200
+    timeline = (root / "timeline.md").read_text(encoding="utf-8")
+    assert timeline.count("Syntax check") == 1
+    assert np.all(sim.state.cost == 0)
@@ -0,0 +1,82 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from softcosim.engine import CompanySim
+from softcosim.transcript import Recorder, Replayer, ReplayMiss
+
+MSG = [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}]
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_recorded_replies(tmp_path: Path, monkeypatch):
+    path = tmp_path / "calls.jsonl"
+    rec = Recorder(path)
+    rec.record("m", MSG, "first", 0.01, 1.5)
+    rec.record("m", MSG, "second", 0.02, 2.5, ttft=0.3)
+    rec.close()
+
+    slept = []
+
+    async def fake_sleep(s):
+        slept.append(s)
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+
+    rep = Replayer(path, latency=True)
+    assert await rep.chat("m", MSG) == ("first", 0.01, 1.5)
+    assert await rep.chat("m", MSG) == ("second", 0.02, 2.5)
+    assert (await rep.chat("m", MSG))[0] == "first"
+    # unseen prompt falls back to the same model's recordings
+    other = [{"role": "user", "content": "something else"}]
+    assert (await rep.chat("m", other))[0] in {"first", "second"}
+    assert rep.misses == 1
+    assert slept[:2] == [1.5, 2.5]
+    with pytest.raises(ReplayMiss):
+        await rep.chat("unknown-model", MSG)
+    assert rep.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_replay_miss_skips_the_action_not_the_run(tmp_path: Path):
+    transcript = tmp_path / "calls.jsonl"
+    rec = Recorder(transcript)
+    rec.record("google/gemini-2.5-flash", MSG, "plan", 0.0, 0.1)
+    rec.close()
+
+    root = tmp_path / "run"
+    root.mkdir()
+    sim = CompanySim(prompt="Replay", days=1, root=root, seconds_per_hour=0,
+                     seed=7, replay=Replayer(transcript))
+    await sim.start()
+
+    # only the manager's model was recorded: the developer and gossip calls miss
+    timeline = (root / "timeline.md").read_text(encoding="utf-8")
+    assert "Project plan:\nplan" in timeline
+    assert ("No recorded replies for model 'mistralai/devstral-small' "
+            "– action skipped") in timeline
+    assert not (root / "src" / "hello.py").exists()
+    assert sim.replay.misses > 1
+    assert "not in transcript" in (root / "README.md").read_text(encoding="utf-8")
+
+
+@pytest.mark.asyncio
+async def test_seeded_replay_is_reproducible(tmp_path: Path):
+    transcript = tmp_path / "calls.jsonl"
+
+    async def run(name: str, **kwargs) -> Path:
+        root = tmp_path / name
+        root.mkdir()
+        sim = CompanySim(prompt="Replay", days=2, root=root,
+                         seconds_per_hour=0, seed=7, **kwargs)
+        await sim.start()
+        return root
+
+    runs = [await run("record", recorder=Recorder(transcript))]
+    runs.append(await run("replay1", replay=Replayer(transcript)))
+    runs.append(await run("replay2", replay=Replayer(transcript)))
+
+    assert transcript.read_text(encoding="utf-8").count("\n") > 0
+    for fname in ("timeline.md", "gossip.md"):
+        contents = [(r / fname).read_bytes() for r in runs]
+        assert contents[0] == contents[1] == contents[2]